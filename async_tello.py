@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Asyncio Tello client
+====================
+
+One event loop owns the command socket, the state socket and all timers:
+
+- commands are awaitables with per-command timeouts
+- responses are correlated to pending commands by their expected format,
+  so queries can be in flight while a movement command is still running;
+  "ok" and errors only ever answer control commands unless no control
+  command is waiting
+- rc commands are fire-and-forget and never wait behind anything
+- state packets are parsed into a fresh dict per packet (like djitellopy)
+
+TelloBridge runs the client on a background loop thread and exposes the
+blocking djitellopy-style methods the rest of the project calls, so it can
+be passed anywhere a Tello instance is expected.
+"""
+
+import asyncio
+import math
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+TELLO_IP = '192.168.10.1'
+CONTROL_UDP_PORT = 8889
+STATE_UDP_PORT = 8890
+
+# Expected response formats for read commands; anything else answers "ok"/"error".
+# A response that fits CONTROL_PATTERN never answers a query by format, so these stay disjoint from "ok".
+QUERY_PATTERNS = {
+    'battery?': re.compile(r'^\d+$'),
+    'height?': re.compile(r'^-?\d+dm$'),
+    'tof?': re.compile(r'^-?\d+mm$'),
+    'attitude?': re.compile(r'^pitch:'),
+    'speed?': re.compile(r'^\d+(\.\d+)?$'),
+    'time?': re.compile(r'^\d+s$'),
+    'temp?': re.compile(r'^\d+~\d+C$'),
+    'baro?': re.compile(r'^-?\d+(\.\d+)?$'),
+    'acceleration?': re.compile(r'^agx:'),
+    'wifi?': re.compile(r'^\d+$'),
+    'sdk?': re.compile(r'^\d+$'),
+    'sn?': re.compile(r'^\w+$'),
+}
+CONTROL_PATTERN = re.compile(r'^(ok|error.*|out of range|unknown command.*)$', re.IGNORECASE)
+
+INT_STATE_FIELDS = ('mid', 'x', 'y', 'z', 'pitch', 'roll', 'yaw', 'vgx', 'vgy', 'vgz',
+                    'templ', 'temph', 'tof', 'h', 'bat', 'time')
+FLOAT_STATE_FIELDS = ('baro', 'agx', 'agy', 'agz')
+
+
+class TelloCommandError(Exception):
+    """Raised when the drone rejects a command or does not answer in time."""
+
+
+def parse_state(text: str) -> Dict:
+    """Parse a state datagram like "pitch:0;roll:0;yaw:45;..." into a dict."""
+    state: Dict = {}
+    for field in text.strip().split(';'):
+        if ':' not in field:
+            continue
+        key, value = field.split(':', 1)
+        try:
+            if key in INT_STATE_FIELDS:
+                state[key] = int(value)
+            elif key in FLOAT_STATE_FIELDS:
+                state[key] = float(value)
+            else:
+                state[key] = value
+        except ValueError:
+            state[key] = value
+    return state
+
+
+class _PendingCommand:
+    """A command waiting for its response."""
+    __slots__ = ('command', 'pattern', 'is_control', 'future', 'sent_at')
+
+    def __init__(self, command: str, future: asyncio.Future):
+        self.command = command
+        self.pattern = QUERY_PATTERNS.get(command.split(' ')[0], CONTROL_PATTERN)
+        self.is_control = self.pattern is CONTROL_PATTERN
+        self.future = future
+        self.sent_at = time.monotonic()
+
+    def accepts(self, response: str) -> bool:
+        if self.is_control:
+            return bool(CONTROL_PATTERN.match(response))
+        return not CONTROL_PATTERN.match(response) and bool(self.pattern.match(response))
+
+
+class _CommandProtocol(asyncio.DatagramProtocol):
+    def __init__(self, client: 'AsyncTello'):
+        self.client = client
+
+    def datagram_received(self, data: bytes, address):
+        self.client._on_response(data, address)
+
+
+class _StateProtocol(asyncio.DatagramProtocol):
+    def __init__(self, client: 'AsyncTello'):
+        self.client = client
+
+    def datagram_received(self, data: bytes, address):
+        self.client._on_state(data, address)
+
+
+class AsyncTello:
+    """Asyncio client for a single Tello."""
+
+    RESPONSE_TIMEOUT = 7.0
+    TAKEOFF_TIMEOUT = 20.0
+    RETRY_COUNT = 3
+
+    def __init__(self, host: str = TELLO_IP, port: int = CONTROL_UDP_PORT,
+                 local_port: int = CONTROL_UDP_PORT, state_port: int = STATE_UDP_PORT):
+        """
+        Initialize the client.
+
+        Args:
+            host: Drone (or simulator) IP address
+            port: Drone command port
+            local_port: Local port the command socket binds to
+            state_port: Local port state packets arrive on
+        """
+        self.address = (host, port)
+        self.local_port = local_port
+        self.state_port = state_port
+        self.speed = 100  # cm/s, mirrors the last set_speed for timeout estimates
+
+        self._command_transport: Optional[asyncio.DatagramTransport] = None
+        self._state_transport: Optional[asyncio.DatagramTransport] = None
+        self._pending: Deque[_PendingCommand] = deque()
+        self._late: Deque[Tuple[re.Pattern, float]] = deque()  # Patterns of timed-out commands
+        self._control_lock: Optional[asyncio.Lock] = None
+        self._state: Dict = {}
+        self._state_time = 0.0
+        self._state_callbacks: List[Callable[[float, Dict], None]] = []
+
+    # ------------------------------------------------------------------ lifecycle
+
+    async def open(self):
+        """Create the command and state endpoints on the running loop."""
+        loop = asyncio.get_running_loop()
+        self._control_lock = asyncio.Lock()
+        self._command_transport, _ = await loop.create_datagram_endpoint(
+            lambda: _CommandProtocol(self), local_addr=('0.0.0.0', self.local_port))
+        self._state_transport, _ = await loop.create_datagram_endpoint(
+            lambda: _StateProtocol(self), local_addr=('0.0.0.0', self.state_port))
+
+    async def close(self):
+        """Close both endpoints and fail anything still pending."""
+        for pending in self._pending:
+            if not pending.future.done():
+                pending.future.set_exception(TelloCommandError(f"'{pending.command}' aborted, client closed"))
+        self._pending.clear()
+        for transport in (self._command_transport, self._state_transport):
+            if transport is not None:
+                transport.close()
+        self._command_transport = self._state_transport = None
+
+    async def connect(self, wait_for_state: bool = True, state_timeout: float = 1.0):
+        """Enter SDK mode and optionally wait for the first state packet."""
+        if self._command_transport is None:
+            await self.open()
+        await self.send_control_command('command')
+        if wait_for_state:
+            deadline = time.monotonic() + state_timeout
+            while not self._state and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            if not self._state:
+                raise TelloCommandError('Did not receive a state packet from the Tello')
+
+    # ------------------------------------------------------------------ datagrams
+
+    def _on_response(self, data: bytes, address):
+        if address[0] != self.address[0]:
+            return
+        response = data.decode('utf-8', errors='ignore').strip()
+
+        # Hand the response to the oldest pending command whose format it fits
+        if self._resolve(response, lambda pending: pending.accepts(response)):
+            return
+
+        # A late answer to a command that already timed out
+        now = time.monotonic()
+        while self._late and now - self._late[0][1] > self.RESPONSE_TIMEOUT * 2:
+            self._late.popleft()
+        for entry in self._late:
+            if entry[0].match(response):
+                self._late.remove(entry)
+                return
+
+        if response.lower() != 'ok' and CONTROL_PATTERN.match(response):
+            # No control command is waiting, so the error is a query the drone could not answer
+            self._resolve(response, lambda pending: not pending.is_control)
+
+    def _resolve(self, response: str, matches: Callable[[_PendingCommand], bool]) -> bool:
+        """Give the response to the oldest pending command that matches; False if none does."""
+        for pending in self._pending:
+            if not pending.future.done() and matches(pending):
+                self._pending.remove(pending)
+                pending.future.set_result(response)
+                return True
+        return False
+
+    def _on_state(self, data: bytes, address):
+        if address[0] != self.address[0]:
+            return
+        state = parse_state(data.decode('ASCII', errors='ignore'))
+        timestamp = time.monotonic()
+        self._state = state  # A new dict per packet, consumers detect updates by identity
+        self._state_time = timestamp
+        for callback in list(self._state_callbacks):
+            try:
+                callback(timestamp, state)
+            except Exception as e:
+                print(f"⚠️  State callback failed: {e}")
+
+    # ------------------------------------------------------------------ commands
+
+    def _timeout_for(self, command: str) -> float:
+        """Per-command timeout: long moves need longer than the default."""
+        parts = command.split(' ')
+        keyword = parts[0]
+        if keyword == 'takeoff' or keyword == 'land':
+            return self.TAKEOFF_TIMEOUT
+        try:
+            if keyword in ('forward', 'back', 'left', 'right', 'up', 'down'):
+                return max(self.RESPONSE_TIMEOUT, int(parts[1]) / self.speed + 5)
+            if keyword in ('cw', 'ccw'):
+                return max(self.RESPONSE_TIMEOUT, int(parts[1]) / 30 + 5)
+            if keyword == 'go':
+                x, y, z, speed = (int(value) for value in parts[1:5])
+                return max(self.RESPONSE_TIMEOUT, math.sqrt(x * x + y * y + z * z) / speed + 5)
+            if keyword == 'curve':
+                values = [int(value) for value in parts[1:8]]
+                length = math.dist((0, 0, 0), values[0:3]) + math.dist(values[0:3], values[3:6])
+                return max(self.RESPONSE_TIMEOUT, length * 1.6 / values[6] + 5)
+        except (ValueError, IndexError, ZeroDivisionError):
+            pass
+        return self.RESPONSE_TIMEOUT
+
+    async def send_command(self, command: str, timeout: Optional[float] = None) -> str:
+        """Send a command and await its response."""
+        if self._command_transport is None:
+            raise TelloCommandError('Client is not open')
+        timeout = timeout if timeout is not None else self._timeout_for(command)
+        future = asyncio.get_running_loop().create_future()
+        pending = _PendingCommand(command, future)
+        self._pending.append(pending)
+        self._command_transport.sendto(command.encode('utf-8'), self.address)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            if pending in self._pending:
+                self._pending.remove(pending)
+            self._late.append((pending.pattern, time.monotonic()))
+            raise TelloCommandError(f"'{command}' timed out after {timeout:.1f}s")
+
+    async def send_control_command(self, command: str, timeout: Optional[float] = None) -> bool:
+        """Send a command that answers "ok"; only one runs at a time, queries and rc are not held up."""
+        async with self._control_lock:
+            last_error = None
+            for _ in range(self.RETRY_COUNT):
+                try:
+                    response = await self.send_command(command, timeout)
+                except TelloCommandError as e:
+                    last_error = e
+                    continue  # Only timeouts are retried; an "error" answer is final
+                if response.lower() == 'ok':
+                    return True
+                raise TelloCommandError(f"'{command}' was unsuccessful: {response}")
+            raise last_error
+
+    async def query(self, command: str, timeout: Optional[float] = None) -> str:
+        """Send a read command; runs concurrently with control commands and rc."""
+        return await self.send_command(command, timeout)
+
+    def send_command_without_return(self, command: str):
+        """Send a command and do not wait for (or expect) a response."""
+        if self._command_transport is not None:
+            self._command_transport.sendto(command.encode('utf-8'), self.address)
+
+    def send_rc_control(self, left_right: int, forward_backward: int, up_down: int, yaw: int):
+        """Send an rc setpoint without waiting (rc commands have no response)."""
+        values = [max(-100, min(100, int(value))) for value in (left_right, forward_backward, up_down, yaw)]
+        self.send_command_without_return('rc ' + ' '.join(str(v) for v in values))
+
+    # ------------------------------------------------------------------ state
+
+    def get_current_state(self) -> Dict:
+        return self._state
+
+    def state_age(self) -> float:
+        return time.monotonic() - self._state_time if self._state_time else float('inf')
+
+    def add_state_callback(self, callback: Callable[[float, Dict], None]):
+        """Register callback(timestamp, state), invoked on the loop for every state packet."""
+        self._state_callbacks.append(callback)
+
+
+class TelloBridge:
+    """
+    Blocking, djitellopy-compatible facade over AsyncTello.
+
+    The event loop runs in one background thread; every call is scheduled on
+    it with run_coroutine_threadsafe, so several threads (key loop, telemetry,
+    health monitor) can issue commands without their own sockets.
+    """
+
+    def __init__(self, host: str = TELLO_IP, port: int = CONTROL_UDP_PORT,
+                 local_port: int = CONTROL_UDP_PORT, state_port: int = STATE_UDP_PORT):
+        self.client = AsyncTello(host=host, port=port, local_port=local_port, state_port=state_port)
+        self.RESPONSE_TIMEOUT = AsyncTello.RESPONSE_TIMEOUT
+        self.stream_on = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="TelloBridge", daemon=True)
+        self._thread.start()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.client.address
+
+    @address.setter
+    def address(self, value: Tuple[str, int]):
+        self.client.address = value
+
+    def _run(self, coroutine, timeout: Optional[float] = None):
+        """Run a coroutine on the loop thread and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    # ------------------------------------------------------------------ djitellopy-style API
+
+    def connect(self, wait_for_state: bool = True):
+        self.client.RESPONSE_TIMEOUT = self.RESPONSE_TIMEOUT
+        self._run(self.client.connect(wait_for_state=wait_for_state))
+
+    def send_command_with_return(self, command: str, timeout: Optional[float] = None) -> str:
+        try:
+            return self._run(self.client.send_command(command, timeout))
+        except TelloCommandError as e:
+            return f"error {e}"
+
+    def send_control_command(self, command: str, timeout: Optional[float] = None) -> bool:
+        return self._run(self.client.send_control_command(command, timeout))
+
+    def send_rc_control(self, left_right_velocity: int, forward_backward_velocity: int,
+                        up_down_velocity: int, yaw_velocity: int):
+        self._loop.call_soon_threadsafe(self.client.send_rc_control, left_right_velocity,
+                                        forward_backward_velocity, up_down_velocity, yaw_velocity)
+
+    def get_current_state(self) -> Dict:
+        return self.client.get_current_state()
+
+    def takeoff(self):
+        self.send_control_command('takeoff')
+
+    def land(self):
+        self.send_control_command('land')
+
+    def send_command_without_return(self, command: str):
+        self._loop.call_soon_threadsafe(self.client.send_command_without_return, command)
+
+    def emergency(self):
+        self.send_command_without_return('emergency')
+
+    def streamon(self):
+        self.send_control_command('streamon')
+        self.stream_on = True
+
+    def streamoff(self):
+        self.send_control_command('streamoff')
+        self.stream_on = False
+
+    def set_speed(self, speed: int):
+        self.send_control_command(f'speed {speed}')
+        self.client.speed = speed
+
+    def move(self, direction: str, distance: int):
+        self.send_control_command(f'{direction} {distance}')
+
+    def move_up(self, distance: int):
+        self.move('up', distance)
+
+    def move_down(self, distance: int):
+        self.move('down', distance)
+
+    def move_left(self, distance: int):
+        self.move('left', distance)
+
+    def move_right(self, distance: int):
+        self.move('right', distance)
+
+    def move_forward(self, distance: int):
+        self.move('forward', distance)
+
+    def move_back(self, distance: int):
+        self.move('back', distance)
+
+    def rotate_clockwise(self, degrees: int):
+        self.send_control_command(f'cw {degrees}')
+
+    def rotate_counter_clockwise(self, degrees: int):
+        self.send_control_command(f'ccw {degrees}')
+
+    def go_xyz_speed(self, x: int, y: int, z: int, speed: int):
+        self.send_control_command(f'go {x} {y} {z} {speed}')
+
+    def curve_xyz_speed(self, x1: int, y1: int, z1: int, x2: int, y2: int, z2: int, speed: int):
+        self.send_control_command(f'curve {x1} {y1} {z1} {x2} {y2} {z2} {speed}')
+
+    def get_battery(self) -> int:
+        response = self._run(self.client.query('battery?'))
+        try:
+            return int(response)
+        except ValueError:
+            raise TelloCommandError(f"'battery?' was unsuccessful: {response}") from None
+
+    def end(self):
+        """Close the sockets and stop the loop thread."""
+        try:
+            self._run(self.client.close(), timeout=2)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Headless batch planner: compile navigation plans for many waypoint pairs.
+
+Loads one or more session files (JSON or .tmap), compiles the plan for the
+chosen pairs (or every ordered pair) and writes command lists, counts,
+distances and estimated flight times as JSON or CSV, without a drone.
+Times come from the flight cost model (calibrated if flight_cost_model.json
+exists). Large maps are planned on a process pool.
+
+Usage:
+    python batch_planner.py drone_movements_20250708_181217.json
+    python batch_planner.py maps/*.tmap --route both --format csv -o plans.csv
+    python batch_planner.py map.json --pair START END --pair WP_002 WP_004
+    python batch_planner.py map.json --heading strafe --start-heading 0
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from plan_compiler import HeadingStrategy
+from waypoint_navigation import RouteMode, WaypointNavigationManager
+
+# Pairs per map above which planning is spread over worker processes
+PARALLEL_THRESHOLD = 2000
+
+CSV_FIELDS = ['map', 'from_id', 'from_name', 'to_id', 'to_name', 'route', 'heading', 'smooth', 'direction', 'source_movements',
+              'command_count', 'rotation_count', 'total_distance_cm', 'path_length_cm', 'estimated_seconds',
+              'commands']
+
+
+# ---------------------------------------------------------------------- worker side
+
+_worker_manager: Optional[WaypointNavigationManager] = None
+
+
+def _load_manager(map_file: str) -> WaypointNavigationManager:
+    manager = WaypointNavigationManager()
+    if not manager.load_waypoint_file(map_file, verbose=False):
+        raise ValueError(f"Could not load {map_file}")
+    return manager
+
+
+def _init_worker(map_file: str):
+    """Process pool initializer: load the map once per worker."""
+    global _worker_manager
+    _worker_manager = _load_manager(map_file)
+
+
+def plan_pair(manager: WaypointNavigationManager, from_id: str, to_id: str, route_mode: RouteMode,
+              vertical_factor: float, strategy: HeadingStrategy = HeadingStrategy.TURN,
+              start_heading: Optional[float] = None, smooth: bool = False) -> Dict:
+    """Compile one pair and describe the result."""
+    plan, direction = manager.plan_route(from_id, to_id, route_mode=route_mode, vertical_factor=vertical_factor,
+                                         strategy=strategy, start_heading=start_heading, smooth=smooth)
+    summary = manager.path_summary(from_id, to_id)
+    return {
+        'map': manager.json_file_path,
+        'from_id': from_id,
+        'from_name': manager.waypoints[from_id].name,
+        'to_id': to_id,
+        'to_name': manager.waypoints[to_id].name,
+        'route': route_mode.value,
+        'heading': strategy.value,
+        'smooth': smooth,
+        'direction': direction.value,
+        'source_movements': plan.source_movements,
+        'command_count': plan.command_count,
+        'rotation_count': plan.rotation_count,
+        'total_distance_cm': round(plan.total_distance, 1),
+        'path_length_cm': round(summary['path_length'], 1),
+        'estimated_seconds': round(manager.estimate_plan(plan, start_heading=start_heading).total_seconds, 1),
+        'commands': [command.describe() for command in plan.commands],
+    }
+
+
+def _run_task(manager: WaypointNavigationManager, task: Tuple) -> Dict:
+    from_id, to_id, route, vertical_factor, strategy, start_heading, smooth = task
+    return plan_pair(manager, from_id, to_id, RouteMode(route), vertical_factor, HeadingStrategy(strategy),
+                     start_heading, smooth)
+
+
+def _plan_chunk(tasks: Sequence[Tuple]) -> List[Dict]:
+    return [_run_task(_worker_manager, task) for task in tasks]
+
+
+# ---------------------------------------------------------------------- driver side
+
+def resolve_waypoint(manager: WaypointNavigationManager, reference: str) -> str:
+    """Waypoint id for an id or a (case-insensitive) waypoint name."""
+    if reference.upper() in manager.waypoints:
+        return reference.upper()
+    for wp_id in manager.waypoint_order:
+        if manager.waypoints[wp_id].name.lower() == reference.lower():
+            return wp_id
+    raise ValueError(f"Waypoint '{reference}' not found in {manager.json_file_path}")
+
+
+def plan_map(map_file: str, pairs: Optional[List[Tuple[str, str]]], route_modes: List[RouteMode],
+             vertical_factor: float = 1.0, workers: Optional[int] = None,
+             strategies: Sequence[HeadingStrategy] = (HeadingStrategy.TURN,),
+             start_heading: Optional[float] = None, smooth: bool = False) -> List[Dict]:
+    """
+    Plan the requested pairs of one map.
+
+    Args:
+        map_file: Session file to plan on
+        pairs: (from, to) ids or names, or None for every ordered pair
+        route_modes: Route modes to plan each pair with
+        vertical_factor: Vertical airflow factor passed to the compiler
+        workers: Worker processes for large maps (None = CPU count, 1 = in-process)
+        strategies: Heading strategies to plan each pair with
+        start_heading: Drone yaw that STRAFE plans hold, or None to turn to the first segment
+        smooth: Fly pairs of legs as curves where feasible
+    """
+    manager = _load_manager(map_file)
+    if pairs is None:
+        id_pairs = list(permutations(manager.waypoint_order, 2))
+    else:
+        id_pairs = [(resolve_waypoint(manager, a), resolve_waypoint(manager, b)) for a, b in pairs]
+    tasks = [(a, b, mode.value, vertical_factor, strategy.value, start_heading, smooth)
+             for a, b in id_pairs if a != b for mode in route_modes for strategy in strategies]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) < PARALLEL_THRESHOLD:
+        return [_run_task(manager, task) for task in tasks]
+
+    # Contiguous chunks keep each worker's plan cache warm for neighbouring pairs
+    chunk_size = max(1, len(tasks) // (workers * 4))
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(map_file,)) as pool:
+        for chunk_result in pool.map(_plan_chunk, chunks):
+            results.extend(chunk_result)
+    return results
+
+
+def write_results(results: List[Dict], output, output_format: str):
+    """Write plan records as JSON (list of objects) or CSV (commands joined with '; ')."""
+    if output_format == 'json':
+        json.dump(results, output, indent=2, ensure_ascii=False)
+        output.write("\n")
+        return
+    writer = csv.DictWriter(output, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for record in results:
+        row = dict(record)
+        row['commands'] = "; ".join(record['commands'])
+        writer.writerow(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile navigation plans for waypoint pairs without a drone')
+    parser.add_argument('maps', nargs='+', help='Session files (drone_movements_*.json or .tmap)')
+    parser.add_argument('--pair', nargs=2, action='append', metavar=('FROM', 'TO'),
+                        help='Waypoint pair by id or name (repeatable); default is every ordered pair')
+    parser.add_argument('--route', choices=['chain', 'direct', 'both'], default='chain')
+    parser.add_argument('--heading', choices=['turn', 'strafe', 'both'], default='turn',
+                        help='Heading strategy: turn to each segment or strafe holding one heading')
+    parser.add_argument('--start-heading', type=float, help='Drone yaw for strafe plans (default: unknown)')
+    parser.add_argument('--smooth', action='store_true', help='Plan curved flight through waypoints')
+    parser.add_argument('--vertical-factor', type=float, default=1.0)
+    parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    parser.add_argument('--workers', type=int, help='Worker processes for large maps (default: CPU count)')
+    args = parser.parse_args()
+
+    route_modes = list(RouteMode) if args.route == 'both' else [RouteMode(args.route)]
+    strategies = list(HeadingStrategy) if args.heading == 'both' else [HeadingStrategy(args.heading)]
+    results, failed = [], 0
+    for map_file in args.maps:
+        try:
+            results.extend(plan_map(map_file, args.pair, route_modes, args.vertical_factor, args.workers,
+                                    strategies=strategies, start_heading=args.start_heading,
+                                    smooth=args.smooth))
+        except Exception as e:
+            failed += 1
+            print(f"❌ {map_file}: {e}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            write_results(results, f, args.format)
+        print(f"✅ Wrote {len(results)} plans to {args.output}", file=sys.stderr)
+    else:
+        write_results(results, sys.stdout, args.format)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Data-path benchmark: load, plan and save on synthetic sessions.
+
+Synthetic mapping sessions are generated in the recorder's own layout and
+written through build_session_data, so they always follow the current
+drone_movements_*.json schema. For each size the suite measures:
+
+    load_json        WaypointNavigationManager.load_waypoint_file on the JSON file
+    load_tmap        the same map memory-mapped as .tmap
+    plan_forward     calculate_navigation_path from the first to the last waypoint
+    plan_reverse     calculate_navigation_path from the last to the first waypoint
+    reverse          NavigationMovement.reverse over (up to) 10000 movements
+    save_json        RealTimeDroneController.save_to_json of the whole session
+
+Each operation is timed over --repeat runs (short ones over more), then run
+once more under tracemalloc to get its peak allocation. Best times and peaks
+are compared with a stored baseline, which the results can replace:
+
+Usage:
+    python benchmarks/bench_data_paths.py [--sizes 10x100 1000x10000 100000x1000000] [--repeat 3]
+    python benchmarks/bench_data_paths.py --save-baseline
+    python benchmarks/bench_data_paths.py --generate synthetic.json --waypoints 5000 --movements 50000
+
+Exits with status 1 if an operation is slower or uses more memory than the
+baseline by more than the tolerances. The time check allows for the spread
+the baseline itself measured (median over best) and skips operations under
+MIN_GATED_MS; the memory check skips peaks under MIN_GATED_MB. Those are
+scheduler and allocator noise, not regressions. Baselines are
+machine-specific; record your own before comparing.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from movement_journal import build_session_data
+from realtime_drone_control import RealTimeDroneController
+from waypoint_map import json_to_map
+from waypoint_navigation import NavigationMovement, WaypointNavigationManager
+
+DEFAULT_SIZES = ("10x100", "1000x10000", "100000x1000000")  # WAYPOINTSxMOVEMENTS
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_data_paths.json")
+MIN_MEASURE_SECONDS = 0.5  # Short operations are repeated until they have run this long
+MAX_RUNS = 1000
+REVERSE_SAMPLE = 10000  # Movements reversed per run of the reverse benchmark
+MOVE_DIRECTIONS = ("forward", "backward", "left", "right")
+LIFT_SHARE = 0.2  # Share of movements that are climbs or descents
+MIN_GATED_MS = 1.0  # Operations faster than this in the baseline are reported but not gated
+MIN_GATED_MB = 0.1  # Likewise for peak allocations
+
+
+# ---------------------------------------------------------------------- synthetic sessions
+
+def generate_recording(waypoints: int, movements: int, seed: int = 0) -> List[Dict]:
+    """Waypoints as RealTimeDroneController records them, movements spread evenly after START."""
+    if waypoints < 2 and movements:
+        raise ValueError("Movements need at least two waypoints")
+    rng = random.Random(seed)
+    clock = datetime(2025, 7, 8, 18, 0, 0)
+    recorded = [{'id': "WP_001", 'name': "START", 'movements_to_here': []}]
+    per_waypoint, extra = divmod(movements, max(1, waypoints - 1))
+    for index in range(1, waypoints):
+        segment = []
+        for _ in range(per_waypoint + (index <= extra)):
+            clock += timedelta(seconds=rng.uniform(0.5, 3.0))
+            if rng.random() < LIFT_SHARE:
+                movement_type, direction = "lift", rng.choice(("up", "down"))
+            else:
+                movement_type, direction = "move", rng.choice(MOVE_DIRECTIONS)
+            segment.append({
+                'id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                'type': movement_type,
+                'direction': direction,
+                'distance': round(rng.uniform(10.0, 300.0), 2),
+                'start_yaw': rng.randint(-180, 180),
+                'timestamp': clock.isoformat(),
+            })
+        recorded.append({'id': f"WP_{index + 1:03d}", 'name': f"Waypoint_{index}", 'movements_to_here': segment})
+    return recorded
+
+
+def write_session(path: str, waypoints: int, movements: int, seed: int = 0) -> str:
+    """Write a synthetic drone_movements_*.json session."""
+    with open(path, 'w') as f:
+        json.dump(build_session_data(generate_recording(waypoints, movements, seed)), f, indent=2)
+    return path
+
+
+# ---------------------------------------------------------------------- measurement
+
+def parse_size(text: str) -> Tuple[int, int]:
+    waypoints, movements = text.lower().split('x')
+    return int(waypoints), int(movements)
+
+
+def measure(operation: Callable[[], object], repeat: int) -> Dict:
+    """
+    Median and best wall time, then the peak allocation of one traced run.
+
+    Runs at least repeat times, and short operations until they have run
+    MIN_MEASURE_SECONDS in total, so their best time is stable.
+    """
+    samples = []
+    while len(samples) < repeat or (sum(samples) < MIN_MEASURE_SECONDS and len(samples) < MAX_RUNS):
+        gc.collect()
+        start = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'median_ms': statistics.median(samples) * 1000, 'min_ms': min(samples) * 1000,
+            'peak_mb': peak / (1024 * 1024), 'runs': len(samples)}
+
+
+def bench_size(waypoints: int, movements: int, repeat: int, workdir: str) -> Dict[str, Dict]:
+    """Run every operation on one synthetic session."""
+    size = f"{waypoints}x{movements}"
+    json_path = os.path.join(workdir, f"drone_movements_{size}.json")
+    recording = generate_recording(waypoints, movements)
+    with open(json_path, 'w') as f:
+        json.dump(build_session_data(recording), f, indent=2)
+    map_path = json_to_map(json_path)
+
+    manager = WaypointNavigationManager()
+    manager.cost_model_file = None
+    first, last = "WP_001", f"WP_{waypoints:03d}"
+    controller = RealTimeDroneController()
+    controller.data_file = os.path.join(workdir, f"saved_{size}.json")
+    controller.waypoints = recording
+
+    def load(path: str):
+        if not manager.load_waypoint_file(path, verbose=False):
+            raise RuntimeError(f"Could not load {path}")
+
+    def save():
+        with contextlib.redirect_stdout(io.StringIO()):
+            if not controller.save_to_json():
+                raise RuntimeError(f"Could not save {controller.data_file}")
+
+    results = {}
+    results['load_tmap'] = measure(lambda: load(map_path), repeat)
+    results['load_json'] = measure(lambda: load(json_path), repeat)
+    # Planning runs on the JSON load, where every movement is an object in memory
+    results['plan_forward'] = measure(lambda: manager.calculate_navigation_path(last, from_waypoint_id=first), repeat)
+    results['plan_reverse'] = measure(lambda: manager.calculate_navigation_path(first, from_waypoint_id=last), repeat)
+    sample: List[NavigationMovement] = list(manager._movements[:REVERSE_SAMPLE])
+    results['reverse'] = measure(lambda: [movement.reverse() for movement in sample], repeat)
+    results['reverse']['items'] = len(sample)
+    results['save_json'] = measure(save, repeat)
+    return {f"{operation}@{size}": result for operation, result in results.items()}
+
+
+# ---------------------------------------------------------------------- baseline
+
+def load_baseline(path: str) -> Dict[str, Dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f).get('results', {})
+
+
+def save_baseline(path: str, results: Dict[str, Dict]):
+    data = {
+        'recorded': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()}",
+        'results': {key: {name: round(value, 6 if name == 'peak_mb' else 3) if isinstance(value, float) else value
+                          for name, value in result.items()} for key, result in results.items()},
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def report(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float,
+           memory_tolerance: float) -> List[str]:
+    """Print the results next to the baseline; returns the regressed operations."""
+    regressions = []
+    print(f"{'operation':<32}{'median ms':>11}{'min ms':>10}{'peak MB':>10}{'vs baseline':>24}")
+    for key, result in results.items():
+        line = f"{key:<32}{result['median_ms']:>11.2f}{result['min_ms']:>10.2f}{result['peak_mb']:>10.2f}"
+        if 'items' in result:
+            line += f"  ({result['median_ms'] * 1000 / result['items']:.2f} µs each)"
+        reference = baseline.get(key)
+        if reference:
+            time_ratio = result['min_ms'] / reference['min_ms'] if reference['min_ms'] else 1.0
+            memory_ratio = result['peak_mb'] / reference['peak_mb'] if reference['peak_mb'] else 1.0
+            # The baseline's own median-over-best spread is noise, not slowdown
+            noise_ms = max(0.0, reference['median_ms'] - reference['min_ms'])
+            slower = (reference['min_ms'] >= MIN_GATED_MS
+                      and result['min_ms'] > reference['min_ms'] * (1 + tolerance) + noise_ms)
+            larger = reference['peak_mb'] >= MIN_GATED_MB and memory_ratio > 1 + memory_tolerance
+            regressed = slower or larger
+            time_text = f"x{time_ratio:.2f}" if reference['min_ms'] >= MIN_GATED_MS else "(not gated)"
+            memory_text = f"x{memory_ratio:.2f}" if reference['peak_mb'] >= MIN_GATED_MB else "(not gated)"
+            line += f"{'❌' if regressed else '  '} time {time_text}, memory {memory_text}"
+            if regressed:
+                regressions.append(key)
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark map load, planning and save on synthetic sessions')
+    parser.add_argument('--sizes', nargs='+', default=list(DEFAULT_SIZES), metavar='WAYPOINTSxMOVEMENTS',
+                        help='Synthetic session sizes (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per operation')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline file to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown of the best time over the baseline (0.25 = 25%%)')
+    parser.add_argument('--memory-tolerance', type=float, default=0.10, help='Allowed peak memory growth')
+    parser.add_argument('--generate', metavar='PATH', help='Only write one synthetic session to PATH')
+    parser.add_argument('--waypoints', type=int, default=1000, help='Waypoints of the --generate session')
+    parser.add_argument('--movements', type=int, default=10000, help='Movements of the --generate session')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the --generate session')
+    args = parser.parse_args()
+
+    if args.generate:
+        write_session(args.generate, args.waypoints, args.movements, args.seed)
+        print(f"✅ Wrote {args.waypoints} waypoints and {args.movements} movements to {args.generate}")
+        return
+
+    workdir = tempfile.mkdtemp(prefix="bench_data_paths_")
+    results: Dict[str, Dict] = {}
+    try:
+        for size in args.sizes:
+            waypoints, movements = parse_size(size)
+            print(f"⏱️  {waypoints} waypoints, {movements} movements...", file=sys.stderr)
+            results.update(bench_size(waypoints, movements, args.repeat, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = {} if args.save_baseline else load_baseline(args.baseline)
+    regressions = report(results, baseline, args.tolerance, args.memory_tolerance)
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"✅ Baseline saved to {args.baseline}")
+    elif not baseline:
+        print(f"ℹ️  No baseline at {args.baseline}; record one with --save-baseline")
+    if regressions:
+        print(f"❌ Regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark: time from a fresh interpreter to the main menu.
+
+Each run starts a new Python process that imports main.py and constructs
+TelloNavigationApp, which is everything that happens before the menu is
+shown. It also checks that the drone or video stack is not imported on
+the way, which should never happen before a drone is needed. A sys.meta_path
+blocker records every attempt to import those modules, so the check holds
+whether or not djitellopy, PyAV and OpenCV are installed.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--max-ms 300]
+
+Exits with status 1 if the median exceeds --max-ms (300 ms unless loosened)
+or a heavy module was imported, so it can guard against time-to-menu regressions.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay out of the path to the menu
+HEAVY_MODULES = ("djitellopy", "av", "cv2")
+DEFAULT_MAX_MS = 300.0  # Median time-to-menu budget
+
+_PROBE = """
+import json, sys, time
+heavy = {heavy!r}
+attempted = set()
+
+class HeavyImportBlocker:
+    def find_spec(self, name, path=None, target=None):
+        if name.split('.')[0] in heavy:
+            attempted.add(name.split('.')[0])
+            raise ImportError(name + " imported before the menu")
+        return None
+
+sys.meta_path.insert(0, HeavyImportBlocker())
+start = time.perf_counter()
+import main
+app = main.TelloNavigationApp()
+elapsed = time.perf_counter() - start
+attempted.update(name for name in heavy if name in sys.modules)
+print(json.dumps({{"ms": elapsed * 1000, "heavy": sorted(attempted)}}))
+"""
+
+
+def measure_once() -> dict:
+    """Run one fresh interpreter up to the menu and return its timing."""
+    result = subprocess.run([sys.executable, "-c", _PROBE.format(heavy=HEAVY_MODULES)], cwd=REPO,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure time-to-menu of main.py')
+    parser.add_argument('--runs', type=int, default=10, help='Fresh interpreters to start')
+    parser.add_argument('--max-ms', type=float, default=DEFAULT_MAX_MS,
+                        help='Fail if the median time-to-menu exceeds this (default: %(default)s)')
+    args = parser.parse_args()
+
+    samples, heavy = [], set()
+    for _ in range(args.runs):
+        sample = measure_once()
+        samples.append(sample['ms'])
+        heavy.update(sample['heavy'])
+
+    median = statistics.median(samples)
+    print(f"time-to-menu: median {median:.1f} ms, min {min(samples):.1f} ms, max {max(samples):.1f} ms "
+          f"({args.runs} runs)")
+    if heavy:
+        print(f"❌ Imported before the menu: {', '.join(sorted(heavy))}")
+    else:
+        print("✅ No drone or video modules imported before the menu")
+    slow = median > args.max_ms
+    if slow:
+        print(f"❌ Median time-to-menu over {args.max_ms:.0f} ms")
+
+    if heavy or slow:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
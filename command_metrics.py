@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Per-command latency instrumentation for drone clients.
+
+instrument() wraps the command methods of a djitellopy Tello or a TelloBridge
+in place, so every command the project issues is timed. That includes the
+ones the client sends internally, such as move_forward -> send_control_command.
+Commands are grouped by their SDK keyword ("forward", "cw", "battery?", "rc",
+...). For each keyword the metrics keep:
+
+- calls, failures and the time from send to acknowledgement (including
+  retries) in an HDR-style histogram
+- attempts and timeouts of the individual datagrams, so retries show up as
+  attempts beyond the calls
+
+Fixed waits (takeoff stabilization, settling after moves) are recorded the same
+way with record_wait(). The report at the end of a session shows which calls
+dominate the mission time. It is exported as JSON and can be merged across
+sessions:
+
+    python command_metrics.py command_timing_20250708_181217.json
+    python command_metrics.py command_timing_*.json
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+SUB_BUCKET_BITS = 8  # 256 exact microsecond buckets, then 128 per power of two (under 0.8% error)
+MAX_TRACKABLE_US = 3600 * 1_000_000  # Longer latencies are clamped to an hour
+TIMEOUT_MARKERS = ("did not receive a response", "timed out")  # djitellopy and TelloBridge wording
+
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_HALF_SUB_BUCKETS = _SUB_BUCKETS >> 1
+
+
+def metrics_path(timestamp: Optional[datetime] = None) -> str:
+    """Export file of a session, e.g. command_timing_20250708_181217.json."""
+    return f"command_timing_{(timestamp or datetime.now()).strftime('%Y%m%d_%H%M%S')}.json"
+
+
+def command_key(command: str) -> str:
+    """SDK keyword a command is grouped under ("cw 90" -> "cw")."""
+    return command.split(' ', 1)[0]
+
+
+def _is_timeout(text: str) -> bool:
+    text = text.lower()
+    return any(marker in text for marker in TIMEOUT_MARKERS)
+
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram over microseconds.
+
+    Values below 256 µs get a bucket each. Every larger power of two is
+    split into 128 buckets, so any recorded value is known to within 0.8%
+    with a few thousand counters, however long the session runs.
+    """
+
+    def __init__(self):
+        self.counts: List[int] = []
+        self.count = 0
+        self.total_us = 0
+        self.min_us = 0
+        self.max_us = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        if value < _SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        return _SUB_BUCKETS + (shift - 1) * _HALF_SUB_BUCKETS + (value >> shift) - _HALF_SUB_BUCKETS
+
+    @staticmethod
+    def _highest_value(index: int) -> int:
+        """Largest value that falls into a bucket."""
+        if index < _SUB_BUCKETS:
+            return index
+        shift, sub = divmod(index - _SUB_BUCKETS, _HALF_SUB_BUCKETS)
+        return ((sub + _HALF_SUB_BUCKETS + 1) << (shift + 1)) - 1
+
+    def record_us(self, value: int, count: int = 1):
+        value = min(max(int(value), 0), MAX_TRACKABLE_US)
+        index = self._index(value)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += count
+        self.min_us = value if not self.count else min(self.min_us, value)
+        self.max_us = max(self.max_us, value)
+        self.count += count
+        self.total_us += value * count
+
+    def record(self, seconds: float):
+        self.record_us(round(seconds * 1_000_000))
+
+    def percentile(self, percent: float) -> float:
+        """Latency in seconds that percent of the samples do not exceed."""
+        if not self.count:
+            return 0.0
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                return min(self._highest_value(index), self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    @property
+    def total_seconds(self) -> float:
+        return self.total_us / 1_000_000
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def merge(self, other: "LatencyHistogram"):
+        if not other.count:
+            return
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, bucket in enumerate(other.counts):
+            self.counts[index] += bucket
+        self.min_us = other.min_us if not self.count else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+        self.count += other.count
+        self.total_us += other.total_us
+
+    def to_dict(self) -> Dict:
+        """Summary in seconds plus the non-empty buckets as [highest value in µs, count] pairs."""
+        return {
+            'count': self.count,
+            'total_s': round(self.total_seconds, 6),
+            'mean_s': round(self.mean_seconds, 6),
+            'min_s': self.min_us / 1_000_000,
+            'p50_s': self.percentile(50),
+            'p90_s': self.percentile(90),
+            'p99_s': self.percentile(99),
+            'max_s': self.max_us / 1_000_000,
+            'buckets': [[self._highest_value(index), bucket] for index, bucket in enumerate(self.counts) if bucket],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        histogram = cls()
+        for value, count in data.get('buckets', []):
+            histogram.record_us(value, count)
+        # Exact figures; the bucket values above are only bucket bounds
+        if histogram.count:
+            histogram.total_us = round(data['total_s'] * 1_000_000)
+            histogram.min_us = round(data['min_s'] * 1_000_000)
+            histogram.max_us = round(data['max_s'] * 1_000_000)
+        return histogram
+
+
+@dataclass
+class CommandStats:
+    """Timing of one command keyword."""
+    calls: int = 0
+    failures: int = 0  # Calls that raised or answered an error
+    attempts: int = 0  # Datagrams that waited for an answer, retries included
+    timeouts: int = 0  # Attempts that got no answer in time
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    @property
+    def retries(self) -> int:
+        return max(0, self.attempts - self.calls)
+
+
+class CommandMetrics:
+    """Command and wait timings of one session (thread-safe)."""
+
+    def __init__(self):
+        self.commands: Dict[str, CommandStats] = {}
+        self.waits: Dict[str, LatencyHistogram] = {}
+        self.session_seconds = 0.0  # Set by finish() or loaded from an export
+        self.started = time.monotonic()
+        self.started_at = datetime.now()
+        self.clients = 0  # Drones instrumented; their command times overlap
+        self._lock = threading.Lock()
+
+    def _stats(self, command: str) -> CommandStats:
+        key = command_key(command)
+        stats = self.commands.get(key)
+        if stats is None:
+            stats = self.commands[key] = CommandStats()
+        return stats
+
+    def record_call(self, command: str, seconds: float, ok: bool = True):
+        with self._lock:
+            stats = self._stats(command)
+            stats.calls += 1
+            stats.failures += not ok
+            stats.latency.record(seconds)
+
+    def record_attempt(self, command: str, timed_out: bool = False):
+        with self._lock:
+            stats = self._stats(command)
+            stats.attempts += 1
+            stats.timeouts += timed_out
+
+    def record_wait(self, label: str, seconds: float):
+        """Record time spent in a fixed wait, e.g. stabilization after takeoff."""
+        with self._lock:
+            histogram = self.waits.get(label)
+            if histogram is None:
+                histogram = self.waits[label] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def finish(self):
+        """Freeze the session length used for the time shares."""
+        self.session_seconds = time.monotonic() - self.started
+
+    def elapsed(self) -> float:
+        return self.session_seconds or time.monotonic() - self.started
+
+    def drone_seconds(self) -> float:
+        """Session time summed over the drones, the basis of the time shares."""
+        return self.elapsed() * max(1, self.clients)
+
+    def merge(self, other: "CommandMetrics"):
+        with self._lock:
+            for key, theirs in other.commands.items():
+                stats = self._stats(key)
+                stats.calls += theirs.calls
+                stats.failures += theirs.failures
+                stats.attempts += theirs.attempts
+                stats.timeouts += theirs.timeouts
+                stats.latency.merge(theirs.latency)
+            for label, histogram in other.waits.items():
+                self.waits.setdefault(label, LatencyHistogram()).merge(histogram)
+            self.session_seconds += other.drone_seconds()
+
+    # ------------------------------------------------------------------ export
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            commands = {key: {'calls': stats.calls, 'failures': stats.failures, 'attempts': stats.attempts,
+                              'retries': stats.retries, 'timeouts': stats.timeouts,
+                              'latency': stats.latency.to_dict()}
+                        for key, stats in self.commands.items()}
+            waits = {label: histogram.to_dict() for label, histogram in self.waits.items()}
+        return {'started': self.started_at.isoformat(timespec='seconds'), 'session_s': round(self.elapsed(), 3),
+                'drones': self.clients, 'commands': commands, 'waits': waits}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CommandMetrics":
+        metrics = cls()
+        metrics.session_seconds = float(data.get('session_s', 0.0))
+        metrics.clients = int(data.get('drones', 1))
+        if 'started' in data:
+            metrics.started_at = datetime.fromisoformat(data['started'])
+        for key, values in data.get('commands', {}).items():
+            metrics.commands[key] = CommandStats(calls=values['calls'], failures=values['failures'],
+                                                 attempts=values['attempts'], timeouts=values['timeouts'],
+                                                 latency=LatencyHistogram.from_dict(values['latency']))
+        for label, values in data.get('waits', {}).items():
+            metrics.waits[label] = LatencyHistogram.from_dict(values)
+        return metrics
+
+    def save(self, path: str):
+        """Write the export atomically."""
+        temp_file = path + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(temp_file, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CommandMetrics":
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    # ------------------------------------------------------------------ report
+
+    def print_report(self):
+        """Commands and waits by total time, with their share of the session."""
+        basis = self.drone_seconds()
+        rows = [(key, stats.latency, stats) for key, stats in self.commands.items()]
+        rows += [(f"[{label}]", histogram, None) for label, histogram in self.waits.items()]
+        rows.sort(key=lambda row: row[1].total_us, reverse=True)
+        accounted = sum(histogram.total_seconds for _, histogram, _ in rows)
+        drones = f" ({self.clients} drones x {self.elapsed():.1f} s)" if self.clients > 1 else ""
+        print(f"\n⏱️  Command timing: {accounted:.1f} s of {basis:.1f} s session{drones} in commands and waits")
+        if not rows:
+            return
+        print(f"  {'command':<24}{'calls':>7}{'total s':>9}{'share':>7}{'mean':>8}{'p50':>8}{'p90':>8}"
+              f"{'p99':>8}{'max':>8}{'retry':>7}{'t/o':>5}{'fail':>5}")
+        for name, histogram, stats in rows:
+            share = histogram.total_seconds / basis * 100 if basis > 0 else 0.0
+            counters = (f"{stats.retries:>7}{stats.timeouts:>5}{stats.failures:>5}" if stats is not None else "")
+            print(f"  {name:<24}{histogram.count:>7}{histogram.total_seconds:>9.1f}{share:>6.1f}%"
+                  f"{histogram.mean_seconds:>8.3f}{histogram.percentile(50):>8.3f}{histogram.percentile(90):>8.3f}"
+                  f"{histogram.percentile(99):>8.3f}{histogram.max_us / 1_000_000:>8.3f}{counters}")
+
+
+# ---------------------------------------------------------------------- instrumentation
+
+# Public entry points that issue one command (or wait for one); timed as calls
+CALL_METHODS = ('send_control_command', 'send_read_command', 'send_command_with_return',
+                'send_command_without_return')
+
+
+def instrument(drone, metrics: CommandMetrics):
+    """
+    Time every command a djitellopy Tello or TelloBridge sends.
+
+    Methods are replaced on the instance, so the client's own internal
+    calls (takeoff -> send_control_command -> send_command_with_return) go
+    through the timers too. Only the outermost call on a thread is timed as
+    a call. Attempts are counted where each datagram is sent: in
+    send_command_with_return for djitellopy, and in the asyncio client's
+    send_command for TelloBridge.
+    """
+    metrics.clients += 1
+    local = threading.local()
+    async_client = getattr(drone, 'client', None)
+    bridged = async_client is not None and hasattr(async_client, 'send_command')
+
+    def timed(method, command_of, counts_attempt=False):
+        def wrapper(*args, **kwargs):
+            command = command_of(*args, **kwargs)
+            if getattr(local, 'busy', False):
+                result = method(*args, **kwargs)  # Issued by an outer call that is already timed
+                if counts_attempt:
+                    metrics.record_attempt(command, timed_out=_is_timeout(str(result)))
+                return result
+            local.busy = True
+            start = time.monotonic()
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                metrics.record_call(command, time.monotonic() - start, ok=False)
+                if counts_attempt:
+                    metrics.record_attempt(command, timed_out=_is_timeout(str(e)))
+                raise
+            finally:
+                local.busy = False
+            text = str(result)
+            ok = result is not False and not text.lower().startswith(('error', 'aborting')) and not _is_timeout(text)
+            metrics.record_call(command, time.monotonic() - start, ok=ok)
+            if counts_attempt:
+                metrics.record_attempt(command, timed_out=_is_timeout(text))
+            return result
+        return wrapper
+
+    def first_argument(command, *args, **kwargs):
+        return command
+
+    for name in CALL_METHODS:
+        method = getattr(drone, name, None)
+        if method is not None:
+            counts_attempt = name == 'send_command_with_return' and not bridged
+            setattr(drone, name, timed(method, first_argument, counts_attempt))
+    # rc setpoints are fire-and-forget; djitellopy sends them through send_command_without_return
+    drone.send_rc_control = timed(drone.send_rc_control, lambda *args, **kwargs: 'rc')
+    # TelloBridge.connect sends "command" from the event loop, not through the methods above
+    drone.connect = timed(drone.connect, lambda *args, **kwargs: 'command')
+
+    if bridged:
+        send_command = async_client.send_command
+
+        async def send_attempt(command: str, timeout: Optional[float] = None) -> str:
+            try:
+                response = await send_command(command, timeout)
+            except Exception as e:
+                metrics.record_attempt(command, timed_out=_is_timeout(str(e)))
+                raise
+            metrics.record_attempt(command)
+            return response
+
+        async_client.send_command = send_attempt
+    return drone
+
+
+def load_many(paths: Iterable[str]) -> CommandMetrics:
+    """Merge several exports, skipping unreadable ones."""
+    merged = CommandMetrics()
+    for path in paths:
+        try:
+            merged.merge(CommandMetrics.load(path))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️  Skipping {path}: {e}")
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show command timing exported by main.py or swarm_navigation.py')
+    parser.add_argument('files', nargs='+', help='command_timing_*.json exports (merged into one report)')
+    args = parser.parse_args()
+    load_many(args.files).print_report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Flight-time cost model for compiled navigation plans.
+
+Each command is modelled as a fixed overhead (acknowledgement, acceleration
+and braking) plus a rate term:
+
+    rotation:     overhead + angle / rotation_rate
+    translation:  overhead + scale * distance / commanded_speed + settle_time
+
+Smoothed plans only settle before rotations and at the end.
+
+The parameters start from nominal values and are refitted by least squares
+from the command latencies recorded during navigation, which are kept in
+flight_cost_model.json between runs.
+"""
+import json
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+from plan_compiler import CompiledPlan, PlanCommand, normalize_angle
+
+DEFAULT_FILE = "flight_cost_model.json"
+UNKNOWN_TURN = 90.0  # Mean turn (degrees) from a heading that is not known in advance
+MIN_SAMPLES = 3  # Samples of a kind needed before its parameters are refitted
+
+ROTATION = "rotation"
+TRANSLATION = "translation"
+SETTLE = "settle"
+
+
+@dataclass
+class PlanEstimate:
+    """Predicted duration of a compiled plan, in seconds."""
+    command_seconds: List[float]
+    rotation_seconds: float = 0.0
+    translation_seconds: float = 0.0
+    settle_seconds: float = 0.0
+
+    @property
+    def total_seconds(self) -> float:
+        return self.rotation_seconds + self.translation_seconds + self.settle_seconds
+
+    def describe(self) -> str:
+        return (f"~{self.total_seconds:.0f} s (rotations {self.rotation_seconds:.0f} s, "
+                f"moves {self.translation_seconds:.0f} s, settling {self.settle_seconds:.0f} s)")
+
+
+@dataclass
+class FlightCostModel:
+    """Per-command and per-plan duration estimates, calibrated from recorded latencies."""
+    rotation_rate: float = 90.0  # degrees/s while turning
+    rotation_overhead: float = 0.8  # s per rotation command
+    move_scale: float = 1.2  # Actual flight time over distance / commanded speed (acceleration, braking)
+    move_overhead: float = 1.0  # s per translation command
+    settle_time: float = 0.5  # s of hover after each translation
+    max_samples: int = 500  # Latest samples kept per kind
+    samples: Dict[str, Deque[Tuple[float, float]]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.samples = {kind: deque(self.samples.get(kind, ()), maxlen=self.max_samples)
+                        for kind in (ROTATION, TRANSLATION, SETTLE)}
+
+    # ------------------------------------------------------------------ estimates
+
+    def estimate_command(self, command: PlanCommand, speed: float, heading: Optional[float] = None) -> float:
+        """
+        Duration of one command in seconds.
+
+        Args:
+            command: Command to estimate
+            speed: Speed (cm/s) set for move_* commands; go/curve commands carry their own
+            heading: Heading before the command, None if unknown
+        """
+        if command.name == "rotate_to":
+            turn = UNKNOWN_TURN if heading is None else abs(normalize_angle(command.args[0] - heading))
+            if turn < 1:
+                return 0.0  # _rotate_to skips turns below a degree
+            return self.rotation_overhead + turn / self.rotation_rate
+        return (self.move_overhead + self.move_scale * command.distance / (command.commanded_speed or speed)
+                + self.settle_time)
+
+    def estimate_plan(self, plan: CompiledPlan, speed: float, start_heading: Optional[float] = None) -> PlanEstimate:
+        """Duration of a whole plan, following the heading from command to command."""
+        estimate = PlanEstimate(command_seconds=[])
+        heading = start_heading
+        for i, command in enumerate(plan.commands, 1):
+            seconds = self.estimate_command(command, speed, heading)
+            if command.name == "rotate_to":
+                estimate.rotation_seconds += seconds
+                heading = command.args[0]
+            elif plan.smooth and i < len(plan.commands) and plan.commands[i].name != "rotate_to":
+                seconds -= self.settle_time  # Chained into the next translation
+                estimate.translation_seconds += seconds
+            else:
+                estimate.translation_seconds += seconds - self.settle_time
+                estimate.settle_seconds += self.settle_time
+            estimate.command_seconds.append(seconds)
+        return estimate
+
+    # ------------------------------------------------------------------ calibration
+
+    def record_rotation(self, degrees: float, seconds: float):
+        self.samples[ROTATION].append((abs(degrees), seconds))
+
+    def record_translation(self, distance: float, speed: float, seconds: float):
+        """Record a move; stored as (distance / commanded speed, duration) so any speed calibrates the same fit."""
+        self.samples[TRANSLATION].append((distance / speed, seconds))
+
+    def record_settle(self, seconds: float):
+        self.samples[SETTLE].append((0.0, seconds))
+
+    @staticmethod
+    def _fit(samples) -> Optional[Tuple[float, float]]:
+        """Least-squares (intercept, slope) of duration over amount, or None if underdetermined."""
+        if len(samples) < MIN_SAMPLES:
+            return None
+        n = len(samples)
+        mean_x = sum(x for x, _ in samples) / n
+        mean_y = sum(y for _, y in samples) / n
+        var_x = sum((x - mean_x) ** 2 for x, _ in samples)
+        if var_x <= 1e-9:
+            return None
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in samples) / var_x
+        return mean_y - slope * mean_x, slope
+
+    def calibrate(self) -> bool:
+        """Refit the parameters from the recorded samples; returns True if anything changed."""
+        changed = False
+        fit = self._fit(self.samples[ROTATION])
+        if fit is not None and fit[1] > 0:
+            self.rotation_overhead, self.rotation_rate = max(0.0, fit[0]), 1.0 / fit[1]
+            changed = True
+        fit = self._fit(self.samples[TRANSLATION])
+        if fit is not None and fit[1] > 0:
+            self.move_overhead, self.move_scale = max(0.0, fit[0]), fit[1]
+            changed = True
+        if len(self.samples[SETTLE]) >= MIN_SAMPLES:
+            self.settle_time = sum(seconds for _, seconds in self.samples[SETTLE]) / len(self.samples[SETTLE])
+            changed = True
+        return changed
+
+    def describe(self) -> str:
+        counts = ", ".join(f"{len(self.samples[kind])} {kind}" for kind in (ROTATION, TRANSLATION, SETTLE))
+        return (f"rotation {self.rotation_rate:.0f}°/s + {self.rotation_overhead:.2f} s, "
+                f"moves x{self.move_scale:.2f} + {self.move_overhead:.2f} s, settle {self.settle_time:.2f} s "
+                f"(samples: {counts})")
+
+    # ------------------------------------------------------------------ persistence
+
+    def save(self, path: str = DEFAULT_FILE):
+        """Write parameters and samples atomically."""
+        data = {
+            'rotation_rate': self.rotation_rate,
+            'rotation_overhead': self.rotation_overhead,
+            'move_scale': self.move_scale,
+            'move_overhead': self.move_overhead,
+            'settle_time': self.settle_time,
+            'samples': {kind: [list(sample) for sample in samples] for kind, samples in self.samples.items()},
+        }
+        temp_file = path + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_file, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_FILE) -> "FlightCostModel":
+        """Load a saved calibration, or the nominal model if there is none (or it is unreadable)."""
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            samples = {kind: [tuple(sample) for sample in values] for kind, values in data.pop('samples', {}).items()}
+            return cls(samples=samples, **{key: float(value) for key, value in data.items()})
+        except (OSError, ValueError, TypeError) as e:
+            print(f"⚠️  Ignoring flight cost calibration {path}: {e}")
+            return cls()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Video frame ring buffer and background snapshot capture.
+
+FrameRing keeps the latest decoded frames in one preallocated NumPy array.
+FrameCapture decodes the Tello's H.264 stream (UDP 11111) with PyAV on its
+own thread into the ring. capture() hands the newest slot to an encoder
+thread: the caller only pins the slot and queues it, with no copy,
+encoding or disk access. A pinned slot is skipped by the decoder until
+OpenCV has written it as a JPEG or PNG.
+
+PyAV and OpenCV (both djitellopy dependencies) are imported by the threads
+that use them, so nothing here slows down start-up.
+"""
+import os
+import queue
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+VIDEO_ADDRESS = "udp://@0.0.0.0:11111"  # Where the Tello sends its video stream
+FRAME_SHAPE = (720, 960, 3)  # Tello video, stored as BGR
+DEFAULT_CAPACITY = 32  # Frames kept, about a second of video
+STREAM_TIMEOUT = 5.0  # Seconds to wait for the first video packet
+JPEG_QUALITY = 90
+
+
+def snapshot_path(data_file: str, waypoint_id: str, suffix: str = "", image_format: str = "jpg") -> str:
+    """Snapshot file next to a session file, e.g. drone_movements_X_WP_002.jpg."""
+    return f"{os.path.splitext(data_file)[0]}_{waypoint_id}{suffix}.{image_format}"
+
+
+class FrameRing:
+    """
+    Fixed set of frame slots in one preallocated array.
+
+    The writer fills the next slot that is neither pinned nor the newest
+    frame, so readers of the newest frame or of a pinned slot always see a
+    complete image. Only slot bookkeeping happens under the lock; frames
+    are copied and read outside it.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, shape: Tuple[int, int, int] = FRAME_SHAPE):
+        if capacity < 3:
+            raise ValueError("A frame ring needs at least 3 slots")
+        self.capacity = capacity
+        self.shape = shape
+        self.frames = np.zeros((capacity,) + tuple(shape), dtype=np.uint8)
+        self.timestamps = np.zeros(capacity)
+        self.sequence = np.full(capacity, -1, dtype=np.int64)  # Frame number per slot, -1 while written
+        self.frame_count = 0
+        self.dropped = 0  # Frames lost because every other slot was pinned
+        self._pins = [0] * capacity
+        self._latest = -1
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def acquire_slot(self) -> Optional[int]:
+        """Reserve the next writable slot, or None if all of them are in use."""
+        with self._lock:
+            for offset in range(self.capacity):
+                slot = (self._next + offset) % self.capacity
+                if slot != self._latest and not self._pins[slot]:
+                    self.sequence[slot] = -1
+                    self._next = (slot + 1) % self.capacity
+                    return slot
+            self.dropped += 1
+            return None
+
+    def publish(self, slot: int, timestamp: float):
+        """Make a filled slot the newest frame."""
+        with self._lock:
+            self.frame_count += 1
+            self.sequence[slot] = self.frame_count
+            self.timestamps[slot] = timestamp
+            self._latest = slot
+
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None) -> bool:
+        """Copy a decoded frame into the ring; False if it had to be dropped."""
+        slot = self.acquire_slot()
+        if slot is None:
+            return False
+        np.copyto(self.frames[slot], frame)
+        self.publish(slot, time.monotonic() if timestamp is None else timestamp)
+        return True
+
+    def pin_latest(self) -> Optional[Tuple[int, float]]:
+        """Keep the newest frame from being overwritten; returns (slot, timestamp) or None before any frame."""
+        with self._lock:
+            if self._latest < 0:
+                return None
+            self._pins[self._latest] += 1
+            return self._latest, float(self.timestamps[self._latest])
+
+    def unpin(self, slot: int):
+        with self._lock:
+            self._pins[slot] -= 1
+
+    def view(self, slot: int) -> np.ndarray:
+        """Read-only view of a slot (pin it first unless it is only glanced at)."""
+        frame = self.frames[slot]
+        frame.flags.writeable = False
+        return frame
+
+    def latest(self) -> Optional[Tuple[np.ndarray, float]]:
+        """Newest frame and its time.monotonic() timestamp, as a view into the ring."""
+        with self._lock:
+            if self._latest < 0:
+                return None
+            return self.view(self._latest), float(self.timestamps[self._latest])
+
+
+class FrameCapture:
+    """Decodes the video stream into a FrameRing and writes snapshots in the background."""
+
+    def __init__(self, drone_instance=None, capacity: int = DEFAULT_CAPACITY, address: str = VIDEO_ADDRESS,
+                 image_format: str = "jpg"):
+        """
+        Initialize the capture.
+
+        Args:
+            drone_instance: Connected Tello (or compatible) instance, asked to stream video
+            capacity: Frames kept in the ring
+            address: PyAV input of the video stream
+            image_format: "jpg" or "png"
+        """
+        self.drone_instance = drone_instance
+        self.ring = FrameRing(capacity)
+        self.address = address
+        self.image_format = image_format
+        self.snapshots_written = 0
+        self._jobs: "queue.Queue[Optional[Tuple[int, str, Optional[Callable]]]]" = queue.Queue()
+        self._running = False
+        self._decoder: Optional[threading.Thread] = None
+        self._encoder: Optional[threading.Thread] = None
+
+    def start(self):
+        """Turn the video stream on and start the decoder and encoder threads."""
+        if self._running:
+            return
+        if self.drone_instance is not None:
+            self.drone_instance.streamon()
+        self._running = True
+        self._decoder = threading.Thread(target=self._decode_loop, name="FrameDecoder", daemon=True)
+        self._encoder = threading.Thread(target=self._encode_loop, name="SnapshotEncoder", daemon=True)
+        self._decoder.start()
+        self._encoder.start()
+
+    def stop(self):
+        """Write the queued snapshots, stop both threads and turn the stream off."""
+        if not self._running:
+            return
+        self._running = False
+        self._jobs.put(None)
+        for thread in (self._decoder, self._encoder):
+            thread.join(timeout=STREAM_TIMEOUT + 1)
+        self._decoder = self._encoder = None
+        if self.drone_instance is not None:
+            try:
+                self.drone_instance.streamoff()
+            except Exception as e:
+                print(f"⚠️  Could not stop the video stream: {e}")
+
+    def capture(self, path: str, on_frame: Optional[Callable[[np.ndarray], None]] = None) -> bool:
+        """
+        Queue the newest frame to be written to path.
+
+        Only pins a ring slot and enqueues it, so it is safe to call from
+        the key loop. on_frame, if given, is called with the frame on the
+        encoder thread before it is written. Returns False if no frame has
+        been decoded yet.
+        """
+        pinned = self.ring.pin_latest()
+        if pinned is None:
+            return False
+        self._jobs.put((pinned[0], path, on_frame))
+        return True
+
+    def flush(self):
+        """Wait until every queued snapshot has been handled."""
+        if self._running:
+            self._jobs.join()
+
+    def _decode_loop(self):
+        """Decode frames straight into the ring at its resolution."""
+        try:
+            import av  # Video stack, only needed once the stream runs
+            height, width = self.ring.shape[:2]
+            container = av.open(self.address + "?overrun_nonfatal=1&fifo_size=5000",
+                                timeout=(STREAM_TIMEOUT, None))
+        except Exception as e:
+            print(f"\r❌ Video stream unavailable, snapshots disabled: {e}")
+            return
+        try:
+            for frame in container.decode(video=0):
+                if not self._running:
+                    break
+                self.ring.write(frame.to_ndarray(width=width, height=height, format="bgr24"))
+        except Exception as e:
+            if self._running:
+                print(f"\r⚠️  Video decoding stopped: {e}")
+        finally:
+            container.close()
+
+    def _encode_loop(self):
+        """Write pinned frames to disk and release their slots."""
+        try:
+            import cv2
+        except ImportError as e:
+            print(f"\r❌ OpenCV unavailable, snapshots disabled: {e}")
+            cv2 = None
+        if self.image_format == "jpg":
+            params = [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY] if cv2 is not None else []
+        else:
+            params = []
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                self._jobs.task_done()
+                break
+            slot, path, on_frame = job
+            try:
+                if on_frame is not None:
+                    on_frame(self.ring.view(slot))
+                if cv2 is not None and cv2.imwrite(path, self.ring.view(slot), params):
+                    self.snapshots_written += 1
+                elif cv2 is not None:
+                    print(f"\r⚠️  Could not write snapshot {path}")
+            except Exception as e:
+                print(f"\r⚠️  Snapshot {path} failed: {e}")
+            finally:
+                self.ring.unpin(slot)
+                self._jobs.task_done()
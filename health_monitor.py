@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from async_tello import TelloBridge
+from telemetry import TelemetryCache
+
+OK = "ok"
+WARNING = "warning"
+CRITICAL = "critical"
+_SEVERITY = {OK: 0, WARNING: 1, CRITICAL: 2}
+
+
+@dataclass
+class HealthEvent:
+    """A change in the level of one health alarm."""
+    source: str  # "battery", "temperature" or "link"
+    level: str  # OK, WARNING or CRITICAL
+    value: float
+    message: str
+    timestamp: float
+
+
+class HysteresisAlarm:
+    """
+    Two-threshold alarm that only steps back down once the value has
+    recovered past the threshold by a margin, so readings hovering around
+    a limit do not flap between levels.
+    """
+
+    def __init__(self, warning: float, critical: float, margin: float, higher_is_worse: bool = False):
+        self.warning = warning
+        self.critical = critical
+        self.margin = margin
+        self.higher_is_worse = higher_is_worse
+        self.level = OK
+
+    def _worse_than(self, value: float, threshold: float) -> bool:
+        return value >= threshold if self.higher_is_worse else value < threshold
+
+    def _recovered_from(self, value: float, threshold: float) -> bool:
+        if self.higher_is_worse:
+            return value < threshold - self.margin
+        return value >= threshold + self.margin
+
+    def update(self, value: float) -> Optional[str]:
+        """Feed a reading; return the new level if it changed, otherwise None."""
+        level = self.level
+        if self._worse_than(value, self.critical):
+            level = CRITICAL
+        elif self._worse_than(value, self.warning):
+            if level == OK or (level == CRITICAL and self._recovered_from(value, self.critical)):
+                level = WARNING
+        else:
+            if level == CRITICAL and self._recovered_from(value, self.critical):
+                level = WARNING
+            if level == WARNING and self._recovered_from(value, self.warning):
+                level = OK
+
+        if level != self.level:
+            self.level = level
+            return level
+        return None
+
+
+class HealthMonitor:
+    """
+    Tracks battery, temperature and link health in a background thread.
+
+    Readings come from the telemetry cache while the state stream is fresh.
+    Otherwise the monitor thread sends a battery? query, but only through a
+    client that matches responses to commands (TelloBridge); on djitellopy a
+    query could take the "ok" of a move running on another thread, so there
+    the link alarm is left to escalate instead. Level changes are pushed to
+    a queue the UI drains without waiting on the drone.
+    """
+
+    def __init__(self, telemetry: Optional[TelemetryCache] = None, drone_instance=None, interval: float = 1.0,
+                 battery_warning: float = 20, battery_critical: float = 10,
+                 temperature_warning: float = 80, temperature_critical: float = 88,
+                 link_warning: float = 3.0, link_critical: float = 10.0):
+        """
+        Initialize the monitor.
+
+        Args:
+            telemetry: Shared telemetry cache (preferred source of readings)
+            drone_instance: Drone to query when the state stream is stale (TelloBridge only)
+            interval: Seconds between health samples
+            battery_warning/battery_critical: Battery percentages that raise alarms
+            temperature_warning/temperature_critical: Highest motor temperatures (°C) that raise alarms
+            link_warning/link_critical: Seconds without contact that raise alarms
+        """
+        self.telemetry = telemetry
+        self.drone_instance = drone_instance or (telemetry.drone_instance if telemetry else None)
+        self.interval = interval
+
+        self.alarms = {
+            'battery': HysteresisAlarm(battery_warning, battery_critical, margin=3),
+            'temperature': HysteresisAlarm(temperature_warning, temperature_critical, margin=3, higher_is_worse=True),
+            'link': HysteresisAlarm(link_warning, link_critical, margin=1, higher_is_worse=True),
+        }
+        self.readings = {'battery': None, 'temperature': None, 'link': 0.0}
+        self.events: "queue.Queue[HealthEvent]" = queue.Queue()
+
+        self._last_contact = time.monotonic()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start sampling in the background."""
+        if self._running:
+            return
+        self._running = True
+        self._last_contact = time.monotonic()
+        self._thread = threading.Thread(target=self._monitor_loop, name="HealthMonitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+
+    def _monitor_loop(self):
+        while self._running:
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"\r⚠️  Health monitor error: {e}")
+            time.sleep(self.interval)
+
+    def sample(self):
+        """Take one set of readings and update the alarms."""
+        now = time.monotonic()
+        battery = temperature = None
+
+        if self.telemetry is not None and self.telemetry.is_fresh():
+            snapshot = self.telemetry.snapshot()['state']
+            battery = snapshot.get('bat')
+            temperature = snapshot.get('temph')
+            self._last_contact = now
+        elif isinstance(self.drone_instance, TelloBridge):
+            # No fresh state stream: a battery query doubles as the link check
+            try:
+                battery = self.drone_instance.get_battery()
+                self._last_contact = now
+            except Exception:
+                pass
+
+        self._update('battery', battery)
+        self._update('temperature', temperature)
+        self._update('link', now - self._last_contact)
+
+    def _update(self, source: str, value: Optional[float]):
+        if value is None:
+            return
+        self.readings[source] = value
+        level = self.alarms[source].update(value)
+        if level is not None:
+            self.events.put(HealthEvent(source=source, level=level, value=value,
+                                        message=self._describe(source, level, value), timestamp=time.time()))
+
+    @staticmethod
+    def _describe(source: str, level: str, value: float) -> str:
+        if source == 'battery':
+            text = {OK: "Battery recovered", WARNING: "Low battery", CRITICAL: "CRITICAL: Battery too low"}[level]
+            return f"{text} ({int(value)}%)"
+        if source == 'temperature':
+            text = {OK: "Temperature normal", WARNING: "High temperature", CRITICAL: "CRITICAL: Overheating"}[level]
+            return f"{text} ({int(value)}°C)"
+        text = {OK: "Link restored", WARNING: "Link degraded", CRITICAL: "CRITICAL: Link lost"}[level]
+        return f"{text} ({value:.1f}s since last contact)"
+
+    def poll_events(self) -> List[HealthEvent]:
+        """Return all pending events without blocking."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    @property
+    def level(self) -> str:
+        """Worst level across all alarms."""
+        return max((alarm.level for alarm in self.alarms.values()), key=_SEVERITY.get)
+
+    @property
+    def is_critical(self) -> bool:
+        return self.level == CRITICAL
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+import queue
+from collections import deque
+import select
+import sys
+import termios
+import time
+import tty
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class KeyEvent:
+    """A key press or release with the moment it happened (time.monotonic())."""
+    key: str  # 'w', 'a', 's', 'd', 'x', 'q', 'up', 'down', 'left', 'right', ...
+    pressed: bool
+    timestamp: float
+
+
+class TermiosBackend:
+    """
+    Terminal input in raw mode, the fallback that works everywhere (SSH, WSL2).
+
+    A terminal only delivers characters, so a press is the first character
+    of a key and a release is inferred once its autorepeat stops for
+    release_timeout. The release therefore lands late, and halt_delay keeps
+    the distance estimate calibrated for that.
+    """
+
+    name = "termios"
+    halt_delay = 0.5  # Seconds the drone keeps flying between the real release and its detection
+
+    def __init__(self, release_timeout: float = 0.5):
+        self.release_timeout = release_timeout
+        self._old_settings = None
+        self._active_key: Optional[str] = None
+        self._last_char_time = 0.0
+        self._pending: "deque[KeyEvent]" = deque()  # Events already inferred, returned before reading stdin
+
+    def start(self):
+        self._old_settings = termios.tcgetattr(sys.stdin)
+        tty.setraw(sys.stdin)
+
+    def stop(self):
+        if self._old_settings is not None:
+            termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self._old_settings)
+            self._old_settings = None
+
+    def suspend(self):
+        """Give the terminal back for line input (e.g. naming a waypoint)."""
+        self.stop()
+        self._active_key = None
+        self._pending.clear()
+
+    def resume(self):
+        self.start()
+
+    def _read_key(self, timeout: float) -> Optional[str]:
+        """Read a single key without blocking longer than timeout."""
+        if select.select([sys.stdin], [], [], timeout) == ([sys.stdin], [], []):
+            # Read a single character from stdin
+            key = sys.stdin.read(1).lower()
+
+            if key == '\x1b':
+
+                time.sleep(0.02)  # Allow time for escape sequence
+                if select.select([sys.stdin], [], [], 0.1)[0]:
+                    bracket = sys.stdin.read(1)
+                    if bracket == '[' and select.select([sys.stdin], [], [], 0.1)[0]:
+                        arrow = sys.stdin.read(1)
+                        arrow_map = {
+                            'A': 'up',  # Up arrow
+                            'B': 'down',  # Down arrow
+                            'C': 'right',  # Right arrow
+                            'D': 'left'   # Left arrow
+                        }
+                        return arrow_map.get(arrow, 'unknown_key')
+                return 'incomplete'
+            elif key == '[':
+                # Ignore the alphebet key character that follows
+                if select.select([sys.stdin], [], [], 0.1)[0]:
+                    sys.stdin.read(1)
+                return 'ignored_key'
+            else:
+                return key  # Regular key press
+        return None
+
+    def read_event(self, timeout: float = 0.05) -> Optional[KeyEvent]:
+        """Return the next press/release event, or None if nothing happened within timeout."""
+        if self._pending:
+            return self._pending.popleft()
+        now = time.monotonic()
+        if self._active_key is not None:
+            # Wait at most until the active key would count as released
+            timeout = max(0.0, min(timeout, self._last_char_time + self.release_timeout - now))
+
+        key = self._read_key(timeout)
+        now = time.monotonic()
+
+        if key is None:
+            if self._active_key is not None and now - self._last_char_time >= self.release_timeout:
+                released, self._active_key = self._active_key, None
+                return KeyEvent(released, pressed=False, timestamp=now)
+            return None
+
+        self._last_char_time = now
+        if key == self._active_key:
+            return None  # Autorepeat of the held key
+
+        if self._active_key is not None:
+            # A different key arrived: report the release first and the new press on the next call
+            released, self._active_key = self._active_key, key
+            self._pending.append(KeyEvent(key, pressed=True, timestamp=now))
+            return KeyEvent(released, pressed=False, timestamp=now)
+
+        self._active_key = key
+        return KeyEvent(key, pressed=True, timestamp=now)
+
+
+class KeyboardBackend:
+    """
+    Real press/release events from the `keyboard` package (reads /dev/input,
+    needs root on Linux). Events are timestamped in the hook thread, so
+    durations are measured, not inferred from autorepeat.
+    """
+
+    name = "keyboard"
+    halt_delay = 0.0
+
+    def __init__(self):
+        import keyboard  # Optional dependency, only needed for this backend
+        self._keyboard = keyboard
+        self._events: "queue.Queue[KeyEvent]" = queue.Queue()
+        self._pressed = set()
+        self._hook = None
+        self._suspended = False
+        self._old_settings = None
+
+    def _on_event(self, event):
+        if self._suspended or not event.name:
+            return
+        key = event.name.lower()
+        # keyboard timestamps with time.time(); shift onto the monotonic clock
+        timestamp = time.monotonic() - max(0.0, time.time() - event.time)
+        if event.event_type == 'down':
+            if key in self._pressed:
+                return  # Autorepeat
+            self._pressed.add(key)
+            self._events.put(KeyEvent(key, pressed=True, timestamp=timestamp))
+        elif key in self._pressed:
+            self._pressed.discard(key)
+            self._events.put(KeyEvent(key, pressed=False, timestamp=timestamp))
+
+    def start(self):
+        self._hook = self._keyboard.hook(self._on_event)
+        self._quiet_terminal()
+
+    def stop(self):
+        if self._hook is not None:
+            self._keyboard.unhook(self._hook)
+            self._hook = None
+        self._restore_terminal()
+
+    def suspend(self):
+        """Ignore keys and give the terminal back for line input."""
+        self._suspended = True
+        self._pressed.clear()
+        self._restore_terminal()
+
+    def resume(self):
+        self._quiet_terminal()
+        self._suspended = False
+
+    def _quiet_terminal(self):
+        """Stop the keys the hook sees from also echoing into the terminal."""
+        if sys.stdin.isatty():
+            self._old_settings = termios.tcgetattr(sys.stdin)
+            tty.setcbreak(sys.stdin)
+            attributes = termios.tcgetattr(sys.stdin)
+            attributes[3] &= ~termios.ECHO
+            termios.tcsetattr(sys.stdin, termios.TCSADRAIN, attributes)
+
+    def _restore_terminal(self):
+        if self._old_settings is not None:
+            termios.tcflush(sys.stdin, termios.TCIFLUSH)  # Drop keys typed while flying
+            termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self._old_settings)
+            self._old_settings = None
+
+    def read_event(self, timeout: float = 0.05) -> Optional[KeyEvent]:
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def create_input_backend(name: str = "auto"):
+    """
+    Create an input backend by name.
+
+    "auto" tries real key events first and falls back to the terminal when
+    the keyboard package is missing or cannot access the input devices.
+    """
+    if name in ("auto", "keyboard"):
+        try:
+            backend = KeyboardBackend()
+            # Probe access to the input devices now rather than mid-flight
+            backend._keyboard.unhook(backend._keyboard.hook(lambda event: None))
+            return backend
+        except Exception as e:
+            if name == "keyboard":
+                raise
+            print(f"ℹ️  Key event backend unavailable ({e}), using terminal input")
+    return TermiosBackend()
@@ -18,30 +18,74 @@ import os
 import sys
 import time
 import threading
+from datetime import datetime
 from typing import Optional
-from djitellopy import Tello
 
 # Added current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from realtime_drone_control import RealTimeDroneController
 from navigation_interface import NavigationInterface
+from health_monitor import HealthMonitor
+from movement_journal import find_unfinished_journals
+from session_catalog import SessionCatalog
+from odometry import OdometryEngine
+from frame_capture import FrameCapture
+from command_metrics import CommandMetrics, instrument, metrics_path
+from telemetry import TelemetryCache
+from telemetry_recorder import EXTENSION as TELEMETRY_LOG_EXTENSION, TelemetryRecorder, telemetry_path_for
+from plan_compiler import HeadingStrategy
+from waypoint_navigation import RouteMode
+
+# Same defaults as djitellopy's Tello.TELLO_IP and Tello.CONTROL_UDP_PORT, kept here so
+# the drone stack is only imported once a drone is actually needed
+TELLO_IP = "192.168.10.1"
+TELLO_CONTROL_PORT = 8889
 
 
 class TelloNavigationApp:
     """Main application class for Tello navigation system."""
 
-    def __init__(self, environment_mod: bool = False):
+    def __init__(self, environment_mod: bool = False, host: str = TELLO_IP, port: int = TELLO_CONTROL_PORT,
+                 route_mode: RouteMode = RouteMode.CHAIN, client: str = "djitellopy", input_backend: str = "auto",
+                 rc_rate: float = 20.0, heading_strategy: HeadingStrategy = HeadingStrategy.TURN,
+                 smooth: bool = False, snapshots: bool = False, record_telemetry: bool = True):
         """
         Initialize the navigation application.
         
         Args:
             environment_mod: If True, enables environment modification mode
+            host: IP address of the drone (or of a tello_simulator.py instance)
+            port: Command port of the drone
+            route_mode: Initial navigation route mode (chain replay or direct)
+            client: "djitellopy" for the blocking SDK client, "asyncio" for the pipelined TelloBridge
+            input_backend: Mapping mode key input: "auto", "keyboard" or "termios"
+            rc_rate: RC setpoint packets per second in mapping mode
+            heading_strategy: Initial navigation heading strategy (turn to each segment or strafe)
+            smooth: Start navigation with curved flight through intermediate waypoints
+            snapshots: Stream video and save a snapshot at every marked and reached waypoint
+            record_telemetry: Log every state packet of the session to a .ttlm file
         """
         self.environment_mod = environment_mod
-        self.drone_controller = RealTimeDroneController()
+        self.route_mode = route_mode
+        self.heading_strategy = heading_strategy
+        self.smooth = smooth
+        self.snapshots = snapshots
+        self.record_telemetry = record_telemetry
+        self.drone_controller = RealTimeDroneController(input_backend=input_backend, rc_rate=rc_rate)
         self.nav_interface = NavigationInterface()
-        self.tello = Tello()
+
+        # The drone client binds sockets and starts threads, so it is only created on connect
+        self.host = host
+        self.port = port
+        self.client = client
+        self.tello = None
+        self.telemetry: Optional[TelemetryCache] = None
+        self.health_monitor: Optional[HealthMonitor] = None
+        self.odometry: Optional[OdometryEngine] = None
+        self.frame_capture: Optional[FrameCapture] = None
+        self.telemetry_recorder: Optional[TelemetryRecorder] = None
+        self.command_metrics: Optional[CommandMetrics] = None  # Timing of every drone command
         
         # Application state
         self.is_connected = False
@@ -56,6 +100,7 @@ class TelloNavigationApp:
         """Run the main application."""
         try:
             self._show_welcome()
+            self._report_unfinished_sessions()
             
             if self.environment_mod:
                 print("🔧 Environment modification mode enabled")
@@ -171,6 +216,7 @@ class TelloNavigationApp:
             print("Failed to connect to drone. Exiting...")
             return
         
+        self._start_telemetry_recorder(telemetry_path_for(self.drone_controller.data_file), "mapping")
         if not self.takeoff():
             print("Failed to take off. Exiting...")
             return
@@ -182,7 +228,8 @@ class TelloNavigationApp:
         
         # Start user interface
         try:
-            self.drone_controller.run(drone_instance=self.tello)
+            self.drone_controller.run(drone_instance=self.tello, telemetry=self.telemetry, odometry=self.odometry,
+                                      frame_capture=self._start_frame_capture())
         except Exception as e:
             print(f"Error during execution: {e}")
             return
@@ -190,12 +237,20 @@ class TelloNavigationApp:
             self.is_mapping_mode = False
             self.is_running = False
 
+    def _report_unfinished_sessions(self):
+        """Point out mapping sessions that crashed before saving."""
+        for journal in find_unfinished_journals():
+            print(f"⚠️  Unsaved mapping session found: {journal}")
+            print(f"   Recover it with: python movement_journal.py recover {journal}")
+
     def _find_navigation_files(self) -> list: 
-        # Find all navigation data files creatred by realtime_drone_control.py
-        import glob
-        pattern = "drone_movements_*.json"
-        files = glob.glob(pattern)
-        return sorted(files, reverse=True)
+        # Find all navigation data files creatred by realtime_drone_control.py, via the session catalog
+        catalog = SessionCatalog()
+        try:
+            catalog.refresh()
+            return [session.path for session in catalog.sessions()]
+        finally:
+            catalog.close()
     
     def _run_navigation_mode(self, vertical_factor=1.0):
         """Run the application in navigation mode."""
@@ -206,6 +261,8 @@ class TelloNavigationApp:
             print("Failed to connect to drone. Exiting...")
             return
         
+        self._start_telemetry_recorder(
+            f"navigation_{datetime.now().strftime('%Y%m%d_%H%M%S')}{TELEMETRY_LOG_EXTENSION}", "navigation")
         if not self.takeoff():
             print("Failed to take off. Exiting...")
             return
@@ -214,16 +271,64 @@ class TelloNavigationApp:
         self.is_running = True
         
         try: 
-            self.nav_interface.run(drone_instance=self.tello, vertical_factor=vertical_factor)
+            self.nav_interface.run(drone_instance=self.tello, vertical_factor=vertical_factor, telemetry=self.telemetry,
+                                   route_mode=self.route_mode, health_monitor=self.health_monitor,
+                                   odometry=self.odometry, heading_strategy=self.heading_strategy,
+                                   smooth=self.smooth, frame_capture=self._start_frame_capture(),
+                                   command_metrics=self.command_metrics)
         except Exception as e:
             print(f"Error during navigation: {e}")
         finally: 
             self.is_navigation_mode = False
             self.is_running = False
     
+    def _start_telemetry_recorder(self, path: str, mode: str):
+        """Log every state packet of this session to a memory-mapped ring file."""
+        if not self.record_telemetry:
+            return
+        try:
+            self.telemetry_recorder = TelemetryRecorder(path, mode=mode)
+            self.telemetry_recorder.attach(self.telemetry)
+            print(f"📼 Recording telemetry to {path}")
+        except Exception as e:
+            print(f"⚠️  Could not record telemetry: {e}")
+            self.telemetry_recorder = None
+
+    def _start_frame_capture(self) -> Optional[FrameCapture]:
+        """Start streaming video into the snapshot ring buffer if snapshots are enabled."""
+        if not self.snapshots:
+            return None
+        try:
+            self.frame_capture = FrameCapture(self.tello)
+            self.frame_capture.start()
+            print("📷 Video stream on, snapshots enabled")
+        except Exception as e:
+            print(f"⚠️  Could not start the video stream: {e}")
+            self.frame_capture = None
+        return self.frame_capture
+
+    def _create_drone(self):
+        """Import and construct the drone client and the services that read from it."""
+        if self.client == "asyncio":
+            from async_tello import TelloBridge
+            self.tello = TelloBridge(host=self.host, port=self.port)
+        else:
+            from djitellopy import Tello  # Pulls in PyAV and NumPy, so only imported here
+            self.tello = Tello(host=self.host)
+            # djitellopy binds its local socket to CONTROL_UDP_PORT, so a simulator on
+            # the same machine listens elsewhere; only the destination port changes
+            self.tello.address = (self.host, self.port)
+        self.command_metrics = CommandMetrics()
+        instrument(self.tello, self.command_metrics)
+        self.telemetry = TelemetryCache(self.tello)
+        self.health_monitor = HealthMonitor(telemetry=self.telemetry)
+        self.odometry = OdometryEngine(self.telemetry)
+
     def connect_drone(self):
         """Connect to the Tello drone."""
         try:
+            if self.tello is None:
+                self._create_drone()
             print("Connecting to Tello drone...")
             self.tello.RESPONSE_TIMEOUT = 7
             self.tello.connect(wait_for_state=False)
@@ -231,8 +336,15 @@ class TelloNavigationApp:
 
             self.is_connected = True
 
+            # djitellopy parses state packets in the background; serve them from memory
+            self.telemetry.start()
+            if not self.telemetry.wait_for_state(timeout=2):
+                print("⚠️  No state packets received, telemetry will fall back to queries")
+            self.health_monitor.start()
+            self.odometry.start()
+
             try:
-                battery_response = self.tello.send_command_with_return("battery?", timeout=5)
+                battery_response = self.telemetry.get_battery()
                 print(f"✅ Battery: {battery_response}%")
             except Exception as e:
                 print(f"❌ Battery command failed: {e}")
@@ -252,7 +364,10 @@ class TelloNavigationApp:
             print("Taking off...")
             self.tello.takeoff()
             self.is_flying = True
+            self.odometry.reset()  # Track positions relative to the takeoff point
+            stabilize_start = time.monotonic()
             time.sleep(2)  # Wait for stabilization
+            self.command_metrics.record_wait("takeoff stabilization", time.monotonic() - stabilize_start)
             print("Drone is airborne! 🛫")
             return True
         
@@ -283,7 +398,22 @@ class TelloNavigationApp:
             except Exception as e:
                 print(f"Error during landing: {e}")
         
+        if self.frame_capture is not None:
+            self.frame_capture.stop()  # Writes the snapshots still queued
+            self.frame_capture = None
+
+        if self.telemetry_recorder is not None:
+            self.telemetry_recorder.close()
+            print(f"📼 Telemetry: {self.telemetry_recorder.count} state packets in {self.telemetry_recorder.path}")
+            self.telemetry_recorder = None
+
+        if self.tello is not None:
+            self.odometry.stop()
+            self.health_monitor.stop()
+            self.telemetry.stop()
+
         if self.is_connected:
+            self._report_command_metrics()
             try:
                 print("Disconnecting from drone...")
                 self.tello.end()
@@ -293,6 +423,17 @@ class TelloNavigationApp:
 
         print("👋 Application closed successfully")
 
+    def _report_command_metrics(self):
+        """Print where the session's time went and export it for later comparison."""
+        self.command_metrics.finish()
+        self.command_metrics.print_report()
+        path = metrics_path(self.command_metrics.started_at)
+        try:
+            self.command_metrics.save(path)
+            print(f"⏱️  Command timing saved to {path}")
+        except OSError as e:
+            print(f"⚠️  Could not save command timing: {e}")
+
 
 def main():
     """Main entry point of the application."""
@@ -300,10 +441,41 @@ def main():
     
     parser = argparse.ArgumentParser(description='DJI Tello Navigation System')
     parser.add_argument('-e', '--environmentMod', action='store_true', help='Enable environment modification mode')
+    parser.add_argument('--host', default=TELLO_IP, help='Drone IP address (use 127.0.0.1 for tello_simulator.py)')
+    parser.add_argument('--port', type=int, default=TELLO_CONTROL_PORT, help='Drone command port')
+    parser.add_argument('--route', choices=[mode.value for mode in RouteMode], default=RouteMode.CHAIN.value,
+                        help='Navigation route mode: replay the recorded chain or fly direct')
+    parser.add_argument('--heading', choices=[strategy.value for strategy in HeadingStrategy],
+                        default=HeadingStrategy.TURN.value,
+                        help='Navigation heading strategy: turn to face each segment or strafe holding the heading')
+    parser.add_argument('--smooth', action='store_true',
+                        help='Fly through intermediate waypoints on curve_xyz_speed arcs where feasible')
+    parser.add_argument('--snapshots', action='store_true',
+                        help='Stream video and save a snapshot at every marked and reached waypoint')
+    parser.add_argument('--no-telemetry-log', action='store_true',
+                        help='Do not record the state stream to a .ttlm telemetry log')
+    parser.add_argument('--client', choices=['djitellopy', 'asyncio'], default='djitellopy',
+                        help='Drone I/O client: blocking djitellopy or the asyncio TelloBridge')
+    parser.add_argument('--input', choices=['auto', 'keyboard', 'termios'], default='auto',
+                        help='Mapping mode key input: real press/release events (keyboard, needs root) or terminal')
+    parser.add_argument('--rc-rate', type=float, default=20.0, help='RC setpoint stream rate in Hz for mapping mode')
+    parser.add_argument('--offline', action='store_true',
+                        help='Inspect maps and plan routes without connecting to a drone')
+    parser.add_argument('--map', help='Waypoint file to open in offline mode')
     
     args = parser.parse_args()
 
-    app = TelloNavigationApp(environment_mod=args.environmentMod)
+    if args.offline:
+        from offline_mode import OfflinePlanner
+        OfflinePlanner(route_mode=RouteMode(args.route), heading_strategy=HeadingStrategy(args.heading),
+                       smooth=args.smooth).run(map_file=args.map)
+        return
+
+    app = TelloNavigationApp(environment_mod=args.environmentMod, host=args.host, port=args.port,
+                             route_mode=RouteMode(args.route), client=args.client,
+                             input_backend=args.input, rc_rate=args.rc_rate,
+                             heading_strategy=HeadingStrategy(args.heading), smooth=args.smooth,
+                             snapshots=args.snapshots, record_telemetry=not args.no_telemetry_log)
     app.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Append-only JSONL journal of a mapping session.
+
+Every recorded movement, distance correction and waypoint is appended as
+one JSON line by a background writer, which flushes promptly and fsyncs
+periodically. If the process dies mid-session, the journal still holds
+everything up to the last sync and can be compacted into the usual
+drone_movements_*.json layout.
+
+Usage:
+    python movement_journal.py recover drone_movements_20250708_181217.journal.jsonl
+"""
+import argparse
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+
+def journal_path_for(data_file: str) -> str:
+    """Journal file that belongs to a drone_movements_*.json data file."""
+    return os.path.splitext(data_file)[0] + JOURNAL_SUFFIX
+
+
+def data_file_for(journal_path: str) -> str:
+    """Data file that a journal compacts into."""
+    return journal_path[:-len(JOURNAL_SUFFIX)] + ".json"
+
+
+def process_movement(movement: Dict) -> Dict:
+    """Convert a recorded movement into its waypoint file record."""
+    # Movement type is either 'move', or 'lift' only
+    if movement['type'] == 'move':
+        yaw = movement['start_yaw']
+        if movement['direction'] == 'forward':
+            yaw += 0
+        elif movement['direction'] == 'backward':
+            yaw += 180
+        elif movement['direction'] == 'left':
+            yaw -= 90
+        elif movement['direction'] == 'right':
+            yaw += 90
+
+        # Normalize yaw to -180 to 180 range
+        if yaw > 180:
+            yaw -= 360
+        elif yaw < -180:
+            yaw += 360
+
+        return {
+            'id': movement['id'],
+            'type': movement['type'],
+            'yaw': yaw,
+            'distance': movement['distance'],
+            'timestamp': movement['timestamp']
+        }
+
+    # For 'lift' movements, we can just record the type distance and direction
+    return {
+        'id': movement['id'],
+        'type': movement['type'],
+        'direction': movement['direction'],
+        'distance': movement['distance'],
+        'timestamp': movement['timestamp']
+    }
+
+
+def build_session_data(waypoints: List[Dict]) -> Dict:
+    """Build the drone_movements_*.json layout from recorded waypoints."""
+    processed_waypoints = []
+    for waypoint in waypoints:
+        processed = {
+            'id': waypoint['id'],
+            'name': waypoint['name'],
+            'movements_to_here': [process_movement(movement) for movement in waypoint['movements_to_here']]
+        }
+        for key in ('snapshot', 'signature'):
+            if waypoint.get(key):
+                processed[key] = waypoint[key]
+        processed_waypoints.append(processed)
+
+    return {
+        'session_info': {
+            'total_waypoints': len(waypoints),
+            'total_movements': sum(len(wp['movements_to_here']) for wp in waypoints)
+        },
+        'waypoints': processed_waypoints
+    }
+
+
+class MovementJournal:
+    """
+    Background JSONL writer for mapping events.
+
+    append() only enqueues the record, so the key loop never waits on the
+    disk. The writer thread writes and flushes each batch, and fsyncs at
+    most every fsync_interval seconds and on close.
+    """
+
+    def __init__(self, path: str, fsync_interval: float = 1.0):
+        """
+        Initialize the journal.
+
+        Args:
+            path: Journal file, appended to if it exists
+            fsync_interval: Longest time (s) a written record may wait for fsync
+        """
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self._queue: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self.records_written = 0
+
+    def open(self, **session):
+        """Open the file, start the writer and record the session header."""
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._write_loop, name="MovementJournal", daemon=True)
+        self._thread.start()
+        self.append('session', started=datetime.now().isoformat(), **session)
+
+    def append(self, event: str, **fields):
+        """Queue a record for writing; never blocks."""
+        if self._thread is None:
+            return
+        record = {'event': event}
+        record.update(fields)
+        self._queue.put(record)
+
+    def close(self):
+        """Write everything still queued, fsync and close the file."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+        self._file = None
+
+    def _write_loop(self):
+        last_sync = time.monotonic()
+        dirty = False
+        while True:
+            try:
+                record = self._queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                record = False  # Idle: only a pending fsync to do
+
+            # Drain whatever else is queued into the same write
+            batch = [] if record is False else [record]
+            while batch and batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            done = bool(batch) and batch[-1] is None
+            lines = [json.dumps(item) + "\n" for item in batch if item is not None]
+            try:
+                if lines:
+                    self._file.write("".join(lines))
+                    self._file.flush()
+                    self.records_written += len(lines)
+                    dirty = True
+
+                now = time.monotonic()
+                if dirty and (done or now - last_sync >= self.fsync_interval):
+                    os.fsync(self._file.fileno())
+                    last_sync = now
+                    dirty = False
+            except OSError as e:
+                print(f"\r⚠️  Movement journal write failed: {e}")
+
+            if done:
+                return
+
+
+def read_journal(path: str) -> List[Dict]:
+    """Read journal records, ignoring a final line cut off by a crash."""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break  # Torn write; everything before it is intact
+    return records
+
+
+def replay_journal(records: List[Dict]) -> List[Dict]:
+    """Rebuild the recorded waypoints from journal records."""
+    waypoints = []
+    pending = []
+    by_id = {}
+    signatures = {}
+    for record in records:
+        event = record.get('event')
+        if event == 'movement':
+            movement = record['movement']
+            pending.append(movement)
+            by_id[movement['id']] = movement
+        elif event == 'measurement' and record.get('id') in by_id:
+            by_id[record['id']]['distance'] = record['distance']
+        elif event == 'signature':
+            signatures[record['id']] = record['signature']  # May be written before its waypoint
+        elif event == 'waypoint':
+            waypoints.append({'id': record['id'], 'name': record['name'], 'movements_to_here': pending})
+            if record.get('snapshot'):
+                waypoints[-1]['snapshot'] = record['snapshot']
+            pending = []
+
+    if pending:
+        # Movements after the last waypoint close the session like run() does
+        waypoints.append({'id': f"WP_{len(waypoints) + 1:03d}", 'name': "END", 'movements_to_here': pending})
+    for waypoint in waypoints:
+        if waypoint['id'] in signatures:
+            waypoint['signature'] = signatures[waypoint['id']]
+    return waypoints
+
+
+def compact_journal(journal_path: str, data_file: Optional[str] = None) -> str:
+    """Write the drone_movements_*.json file for a journal; returns its path."""
+    data_file = data_file or data_file_for(journal_path)
+    data = build_session_data(replay_journal(read_journal(journal_path)))
+    temp_file = data_file + ".tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, data_file)
+    return data_file
+
+
+def find_unfinished_journals(directory: str = ".") -> List[str]:
+    """Journals left behind by sessions that never completed their save."""
+    return sorted(glob.glob(os.path.join(directory, f"drone_movements_*{JOURNAL_SUFFIX}")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recover a mapping session from its movement journal')
+    parser.add_argument('command', choices=['recover'])
+    parser.add_argument('journal', help='drone_movements_*.journal.jsonl file')
+    parser.add_argument('-o', '--output', help='Output JSON path (defaults to the session data file)')
+    args = parser.parse_args()
+
+    output = compact_journal(args.journal, args.output)
+    print(f"✅ Recovered session written to {output}")
+
+
+if __name__ == "__main__":
+    main()
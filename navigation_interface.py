@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 import os
-import glob
 import sys
-from typing import Optional
+import time
+from typing import List, Optional
 
 import select
-from typing import Optional
-from waypoint_navigation import WaypointNavigationManager
+from health_monitor import CRITICAL, WARNING, HealthMonitor
+from command_metrics import CommandMetrics
+from frame_capture import FrameCapture
+from odometry import OdometryEngine
+from plan_compiler import HeadingStrategy
+from telemetry import TelemetryCache
+from session_catalog import SessionCatalog, SessionEntry
+from waypoint_navigation import RouteMode, WaypointNavigationManager
 
 class NavigationInterface:
     """User interface for waypoint navigation."""
@@ -14,9 +20,34 @@ class NavigationInterface:
     def __init__(self):
         self.nav_manager = WaypointNavigationManager()
         self.is_running = True
+        self.telemetry: Optional[TelemetryCache] = None
+        self.route_mode = RouteMode.CHAIN
+        self.heading_strategy = HeadingStrategy.TURN
+        self.smooth = False  # Fly through intermediate waypoints on curves
+        self.health_monitor: Optional[HealthMonitor] = None
+        self.catalog: Optional[SessionCatalog] = None  # Opened on first file lookup
+        self.menu_limit = 20  # Sessions listed at once; search to find older ones
+        self.confirm_navigation = True  # Show the time estimate and ask before each flight
     
-    def run(self, drone_instance=None, vertical_factor=1.0):
+    def run(self, drone_instance=None, vertical_factor=1.0, telemetry: Optional[TelemetryCache] = None, route_mode: RouteMode = RouteMode.CHAIN,
+            health_monitor: Optional[HealthMonitor] = None, odometry: Optional[OdometryEngine] = None,
+            heading_strategy: HeadingStrategy = HeadingStrategy.TURN, smooth: bool = False,
+            frame_capture: Optional[FrameCapture] = None, command_metrics: Optional[CommandMetrics] = None):
         """Run the navigation interface."""
+        self.telemetry = telemetry
+        self.route_mode = route_mode
+        self.heading_strategy = heading_strategy
+        self.smooth = smooth
+        self.nav_manager.telemetry = telemetry
+        self.nav_manager.odometry = odometry
+        self.nav_manager.frame_capture = frame_capture
+        self.nav_manager.command_metrics = command_metrics
+        
+        # Battery, temperature and link are watched in the background, never from the prompt
+        owns_monitor = health_monitor is None
+        self.health_monitor = health_monitor or HealthMonitor(telemetry=telemetry, drone_instance=drone_instance)
+        if owns_monitor:
+            self.health_monitor.start()
         try:
             if drone_instance is None:
                 print("❌ No drone instance provided. Please initialize the drone first.")
@@ -37,84 +68,112 @@ class NavigationInterface:
         except Exception as e:
             print(f"\n❌ Navigation error: {e}")
         finally:
+            if owns_monitor:
+                self.health_monitor.stop()
             drone_instance.send_rc_control(0, 0, 0, 0)  # Stop any ongoing movement
             print("\n👋 Navigation system closed")
     
+    def _check_health(self) -> bool:
+        """Print pending health events; return True if the flight must end."""
+        for event in self.health_monitor.poll_events():
+            icon = {CRITICAL: "❗", WARNING: "⚠️ "}.get(event.level, "✅")
+            print(f"\r{icon} {event.message}               ")
+        if self.health_monitor.is_critical:
+            print("\r❗ CRITICAL: Ending navigation, landing...")
+            return True
+        return False
+    
+    def _wait_for_input(self, timeout: float) -> Optional[bool]:
+        """Wait for a line on stdin; True if ready, False on timeout, None on a critical health event."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            ready, _, _ = select.select([sys.stdin], [], [], max(0.0, min(0.5, remaining)))
+            if ready:
+                return True
+            if self._check_health():
+                return None
+            if remaining <= 0.5:
+                return False
+    
     def _load_waypoint_file(self, drone_instance=None) -> bool:
         """Load waypoint file with user selection."""
         # Find available waypoint files
-        waypoint_files = self._find_waypoint_files()
+        sessions = self._find_waypoint_files()
         
-        if not waypoint_files:
+        if not sessions:
             print("❌ No waypoint files found. Please run mapping mode first.")
             return False
         
-        if len(waypoint_files) == 1:
+        if len(sessions) == 1:
             # Only one file, load it automatically
-            selected_file = waypoint_files[0]
-            print(f"📁 Found waypoint file: {selected_file}")
+            selected_file = sessions[0].path
+            print(f"📁 Found waypoint file: {sessions[0].describe()}")
         else:
             # Multiple files, let user choose
-            selected_file = self._select_waypoint_file(waypoint_files, drone_instance=drone_instance)
+            selected_file = self._select_waypoint_file(sessions, drone_instance=drone_instance)
             if not selected_file:
                 return False
         
         return self.nav_manager.load_waypoint_file(selected_file)
     
-    def _find_waypoint_files(self) -> list:
-        """Find all available waypoint JSON files."""
-        pattern = "drone_movements_*.json"
-        files = glob.glob(pattern)
-        return sorted(files, reverse=True)  # Newest first
+    def _find_waypoint_files(self, search: Optional[str] = None) -> List[SessionEntry]:
+        """Find all available waypoint files (JSON and .tmap) through the session catalog, newest first."""
+        if self.catalog is None:
+            self.catalog = SessionCatalog()
+        self.catalog.refresh()
+        return self.catalog.sessions(search=search)
     
-    def _select_waypoint_file(self, files: list, drone_instance=None) -> Optional[str]:
+    def _select_waypoint_file(self, sessions: List[SessionEntry], drone_instance=None) -> Optional[str]:
         """Let user select which waypoint file to use."""
-        print(f"\n📁 Found {len(files)} waypoint files:")
-        print("-" * 50)
-        
-        for i, file in enumerate(files, 1):
-            # Extract timestamp from filename for better display
-            timestamp = file.replace('drone_movements_', '').replace('.json', '')
-            print(f"  {i}. {file} (Created: {timestamp})")
+        all_sessions = sessions
         
         while True:
+            shown = sessions[:self.menu_limit]
+            print(f"\n📁 Found {len(sessions)} waypoint files:")
+            print("-" * 50)
+            for i, session in enumerate(shown, 1):
+                print(f"  {i}. {session.describe()}")
+            if len(sessions) > len(shown):
+                print(f"  ... {len(sessions) - len(shown)} older files, use '/text' to search")
+            
             try:
-                try:
-                    battery_str = drone_instance.send_command_with_return("battery?", timeout=5)
-                    battery = int(battery_str)
-                    if battery < 20:
-                        print(f"\r⚠️  Low battery ({battery}%)               ")
-                        if battery < 10:
-                            print("\r❗ CRITICAL: Battery too low, landing...")
-                            return None
-                except Exception as e:
-                    print(f"\rError checking battery: {e}")
+                if self._check_health():
                     return None
                 
-                prompt = f"\nSelect waypoint file (1-{len(files)}) or 'q' to quit: "
+                prompt = f"\nSelect waypoint file (1-{len(shown)}), '/text' to search waypoint names or 'q' to quit: "
 
                 print(prompt, end='', flush=True)
 
-                # Wait for input with 5-second timeout
-                ready, _, _ = select.select([sys.stdin], [], [], 5)
-
-                if ready:
-                    choice = sys.stdin.readline().strip().lower()
-                    if choice == 'q':
-                        return None
-                    
-                    try: 
-                        file_index = int(choice) - 1
-                        if 0 <= file_index < len(files):
-                            return files[file_index]
-                        else:
-                            print(f"❌ Invalid choice. Please enter 1-{len(files)}")
-                    except ValueError:
-                        print("❌ Invalid input. Please enter a valid option.")
-                else:
+                # Wait for input with 5-second timeout, watching health events meanwhile
+                ready = self._wait_for_input(5)
+                while ready is False:
                     # No input received within timeout
-                    print("\r" + " " * 50 + "\r", end='')
+                    if self._check_health():
+                        return None
+                    ready = self._wait_for_input(5)
+                if ready is None:
+                    return None
+
+                choice = sys.stdin.readline().strip()
+                if choice.lower() == 'q':
+                    return None
+                if choice.startswith('/'):
+                    search = choice[1:].strip()
+                    sessions = self.catalog.sessions(search=search) if search else all_sessions
+                    if not sessions:
+                        print(f"❌ No sessions match '{search}'")
+                        sessions = all_sessions
                     continue
+                
+                try: 
+                    file_index = int(choice) - 1
+                    if 0 <= file_index < len(shown):
+                        return shown[file_index].path
+                    else:
+                        print(f"❌ Invalid choice. Please enter 1-{len(shown)}")
+                except ValueError:
+                    print("❌ Invalid input. Please enter a valid option.")
                     
             except Exception as e:
                 print(f"❌ Error reading input: {e}")
@@ -142,11 +201,42 @@ class NavigationInterface:
                         continue
                     else:
                         break
+                elif choice == 'tour':
+                    completed = self._run_tour(destinations, drone_instance=drone_instance,
+                                               vertical_factor=vertical_factor)
+                    if completed is None:
+                        break
+                    loop_count += completed
+                    continue
+                elif choice == 'mode':
+                    self.route_mode = RouteMode.DIRECT if self.route_mode == RouteMode.CHAIN else RouteMode.CHAIN
+                    print(f"🔀 Route mode: {self.route_mode.value}")
+                    continue
+                elif choice == 'strategy':
+                    self.heading_strategy = (HeadingStrategy.STRAFE if self.heading_strategy == HeadingStrategy.TURN
+                                             else HeadingStrategy.TURN)
+                    print(f"🔀 Heading strategy: {self.heading_strategy.value}")
+                    continue
+                elif choice == 'smooth':
+                    self.smooth = not self.smooth
+                    print(f"🔀 Curved flight: {'on' if self.smooth else 'off'}")
+                    continue
                 elif isinstance(choice, str):
+                    if self.confirm_navigation:
+                        confirmed = self._confirm_navigation(choice, vertical_factor=vertical_factor)
+                        if confirmed is None:
+                            break
+                        if not confirmed:
+                            print("↩️  Navigation cancelled")
+                            continue
+
                     # Navigate to selected waypoint
-                    success = self.nav_manager.navigate_to_waypoint(choice, drone_instance=drone_instance, vertical_factor=vertical_factor)
+                    success = self.nav_manager.navigate_to_waypoint(choice, drone_instance=drone_instance, vertical_factor=vertical_factor, route_mode=self.route_mode,
+                                                                    strategy=self.heading_strategy, smooth=self.smooth)
                     if success:
                         print(f"\n🎯 Navigation completed!")
+                        if self.catalog is not None:
+                            self.catalog.mark_flown(self.nav_manager.json_file_path)
                         loop_count += 1
                     else:
                         print(f"\n❌ Navigation failed!")
@@ -156,6 +246,93 @@ class NavigationInterface:
                 print(f"❌ Error in navigation loop: {e}")
                 break
     
+    def _prompt(self, prompt: str) -> Optional[str]:
+        """Read one line while watching health events; None on a critical event."""
+        print(prompt, end='', flush=True)
+        while True:
+            ready = self._wait_for_input(5)
+            if ready is None:
+                return None
+            if ready:
+                return sys.stdin.readline().strip().lower()
+    
+    def _confirm_navigation(self, target_waypoint_id: str, vertical_factor=1.0) -> Optional[bool]:
+        """Show the route estimate and ask to proceed; None on a critical health event."""
+        plan, estimate = self.nav_manager.estimate_route(target_waypoint_id, route_mode=self.route_mode,
+                                                         vertical_factor=vertical_factor,
+                                                         strategy=self.heading_strategy, smooth=self.smooth)
+        target_name = self.nav_manager.waypoints[target_waypoint_id].name
+        print(f"\n⏱️  '{target_name}': {plan.command_count} commands ({plan.rotation_count} rotations, "
+              f"{self.heading_strategy.value}), {plan.total_distance:.0f} cm, {estimate.describe()}")
+        answer = self._prompt("Proceed? (Y/n): ")
+        return None if answer is None else answer in ('', 'y', 'yes')
+    
+    def _select_destinations(self, destinations: list, prompt: str, allow_all: bool = False) -> Optional[List[str]]:
+        """Parse destination numbers (or 'a' for all); [] for an empty answer, None on a critical event."""
+        while True:
+            answer = self._prompt(prompt)
+            if answer is None:
+                return None
+            if not answer:
+                return []
+            if allow_all and answer == 'a':
+                return [wp_id for wp_id, _ in destinations]
+            try:
+                indices = [int(part) - 1 for part in answer.replace(',', ' ').split()]
+            except ValueError:
+                indices = [-1]
+            if all(0 <= i < len(destinations) for i in indices):
+                return [destinations[i][0] for i in indices]
+            print(f"❌ Invalid choice. Please enter numbers from 1-{len(destinations)}")
+    
+    def _run_tour(self, destinations: list, drone_instance=None, vertical_factor=1.0) -> Optional[int]:
+        """
+        Visit several waypoints in the order with the lowest estimated flight time.
+        
+        Returns:
+            Number of legs flown, or None if navigation must end
+        """
+        stops = self._select_destinations(destinations, "\nWaypoints to visit (e.g. 1 3 4, 'a' for all): ",
+                                          allow_all=True)
+        if not stops:
+            return None if stops is None else 0
+        first = self._select_destinations(destinations, "Visit first (number, Enter for any): ")
+        if first is None:
+            return None
+        last = self._select_destinations(destinations, "Finish at (number, Enter for any): ")
+        if last is None:
+            return None
+        
+        print("🧮 Optimizing visiting order...")
+        tour = self.nav_manager.plan_tour(stops, first_waypoint_id=first[0] if first else None,
+                                          last_waypoint_id=last[0] if last else None,
+                                          route_mode=self.route_mode, vertical_factor=vertical_factor,
+                                          strategy=self.heading_strategy, smooth=self.smooth)
+        print(f"\n🗺️  TOUR ({'optimal' if tour.exact else 'heuristic'} order, {len(tour.order) - 1} stops)")
+        print(" → ".join(f"{wp_id} '{self.nav_manager.waypoints[wp_id].name}'" for wp_id in tour.order))
+        print(f"Estimated time: ~{tour.cost:.0f} s (order as entered: ~{tour.baseline_cost:.0f} s)")
+        answer = self._prompt("Fly this tour? (Y/n): ")
+        if answer is None:
+            return None
+        if answer not in ('', 'y', 'yes'):
+            print("↩️  Tour cancelled")
+            return 0
+        
+        # The tour runs without per-stop prompts; health is still checked between legs
+        for leg, target_waypoint_id in enumerate(tour.order[1:], 1):
+            if self._check_health():
+                return None
+            print(f"\n📍 Tour leg {leg}/{len(tour.order) - 1}")
+            if not self.nav_manager.navigate_to_waypoint(target_waypoint_id, drone_instance=drone_instance,
+                                                         vertical_factor=vertical_factor, route_mode=self.route_mode,
+                                                         strategy=self.heading_strategy, smooth=self.smooth):
+                print(f"\n❌ Tour stopped at leg {leg}")
+                return None
+            if self.catalog is not None:
+                self.catalog.mark_flown(self.nav_manager.json_file_path)
+        print(f"\n🎯 Tour completed!")
+        return len(tour.order) - 1
+    
     def _get_navigation_choice(self, destinations: list, loopCount: int, drone_instance=None) -> str:
         """Get navigation choice from user."""
         print(f"\n🎮 NAVIGATION OPTIONS:")
@@ -164,37 +341,42 @@ class NavigationInterface:
         for i, (wp_id, wp_name) in enumerate(destinations, 1):
             print(f"  {i}. Navigate to '{wp_name}' ({wp_id})")
         
+        print(f"  t. Tour: visit several waypoints in the fastest order")
+        print(f"  m. Switch route mode (current: {self.route_mode.value})")
+        print(f"  s. Switch heading strategy (current: {self.heading_strategy.value})")
+        print(f"  c. Toggle curved flight through waypoints (current: {'on' if self.smooth else 'off'})")
         print(f"  r. Reload waypoint file")
         print(f"  q. Quit navigation")
         
         while True:
             try:
-                try:
-                    battery_str = drone_instance.send_command_with_return("battery?", timeout=5)
-                    battery = int(battery_str)
-                    if battery < 20:
-                        print(f"\r⚠️  Low battery ({battery}%)               ")
-                        if battery < 10:
-                            print("\r❗ CRITICAL: Battery too low, landing...")
-                            return 'quit'
-                except Exception as e:
-                    print(f"\rError checking battery: {e}")
+                if self._check_health():
                     return 'quit'
 
                 if loopCount == 0:
-                    prompt = f"\nEnter your choice (1-{len(destinations)}, r, q): "
+                    prompt = f"\nEnter your choice (1-{len(destinations)}, t, m, s, c, r, q): "
                 else: 
-                    prompt = f"\nEnter your choice (1-{len(destinations)}, q): "
+                    prompt = f"\nEnter your choice (1-{len(destinations)}, t, m, s, c, q): "
 
                 print(prompt, end='', flush=True)
 
-                # Wait for input with 5-second timeout
-                ready, _, _ = select.select([sys.stdin], [], [], 5)
+                # Wait for input with 5-second timeout, watching health events meanwhile
+                ready = self._wait_for_input(5)
+                if ready is None:
+                    return 'quit'
 
                 if ready:
                     choice = sys.stdin.readline().strip().lower()
                     if choice == 'q':
                         return 'quit'
+                    elif choice == 'm':
+                        return 'mode'
+                    elif choice == 't':
+                        return 'tour'
+                    elif choice == 's':
+                        return 'strategy'
+                    elif choice == 'c':
+                        return 'smooth'
                     elif choice == 'r':
                         if loopCount == 0: 
                             print("❗ Reloading waypoint file...")
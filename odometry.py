@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from telemetry import TelemetryCache
+
+# Columns of the track buffer
+T, X, Y, Z, YAW, TOF, HEIGHT = range(7)
+
+
+@dataclass
+class Pose:
+    """Dead-reckoned drone pose in cm (x along yaw 0, y along yaw 90, z up) and degrees."""
+    x: float
+    y: float
+    z: float
+    yaw: float
+    tof: float  # Distance sensor reading (cm)
+    height: float  # Height reported by the drone (cm)
+    timestamp: float  # time.monotonic() of the packet it came from
+
+
+class OdometryEngine:
+    """
+    Integrates state-stream velocities into a time-stamped position track.
+
+    The engine subscribes to the telemetry cache, so the integration runs on
+    the telemetry thread and never on the control path. Each packet's
+    vgx/vgy/vgz (dm/s) is integrated with the trapezoidal rule into a
+    world-frame position, and the sample is appended to a fixed-size NumPy
+    ring. pose() reads the newest sample in O(1); window queries such as
+    displacement() search the ring with vectorized lookups.
+    """
+
+    def __init__(self, telemetry: TelemetryCache, capacity: int = 4096, max_gap: float = 0.5,
+                 body_frame_velocity: bool = False):
+        """
+        Initialize the engine.
+
+        Args:
+            telemetry: Telemetry cache to subscribe to
+            capacity: Number of samples kept in the track ring (about 3 minutes at 20 Hz)
+            max_gap: Longest packet gap (s) integrated; longer gaps only resync the clock
+            body_frame_velocity: Set if the firmware reports velocities in the body frame
+        """
+        self.telemetry = telemetry
+        self.capacity = capacity
+        self.max_gap = max_gap
+        self.body_frame_velocity = body_frame_velocity
+
+        self._track = np.zeros((capacity, 7), dtype=np.float64)
+        self._head = 0  # Next slot to write
+        self._count = 0
+        self._lock = threading.Lock()
+        self._running = False
+
+        self._position = np.zeros(3, dtype=np.float64)
+        self._last_velocity: Optional[np.ndarray] = None
+        self._last_time = 0.0
+        self._pose: Optional[Pose] = None
+
+    def start(self):
+        """Start integrating state packets."""
+        if self._running:
+            return
+        self._running = True
+        self.telemetry.subscribe(self._on_state)
+
+    def stop(self):
+        """Stop integrating state packets."""
+        if not self._running:
+            return
+        self._running = False
+        self.telemetry.unsubscribe(self._on_state)
+
+    def reset(self):
+        """Restart the track at the origin, e.g. on takeoff."""
+        with self._lock:
+            self._position[:] = 0.0
+            self._last_velocity = None
+            self._last_time = 0.0
+            self._head = self._count = 0
+            self._pose = None
+
+    def _velocity(self, state: Dict, yaw: float) -> np.ndarray:
+        """World-frame velocity in cm/s from a state packet."""
+        vx = float(state.get('vgx', 0)) * 10
+        vy = float(state.get('vgy', 0)) * 10
+        vz = float(state.get('vgz', 0)) * 10
+        if self.body_frame_velocity:
+            rad = math.radians(yaw)
+            vx, vy = vx * math.cos(rad) - vy * math.sin(rad), vx * math.sin(rad) + vy * math.cos(rad)
+        return np.array((vx, vy, vz))
+
+    def _on_state(self, timestamp: float, state: Dict):
+        """Telemetry callback: integrate one packet and append it to the track."""
+        yaw = float(state.get('yaw', 0))
+        velocity = self._velocity(state, yaw)
+
+        with self._lock:
+            if self._last_velocity is not None:
+                dt = timestamp - self._last_time
+                if 0 < dt <= self.max_gap:
+                    self._position += (self._last_velocity + velocity) * (dt / 2)
+            self._last_velocity = velocity
+            self._last_time = timestamp
+
+            x, y, z = self._position
+            tof = float(state.get('tof', 0))
+            height = float(state.get('h', 0))
+            self._track[self._head] = (timestamp, x, y, z, yaw, tof, height)
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            self._pose = Pose(float(x), float(y), float(z), yaw, tof, height, timestamp)
+
+    def pose(self) -> Optional[Pose]:
+        """Newest pose, or None before the first packet."""
+        return self._pose
+
+    @property
+    def sample_count(self) -> int:
+        return self._count
+
+    def track(self, since: Optional[float] = None) -> np.ndarray:
+        """Copy of the track in time order, one row per packet (columns T, X, Y, Z, YAW, TOF, HEIGHT)."""
+        with self._lock:
+            if self._count < self.capacity:
+                rows = self._track[:self._count].copy()
+            else:
+                rows = np.roll(self._track, -self._head, axis=0)
+        if since is not None:
+            rows = rows[np.searchsorted(rows[:, T], since):]
+        return rows
+
+    def position_at(self, timestamp: float) -> Optional[np.ndarray]:
+        """(x, y, z) interpolated at a time, or None if the track does not cover it."""
+        rows = self.track()
+        if len(rows) == 0 or timestamp < rows[0, T] or timestamp > rows[-1, T]:
+            return None
+        return np.array([np.interp(timestamp, rows[:, T], rows[:, column]) for column in (X, Y, Z)])
+
+    def displacement(self, start_time: float, end_time: float) -> Optional[Tuple[float, float, float]]:
+        """Net (dx, dy, dz) in cm between two times, or None if the track does not cover the window."""
+        start = self.position_at(start_time)
+        end = self.position_at(end_time)
+        if start is None or end is None:
+            return None
+        dx, dy, dz = end - start
+        return float(dx), float(dy), float(dz)
+
+    def path_length(self, start_time: float, end_time: float) -> float:
+        """Distance travelled in cm between two times, summed over the samples in the window."""
+        rows = self.track(since=start_time)
+        rows = rows[rows[:, T] <= end_time]
+        if len(rows) < 2:
+            return 0.0
+        steps = np.diff(rows[:, X:Z + 1], axis=0)
+        return float(np.sqrt((steps * steps).sum(axis=1)).sum())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+from typing import Optional
+
+from plan_compiler import HeadingStrategy
+from session_catalog import SessionCatalog
+from waypoint_navigation import RouteMode, WaypointNavigationManager
+
+
+class OfflinePlanner:
+    """
+    Inspect waypoint maps and plan routes without a drone.
+
+    Only the map, planning and catalog modules are used: no Tello client is
+    constructed, no sockets are opened and no video stack is imported.
+    """
+
+    def __init__(self, route_mode: RouteMode = RouteMode.CHAIN, vertical_factor: float = 1.0,
+                 heading_strategy: HeadingStrategy = HeadingStrategy.TURN, smooth: bool = False):
+        self.nav_manager = WaypointNavigationManager()
+        self.route_mode = route_mode
+        self.heading_strategy = heading_strategy
+        self.smooth = smooth
+        self.vertical_factor = vertical_factor
+
+    def run(self, map_file: Optional[str] = None):
+        """Open a map and answer inspection and planning commands until quit."""
+        print("\n🗺️  OFFLINE MODE (no drone connection)")
+        print("=" * 50)
+
+        if not self._open_map(map_file):
+            return
+
+        self._print_help()
+        while True:
+            try:
+                command = input("\noffline> ").strip().split()
+            except EOFError:
+                break
+            if not command:
+                continue
+
+            name, args = command[0].lower(), command[1:]
+            if name in ('q', 'quit', 'exit'):
+                break
+            elif name in ('h', 'help'):
+                self._print_help()
+            elif name in ('l', 'list'):
+                self._list_waypoints()
+            elif name in ('p', 'plan') and len(args) == 2:
+                self._plan(*args)
+            elif name in ('m', 'mode'):
+                self.route_mode = RouteMode.DIRECT if self.route_mode == RouteMode.CHAIN else RouteMode.CHAIN
+                print(f"🔀 Route mode: {self.route_mode.value}")
+            elif name in ('s', 'strategy'):
+                self.heading_strategy = (HeadingStrategy.STRAFE if self.heading_strategy == HeadingStrategy.TURN
+                                         else HeadingStrategy.TURN)
+                print(f"🔀 Heading strategy: {self.heading_strategy.value}")
+            elif name in ('c', 'smooth'):
+                self.smooth = not self.smooth
+                print(f"🔀 Curved flight: {'on' if self.smooth else 'off'}")
+            elif name in ('o', 'open'):
+                self._open_map(args[0] if args else None)
+            else:
+                print("❌ Unknown command, type 'help'")
+
+        print("👋 Offline mode closed")
+
+    @staticmethod
+    def _print_help():
+        print("\nCommands:")
+        print("  list                 Waypoints with dead-reckoned positions")
+        print("  plan FROM TO         Compile the route between two waypoints (ids or names)")
+        print("  mode                 Toggle chain/direct route mode")
+        print("  strategy             Toggle turn/strafe heading strategy")
+        print("  smooth               Toggle curved flight through waypoints")
+        print("  open [FILE]          Open another map")
+        print("  quit                 Leave offline mode")
+
+    def _open_map(self, map_file: Optional[str]) -> bool:
+        if map_file is None:
+            catalog = SessionCatalog()
+            try:
+                catalog.refresh()
+                sessions = catalog.sessions(limit=20)
+            finally:
+                catalog.close()
+            if not sessions:
+                print("❌ No waypoint files found. Please run mapping mode first.")
+                return False
+
+            print("\n📁 Waypoint files:")
+            for i, session in enumerate(sessions, 1):
+                print(f"  {i}. {session.describe()}")
+            choice = input(f"\nSelect waypoint file (1-{len(sessions)}): ").strip()
+            try:
+                map_file = sessions[int(choice) - 1].path
+            except (ValueError, IndexError):
+                print("❌ Invalid choice.")
+                return False
+
+        return self.nav_manager.load_waypoint_file(map_file)
+
+    def _resolve(self, reference: str) -> Optional[str]:
+        """Waypoint id for an id or (case-insensitive) name."""
+        if reference.upper() in self.nav_manager.waypoints:
+            return reference.upper()
+        for wp_id in self.nav_manager.waypoint_order:
+            if self.nav_manager.waypoints[wp_id].name.lower() == reference.lower():
+                return wp_id
+        print(f"❌ Waypoint '{reference}' not found")
+        return None
+
+    def _list_waypoints(self):
+        print(f"\n{'ID':<8} {'Name':<20} {'x (cm)':>9} {'y (cm)':>9} {'z (cm)':>9}")
+        print("-" * 58)
+        for wp_id in self.nav_manager.waypoint_order:
+            x, y, z = self.nav_manager.get_waypoint_position(wp_id, self.vertical_factor)
+            print(f"{wp_id:<8} {self.nav_manager.waypoints[wp_id].name:<20} {x:>9.1f} {y:>9.1f} {z:>9.1f}")
+
+    def _plan(self, from_reference: str, to_reference: str):
+        from_id, to_id = self._resolve(from_reference), self._resolve(to_reference)
+        if from_id is None or to_id is None:
+            return
+        if from_id == to_id:
+            print("ℹ️  Start and destination are the same waypoint")
+            return
+
+        plan, direction = self.nav_manager.plan_route(from_id, to_id, route_mode=self.route_mode,
+                                                      vertical_factor=self.vertical_factor,
+                                                      strategy=self.heading_strategy, smooth=self.smooth)
+        summary = self.nav_manager.path_summary(from_id, to_id)
+        print(f"\n🧭 {from_id} → {to_id} ({direction.value}, {self.route_mode.value} route, "
+              f"{self.heading_strategy.value}{', smoothed' if self.smooth else ''})")
+        print(f"Recorded path: {summary['path_length']:.0f} cm, straight line: {summary['straight_distance']:.0f} cm")
+        print(f"{plan.command_count} commands from {plan.source_movements} movements, "
+              f"{plan.rotation_count} rotations, {plan.total_distance:.0f} cm flown")
+        print(f"Estimated time: {self.nav_manager.estimate_plan(plan).describe()}")
+        for i, command in enumerate(plan.commands, 1):
+            print(f"  {i}. {command.describe()}")
+        for note in plan.notes:
+            print(f"  ℹ️  {note}")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+from typing import Sequence, Tuple
+
+import numpy as np
+
+# Movement type codes shared by the index and the columnar map format
+MOVE = 0
+LIFT = 1
+
+# Lift direction codes
+NO_DIRECTION = 0
+UP = 1
+DOWN = 2
+
+# Columns of the per-movement and cumulative arrays
+X, Y, CLIMB, DESCENT, LENGTH = range(5)
+
+
+class PathIndex:
+    """
+    Prefix sums over the flattened movement list of a waypoint map.
+
+    Movements of all waypoints are laid out back to back; waypoint i owns
+    the slice offsets[i]:offsets[i + 1]. With a cumulative sum of each
+    movement's world-frame displacement, net displacement, path length and
+    slice bounds between any pair of waypoints are O(1) lookups.
+    """
+
+    def __init__(self, kinds: np.ndarray, yaws: np.ndarray, distances: np.ndarray,
+                 directions: np.ndarray, offsets: np.ndarray):
+        """
+        Build the index from per-movement columns.
+
+        Args:
+            kinds: MOVE or LIFT per movement
+            yaws: Yaw in degrees per movement (ignored for lifts)
+            distances: Distance in cm per movement
+            directions: UP, DOWN or NO_DIRECTION per movement
+            offsets: Start of each waypoint's movements, plus the total count at the end
+        """
+        kinds = np.asarray(kinds)
+        distances = np.asarray(distances, dtype=np.float64)
+        directions = np.asarray(directions)
+        radians = np.radians(np.nan_to_num(np.asarray(yaws, dtype=np.float64)))
+        is_move = kinds == MOVE
+
+        steps = np.zeros((len(distances), 5), dtype=np.float64)
+        steps[:, X] = np.where(is_move, distances * np.cos(radians), 0.0)
+        steps[:, Y] = np.where(is_move, distances * np.sin(radians), 0.0)
+        steps[:, CLIMB] = np.where(~is_move & (directions == UP), distances, 0.0)
+        steps[:, DESCENT] = np.where(~is_move & (directions != UP), distances, 0.0)
+        steps[:, LENGTH] = distances
+
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.cumulative = np.zeros((len(distances) + 1, 5), dtype=np.float64)
+        np.cumsum(steps, axis=0, out=self.cumulative[1:])
+        # Position reached at each waypoint: the prefix sum at the end of its slice
+        self.positions = self.cumulative[self.offsets[1:]]
+
+    @classmethod
+    def from_waypoints(cls, movement_lists: Sequence[Sequence]) -> 'PathIndex':
+        """Build the index from each waypoint's list of NavigationMovement objects."""
+        counts = np.fromiter((len(movements) for movements in movement_lists), dtype=np.int64,
+                             count=len(movement_lists))
+        offsets = np.zeros(len(movement_lists) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        total = int(offsets[-1])
+        kinds = np.empty(total, dtype=np.int8)
+        yaws = np.empty(total, dtype=np.float64)
+        distances = np.empty(total, dtype=np.float64)
+        directions = np.empty(total, dtype=np.int8)
+        k = 0
+        for movements in movement_lists:
+            for movement in movements:
+                kinds[k] = MOVE if movement.type == "move" else LIFT
+                yaws[k] = movement.yaw if movement.yaw is not None else np.nan
+                distances[k] = movement.distance
+                directions[k] = UP if movement.direction == "up" else DOWN if movement.direction == "down" else NO_DIRECTION
+                k += 1
+        return cls(kinds, yaws, distances, directions, offsets)
+
+    @classmethod
+    def from_records(cls, record_lists: Sequence[Sequence[dict]]) -> 'PathIndex':
+        """Build the index from each waypoint's movement records as stored in a waypoint file."""
+        counts = [len(records) for records in record_lists]
+        offsets = np.zeros(len(record_lists) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        records = [record for waypoint_records in record_lists for record in waypoint_records]
+        kinds = np.array([MOVE if record['type'] == "move" else LIFT for record in records], dtype=np.int8)
+        yaws = np.array([np.nan if record.get('yaw') is None else record['yaw'] for record in records], dtype=np.float64)
+        distances = np.array([record['distance'] for record in records], dtype=np.float64)
+        directions = np.array([UP if record.get('direction') == "up" else DOWN if record.get('direction') == "down"
+                               else NO_DIRECTION for record in records], dtype=np.int8)
+        return cls(kinds, yaws, distances, directions, offsets)
+
+    @property
+    def waypoint_count(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def movement_count(self) -> int:
+        return int(self.offsets[-1])
+
+    def position(self, index: int, vertical_factor: float = 1.0) -> Tuple[float, float, float]:
+        """Dead-reckoned (x, y, z) of a waypoint in cm relative to the first one."""
+        x, y, climb, descent, _ = self.positions[index]
+        return float(x), float(y), float(climb / vertical_factor - descent)
+
+    def displacement(self, from_index: int, to_index: int) -> Tuple[float, float, float, float]:
+        """Net (dx, dy, climb, descent) recorded between two waypoints, in flight order."""
+        delta = self.positions[to_index] - self.positions[from_index]
+        climb, descent = abs(delta[CLIMB]), abs(delta[DESCENT])
+        if to_index < from_index:
+            # Flying a recorded climb backwards is a descent and vice versa
+            climb, descent = descent, climb
+        return float(delta[X]), float(delta[Y]), float(climb), float(descent)
+
+    def path_length(self, from_index: int, to_index: int) -> float:
+        """Total recorded distance flown between two waypoints along the chain."""
+        return float(abs(self.positions[to_index, LENGTH] - self.positions[from_index, LENGTH]))
+
+    def slice_bounds(self, from_index: int, to_index: int) -> Tuple[int, int]:
+        """Bounds [start, stop) of the flat movement slice between two waypoints."""
+        low, high = sorted((from_index, to_index))
+        return int(self.offsets[low + 1]), int(self.offsets[high + 1])
+
+    def bounding_box(self, vertical_factor: float = 1.0) -> Tuple[Tuple[float, float, float], Tuple[float, float, float]]:
+        """Axis-aligned ((min_x, min_y, min_z), (max_x, max_y, max_z)) over all waypoints."""
+        if self.waypoint_count == 0:
+            return (0.0, 0.0, 0.0), (0.0, 0.0, 0.0)
+        points = np.column_stack((
+            self.positions[:, X],
+            self.positions[:, Y],
+            self.positions[:, CLIMB] / vertical_factor - self.positions[:, DESCENT],
+        ))
+        low, high = points.min(axis=0), points.max(axis=0)
+        return tuple(float(v) for v in low), tuple(float(v) for v in high)
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+import math
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import List, Optional, Sequence, Tuple
+
+MIN_DISTANCE = 20   # Smallest distance the SDK accepts for move/go commands (cm)
+MAX_DISTANCE = 500  # Largest distance the SDK accepts per axis (cm)
+MIN_CURVE_RADIUS = 50  # Arc radius range the SDK accepts for curve commands (cm)
+MAX_CURVE_RADIUS = 1000
+MAX_CURVE_SPEED = 60  # Fastest speed the SDK accepts for curve commands (cm/s)
+
+
+def normalize_angle(angle: float) -> float:
+    """Normalize an angle to the -180 to 180 range."""
+    return (angle + 180) % 360 - 180
+
+
+def _angle_between(u: Sequence[float], v: Sequence[float]) -> float:
+    cross = (u[1] * v[2] - u[2] * v[1], u[2] * v[0] - u[0] * v[2], u[0] * v[1] - u[1] * v[0])
+    return math.atan2(math.sqrt(sum(value * value for value in cross)), sum(a * b for a, b in zip(u, v)))
+
+
+def curve_geometry(point1: Sequence[float], point2: Sequence[float]) -> Optional[Tuple[float, float, float]]:
+    """
+    Circle arc from the origin through point1 to point2.
+
+    Returns:
+        (radius, arc length, largest distance from the arc to the straight legs),
+        or None if the points are collinear
+    """
+    to_second = [b - a for a, b in zip(point1, point2)]
+    a, b, c = math.dist((0, 0, 0), point1), math.dist(point1, point2), math.dist((0, 0, 0), point2)
+    turn = _angle_between(point1, point2)
+    if a < 1e-9 or b < 1e-9 or math.sin(turn) * a * c < 1e-6:
+        return None
+    radius = b / (2 * math.sin(turn))  # Law of sines: the angle at the origin faces the second leg
+    # Each leg's arc spans twice the inscribed angle opposite it
+    first_arc = 2 * _angle_between([-value for value in point2], [-value for value in to_second])
+    second_arc = 2 * turn
+    deviation = max(radius * (1 - math.cos(arc / 2)) for arc in (first_arc, second_arc))
+    return radius, radius * (first_arc + second_arc), deviation
+
+
+class HeadingStrategy(Enum):
+    TURN = "turn"  # Face each segment's direction and fly forward
+    STRAFE = "strafe"  # Hold one heading and fly forward, back, sideways or diagonally
+
+
+@dataclass
+class Segment:
+    """A world-frame displacement (x along yaw 0, y along yaw 90, z up) in cm."""
+    kind: str  # "move" or "lift"
+    dx: float = 0.0
+    dy: float = 0.0
+    dz: float = 0.0
+
+    @property
+    def horizontal(self) -> float:
+        return math.hypot(self.dx, self.dy)
+
+    @property
+    def yaw(self) -> float:
+        return math.degrees(math.atan2(self.dy, self.dx))
+
+    @property
+    def length(self) -> float:
+        return self.horizontal if self.kind == "move" else abs(self.dz)
+
+
+@dataclass
+class PlanCommand:
+    """A single drone command in a compiled plan."""
+    name: str  # "rotate_to", a "move_*" direction, "go_xyz_speed" or "curve_xyz_speed"
+    args: Tuple[int, ...]
+    heading: Optional[int] = None  # Heading the drone is expected to hold while executing
+
+    def describe(self) -> str:
+        """Human readable form used in plan printouts."""
+        if self.name == "rotate_to":
+            return f"rotate to {self.args[0]}°"
+        if self.name == "go_xyz_speed":
+            x, y, z, speed = self.args
+            return f"go x={x} y={y} z={z} at {speed} cm/s"
+        if self.name == "curve_xyz_speed":
+            x1, y1, z1, x2, y2, z2, speed = self.args
+            return f"curve via ({x1}, {y1}, {z1}) to ({x2}, {y2}, {z2}) at {speed} cm/s"
+        return f"{self.name.replace('_', ' ')} {self.args[0]} cm"
+
+    @property
+    def distance(self) -> float:
+        """Translation length of this command in cm (0 for rotations)."""
+        if self.name == "rotate_to":
+            return 0.0
+        if self.name == "go_xyz_speed":
+            x, y, z, _ = self.args
+            return math.sqrt(x * x + y * y + z * z)
+        if self.name == "curve_xyz_speed":
+            geometry = curve_geometry(self.args[0:3], self.args[3:6])
+            return geometry[1] if geometry else math.dist((0, 0, 0), self.args[3:6])
+        return float(self.args[0])
+
+    @property
+    def commanded_speed(self) -> Optional[int]:
+        """Speed carried by go/curve commands; None for commands flown at the set speed."""
+        if self.name in ("go_xyz_speed", "curve_xyz_speed"):
+            return self.args[-1]
+        return None
+
+
+@dataclass
+class CompiledPlan:
+    """Result of compiling a movement list into drone commands."""
+    commands: List[PlanCommand]
+    source_movements: int
+    residual: Tuple[float, float, float] = (0.0, 0.0, 0.0)  # Displacement too small to fly (cm)
+    notes: List[str] = field(default_factory=list)
+    smooth: bool = False  # Consecutive translations are chained without settling in between
+
+    @property
+    def command_count(self) -> int:
+        return len(self.commands)
+
+    @property
+    def rotation_count(self) -> int:
+        return sum(1 for command in self.commands if command.name == "rotate_to")
+
+    @property
+    def total_distance(self) -> float:
+        return sum(command.distance for command in self.commands)
+
+
+class PlanCompiler:
+    """
+    Compiles recorded navigation movements into a short list of drone commands.
+
+    The compiler merges consecutive same-yaw moves and consecutive lifts (so
+    opposing lifts cancel), carries sub-minimum residuals into the next
+    segment instead of inflating them to 20 cm, splits anything longer than
+    the SDK limit and folds a move and its adjacent lift into one
+    go_xyz_speed vector.
+    """
+
+    def __init__(self, speed: int = 55, merge_tolerance: float = 5.0,
+                 heading_tolerance: float = 5.0, vectorize: bool = True, curve_deviation: float = 30.0):
+        """
+        Initialize the compiler.
+
+        Args:
+            speed: Speed in cm/s used for go_xyz_speed commands
+            merge_tolerance: Max yaw difference (degrees) for merging consecutive moves
+            heading_tolerance: Max yaw error (degrees) absorbed into a vector instead of rotating
+            vectorize: If True, emit go_xyz_speed for move+lift pairs and off-axis moves
+            curve_deviation: Max distance (cm) a smoothing curve may stray from the recorded legs
+        """
+        self.speed = speed
+        self.merge_tolerance = merge_tolerance
+        self.heading_tolerance = heading_tolerance
+        self.vectorize = vectorize
+        self.curve_deviation = curve_deviation
+
+    @property
+    def config(self) -> Tuple:
+        """Settings that change the compiled output, for plan cache keys."""
+        return self.speed, self.merge_tolerance, self.heading_tolerance, self.vectorize, self.curve_deviation
+
+    def compile(self, movements: Sequence, vertical_factor: float = 1.0, scaled_lift: Optional[str] = None,
+                start_heading: Optional[float] = None, strategy: HeadingStrategy = HeadingStrategy.TURN,
+                end_heading: Optional[float] = None, smooth: bool = False) -> CompiledPlan:
+        """
+        Compile a movement list.
+
+        Args:
+            movements: NavigationMovement-like objects (type, distance, yaw, direction)
+            vertical_factor: Divisor applied to lifts in the scaled_lift direction
+            scaled_lift: "up" or "down", the lift direction affected by vertical airflow
+            start_heading: Current yaw of the drone, or None to always rotate before the first move
+            strategy: TURN faces every segment, STRAFE keeps the start heading throughout
+            end_heading: Yaw the drone must face on arrival, if any
+            smooth: Fly pairs of legs as curves where feasible and chain translations without settling
+
+        Returns:
+            CompiledPlan with the command list
+        """
+        segments = self._to_segments(movements, vertical_factor, scaled_lift)
+        segments = self._coalesce(segments)
+        segments, residual = self._carry_residuals(segments)
+        segments = self._coalesce(segments)
+        commands, (carry_x, carry_y, carry_z) = self._emit(segments, start_heading, strategy, smooth)
+        residual = (residual[0] + carry_x, residual[1] + carry_y, residual[2] + carry_z)
+
+        if end_heading is not None:
+            heading = next((command.heading for command in reversed(commands) if command.heading is not None),
+                           start_heading)
+            if heading is None or abs(normalize_angle(end_heading - heading)) > self.heading_tolerance:
+                end = int(round(normalize_angle(end_heading)))
+                commands.append(PlanCommand("rotate_to", (end,), heading=end))
+
+        plan = CompiledPlan(commands=commands, source_movements=len(movements), residual=residual, smooth=smooth)
+        if any(abs(value) >= 1 for value in residual):
+            plan.notes.append(f"Residual below {MIN_DISTANCE} cm not flown: "
+                              f"({residual[0]:.1f}, {residual[1]:.1f}, {residual[2]:.1f})")
+        return plan
+
+    # ------------------------------------------------------------------ passes
+
+    def _to_segments(self, movements: Sequence, vertical_factor: float, scaled_lift: Optional[str]) -> List[Segment]:
+        """Convert movements into world-frame segments."""
+        segments = []
+        for movement in movements:
+            distance = movement.distance or 0.0
+            if movement.type == "move":
+                rad = math.radians(movement.yaw if movement.yaw is not None else 0)
+                segments.append(Segment("move", dx=distance * math.cos(rad), dy=distance * math.sin(rad)))
+            else:
+                if movement.direction == scaled_lift:
+                    distance = distance / vertical_factor
+                sign = 1 if movement.direction == "up" else -1
+                segments.append(Segment("lift", dz=sign * distance))
+        return segments
+
+    def _coalesce(self, segments: List[Segment]) -> List[Segment]:
+        """Merge adjacent same-yaw moves and adjacent lifts, dropping empty results."""
+        merged: List[Segment] = []
+        for segment in segments:
+            if merged and merged[-1].kind == segment.kind:
+                last = merged[-1]
+                if segment.kind == "lift":
+                    last.dz += segment.dz
+                    continue
+                if (last.horizontal < 1e-9 or segment.horizontal < 1e-9
+                        or abs(normalize_angle(last.yaw - segment.yaw)) <= self.merge_tolerance):
+                    last.dx += segment.dx
+                    last.dy += segment.dy
+                    continue
+            merged.append(Segment(segment.kind, segment.dx, segment.dy, segment.dz))
+        return [segment for segment in merged if segment.length >= 1e-6]
+
+    def _carry_residuals(self, segments: List[Segment]) -> Tuple[List[Segment], Tuple[float, float, float]]:
+        """Fold segments shorter than MIN_DISTANCE into the next segment of the same kind."""
+        result: List[Segment] = []
+        pending_x = pending_y = pending_z = 0.0
+        for segment in segments:
+            if segment.kind == "move":
+                candidate = Segment("move", dx=segment.dx + pending_x, dy=segment.dy + pending_y)
+                if candidate.horizontal < MIN_DISTANCE:
+                    pending_x, pending_y = candidate.dx, candidate.dy
+                    continue
+                pending_x = pending_y = 0.0
+            else:
+                candidate = Segment("lift", dz=segment.dz + pending_z)
+                if abs(candidate.dz) < MIN_DISTANCE:
+                    pending_z = candidate.dz
+                    continue
+                pending_z = 0.0
+            result.append(candidate)
+
+        # Whatever is left over goes back into the last segment of the same kind
+        for segment in reversed(result):
+            if segment.kind == "move" and (pending_x or pending_y):
+                combined = Segment("move", dx=segment.dx + pending_x, dy=segment.dy + pending_y)
+                if combined.horizontal >= MIN_DISTANCE:
+                    segment.dx, segment.dy = combined.dx, combined.dy
+                    pending_x = pending_y = 0.0
+            elif segment.kind == "lift" and pending_z:
+                if abs(segment.dz + pending_z) >= MIN_DISTANCE:
+                    segment.dz += pending_z
+                    pending_z = 0.0
+
+        # A small lift can still ride along a move as the z part of a vector
+        if self.vectorize and pending_z and result:
+            result.append(Segment("lift", dz=pending_z))
+            pending_z = 0.0
+
+        return result, (pending_x, pending_y, pending_z)
+
+    def _emit(self, segments: List[Segment], start_heading: Optional[float],
+              strategy: HeadingStrategy = HeadingStrategy.TURN,
+              smooth: bool = False) -> Tuple[List[PlanCommand], Tuple[float, float, float]]:
+        """
+        Turn segments into SDK commands, tracking the expected heading.
+
+        Returns the commands and the world-frame displacement left unflown.
+        Whatever a leg's commands do not fly (axes or lifts inside the SDK
+        minimum, rounding) is carried into the next leg instead of being
+        dropped. With smooth, each pair of consecutive legs is flown as one
+        curve when the arc is within the SDK limits and close enough to the
+        recorded legs.
+        """
+        commands: List[PlanCommand] = []
+        heading = start_heading
+        carry_x = carry_y = carry_z = 0.0
+        i = 0
+        while i < len(segments):
+            leg = self._leg_at(segments, i)
+            if leg is None:
+                dz = segments[i].dz + carry_z
+                lift = self._lift_commands(dz, heading)
+                commands.extend(lift)
+                carry_z = dz - self._body_displacement(lift)[2]
+                i += 1
+                continue
+            move, dz, i = leg
+            move = Segment("move", dx=move.dx + carry_x, dy=move.dy + carry_y)
+            dz += carry_z
+
+            # STRAFE only turns when there is no heading to hold yet
+            if heading is None or (strategy == HeadingStrategy.TURN
+                                   and abs(normalize_angle(move.yaw - heading)) > self.heading_tolerance):
+                heading = int(round(move.yaw))
+                commands.append(PlanCommand("rotate_to", (heading,), heading=heading))
+
+            forward, left = self._to_body(move.dx, move.dy, heading)
+            translation = None
+            if smooth:
+                following = self._leg_at(segments, i)
+                if following is not None:
+                    next_forward, next_left = self._to_body(following[0].dx, following[0].dy, heading)
+                    curve = self._curve_command((forward, left, dz),
+                                                (forward + next_forward, left + next_left, dz + following[1]),
+                                                heading)
+                    if curve is not None:
+                        translation = [curve]
+                        forward, left, dz = forward + next_forward, left + next_left, dz + following[1]
+                        i = following[2]
+            if translation is None:
+                translation = self._translation_commands(forward, left, dz, heading)
+            commands.extend(translation)
+            flown_forward, flown_left, flown_up = self._body_displacement(translation)
+            carry_x, carry_y = self._to_world(forward - flown_forward, left - flown_left, heading)
+            carry_z = dz - flown_up
+
+        if math.hypot(carry_x, carry_y) >= MIN_DISTANCE:
+            # Still too short to fly sideways at the end of the route: turn to it instead
+            heading = int(round(math.degrees(math.atan2(carry_y, carry_x))))
+            commands.append(PlanCommand("rotate_to", (heading,), heading=heading))
+            forward, left = self._to_body(carry_x, carry_y, heading)
+            translation = self._translation_commands(forward, left, carry_z, heading)
+            commands.extend(translation)
+            flown_forward, flown_left, flown_up = self._body_displacement(translation)
+            carry_x, carry_y = self._to_world(forward - flown_forward, left - flown_left, heading)
+            carry_z -= flown_up
+        if abs(carry_z) >= MIN_DISTANCE:
+            lift = self._lift_commands(carry_z, heading)
+            commands.extend(lift)
+            carry_z -= self._body_displacement(lift)[2]
+        return commands, (carry_x, carry_y, carry_z)
+
+    def _leg_at(self, segments: List[Segment], i: int) -> Optional[Tuple[Segment, float, int]]:
+        """
+        The move starting at segments[i], with the lift on either side folded in when vectorizing.
+
+        Returns:
+            (move, dz, index after the leg), or None if segments[i] is a lift flown on its own
+        """
+        if i >= len(segments):
+            return None
+        segment = segments[i]
+        partner = segments[i + 1] if i + 1 < len(segments) else None
+        if segment.kind == "lift":
+            if self.vectorize and partner is not None and partner.kind == "move":
+                return partner, segment.dz, i + 2
+            return None
+        if self.vectorize and partner is not None and partner.kind == "lift":
+            return segment, partner.dz, i + 2
+        return segment, 0.0, i + 1
+
+    def _curve_command(self, point1: Tuple[float, float, float], point2: Tuple[float, float, float],
+                       heading: Optional[float]) -> Optional[PlanCommand]:
+        """A curve through two body-frame points, or None if the SDK cannot fly it or it strays too far."""
+        point1 = tuple(int(round(value)) for value in point1)
+        point2 = tuple(int(round(value)) for value in point2)
+        if any(abs(value) > MAX_DISTANCE for value in point1 + point2):
+            return None
+        if any(all(abs(value) <= MIN_DISTANCE for value in point) for point in (point1, point2)):
+            return None
+        geometry = curve_geometry(point1, point2)
+        if geometry is None:
+            return None
+        radius, _, deviation = geometry
+        if not MIN_CURVE_RADIUS <= radius <= MAX_CURVE_RADIUS or deviation > self.curve_deviation:
+            return None
+        return PlanCommand("curve_xyz_speed", point1 + point2 + (min(self.speed, MAX_CURVE_SPEED),),
+                           heading=self._heading_arg(heading))
+
+    @staticmethod
+    def _body_displacement(commands: List[PlanCommand]) -> Tuple[float, float, float]:
+        """Forward, left and up distance flown by translation commands."""
+        forward = left = up = 0.0
+        for command in commands:
+            if command.name == "go_xyz_speed":
+                forward += command.args[0]
+                left += command.args[1]
+                up += command.args[2]
+            elif command.name == "curve_xyz_speed":
+                forward += command.args[3]
+                left += command.args[4]
+                up += command.args[5]
+            elif command.name in ("move_forward", "move_back"):
+                forward += command.args[0] if command.name == "move_forward" else -command.args[0]
+            elif command.name in ("move_left", "move_right"):
+                left += command.args[0] if command.name == "move_left" else -command.args[0]
+            elif command.name in ("move_up", "move_down"):
+                up += command.args[0] if command.name == "move_up" else -command.args[0]
+        return forward, left, up
+
+    @staticmethod
+    def _to_body(dx: float, dy: float, heading: float) -> Tuple[float, float]:
+        """Rotate a world-frame displacement into forward and left components at a heading."""
+        rad = math.radians(heading)
+        return dx * math.cos(rad) + dy * math.sin(rad), dx * math.sin(rad) - dy * math.cos(rad)
+
+    @staticmethod
+    def _to_world(forward: float, left: float, heading: float) -> Tuple[float, float]:
+        """Rotate a body-frame displacement into the world frame."""
+        rad = math.radians(heading)
+        return (forward * math.cos(rad) + left * math.sin(rad),
+                forward * math.sin(rad) - left * math.cos(rad))
+
+    # ------------------------------------------------------------------ command builders
+
+    def _lift_commands(self, dz: float, heading: Optional[float]) -> List[PlanCommand]:
+        """Vertical-only commands, split at the SDK limit (none below MIN_DISTANCE; the caller carries it)."""
+        if abs(dz) < MIN_DISTANCE:
+            return []
+        name = "move_up" if dz > 0 else "move_down"
+        return [PlanCommand(name, (part,), heading=self._heading_arg(heading))
+                for part in self._split_scalar(abs(dz))]
+
+    def _translation_commands(self, forward: float, left: float, dz: float,
+                              heading: Optional[float]) -> List[PlanCommand]:
+        """Commands that fly a body-frame displacement, split at the SDK limit."""
+        heading_arg = self._heading_arg(heading)
+        on_axis = sum(abs(value) >= 1 for value in (forward, left, dz)) <= 1
+
+        if on_axis or not self.vectorize:
+            return self._axis_commands(forward, left, dz, heading)
+
+        parts = max(1, math.ceil(max(abs(forward), abs(left), abs(dz)) / MAX_DISTANCE))
+        x, y, z = forward / parts, left / parts, dz / parts
+        vector = (int(round(x)), int(round(y)), int(round(z)))
+        if all(abs(value) <= MIN_DISTANCE for value in vector):
+            # The SDK rejects vectors with every component inside ±20; the caller carries what is not flown
+            return self._axis_commands(forward, left, dz, heading)
+        return [PlanCommand("go_xyz_speed", vector + (self.speed,), heading=heading_arg) for _ in range(parts)]
+
+    def _axis_commands(self, forward: float, left: float, dz: float, heading: Optional[float]) -> List[PlanCommand]:
+        """One straight command per body axis long enough to fly, split at the SDK limit."""
+        heading_arg = self._heading_arg(heading)
+        commands = []
+        for value, positive, negative in ((forward, "move_forward", "move_back"), (left, "move_left", "move_right")):
+            if abs(value) >= MIN_DISTANCE:
+                name = positive if value > 0 else negative
+                commands.extend(PlanCommand(name, (part,), heading=heading_arg)
+                                for part in self._split_scalar(abs(value)))
+        if abs(dz) >= MIN_DISTANCE:
+            commands.extend(self._lift_commands(dz, heading))
+        return commands
+
+    @staticmethod
+    def _split_scalar(distance: float) -> List[int]:
+        """Split a distance into equal parts no longer than MAX_DISTANCE."""
+        parts = max(1, math.ceil(distance / MAX_DISTANCE))
+        base = distance / parts
+        return [int(round(base)) for _ in range(parts)]
+
+    @staticmethod
+    def _heading_arg(heading: Optional[float]) -> Optional[int]:
+        return int(round(heading)) if heading is not None else None
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+import threading
+import time
+from typing import Optional, Tuple
+
+
+class RCStreamer:
+    """
+    Sends the current RC setpoint to the drone at a fixed rate.
+
+    Input handling only updates the setpoint; this thread owns the RC
+    output. A new setpoint is sent immediately and then repeated every
+    1/rate seconds, so control output never waits on the input loop or on
+    telemetry queries, and the steady stream (zeros while hovering) keeps
+    the drone from auto-landing.
+    """
+
+    def __init__(self, drone_instance, rate: float = 20.0):
+        """
+        Initialize the streamer.
+
+        Args:
+            drone_instance: Drone with send_rc_control(left_right, forward_backward, up_down, yaw)
+            rate: RC packets per second
+        """
+        self.drone_instance = drone_instance
+        self.rate = rate
+
+        self._setpoint: Tuple[int, int, int, int] = (0, 0, 0, 0)
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        # Statistics
+        self.sent_count = 0
+        self.error_count = 0
+        self.last_sent = 0.0  # time.monotonic() of the last packet
+
+    @property
+    def setpoint(self) -> Tuple[int, int, int, int]:
+        with self._lock:
+            return self._setpoint
+
+    def set_setpoint(self, left_right: int = 0, forward_backward: int = 0, up_down: int = 0, yaw: int = 0):
+        """Update the velocities to stream; sent at once rather than on the next tick."""
+        with self._lock:
+            self._setpoint = (int(left_right), int(forward_backward), int(up_down), int(yaw))
+        self._changed.set()
+
+    def hold(self):
+        """Stream a zero setpoint (hover in place)."""
+        self.set_setpoint(0, 0, 0, 0)
+
+    def start(self):
+        """Start streaming in the background."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._stream_loop, name="RCStreamer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop streaming, leaving the drone with a final zero setpoint."""
+        if not self._running:
+            return
+        self._running = False
+        self._changed.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        with self._lock:
+            self._setpoint = (0, 0, 0, 0)
+        self._send((0, 0, 0, 0))
+
+    def _send(self, setpoint: Tuple[int, int, int, int]):
+        try:
+            self.drone_instance.send_rc_control(*setpoint)
+            self.sent_count += 1
+            self.last_sent = time.monotonic()
+        except Exception as e:
+            self.error_count += 1
+            print(f"\r⚠️  RC stream error: {e}")
+
+    def _stream_loop(self):
+        period = 1.0 / self.rate
+        while self._running:
+            # Clear before reading so a setpoint that arrives during the send is not missed
+            self._changed.clear()
+            with self._lock:
+                setpoint = self._setpoint
+            self._send(setpoint)
+            # Sleep until the next tick, or until a new setpoint arrives
+            self._changed.wait(timeout=period)
@@ -1,20 +1,63 @@
 #!/usr/bin/env python3
 import json
+import math
+import os
 import time
 import threading
 import uuid
-import sys
-import select
-import termios
-import tty
 from datetime import datetime
+from typing import Optional
+from frame_capture import FrameCapture, snapshot_path
+from input_backends import create_input_backend
+from movement_journal import MovementJournal, build_session_data, journal_path_for
+from odometry import OdometryEngine
+from rc_streamer import RCStreamer
+from telemetry import TelemetryCache, query_battery, query_height, query_yaw
+from visual_index import compute_signature, encode_signature
 
 
 class RealTimeDroneController:
-    def __init__(self):
-        """Initialize the drone controller with recording capabilities."""
+    # Key -> (direction, movement type)
+    MOVEMENT_KEYS = {
+        'w': ('forward', 'move'),
+        's': ('backward', 'move'),
+        'a': ('left', 'move'),
+        'd': ('right', 'move'),
+        'up': ('up', 'lift'),
+        'down': ('down', 'lift'),
+        'left': ('anticlockwise', 'rotate'),
+        'right': ('clockwise', 'rotate'),
+    }
+
+    def __init__(self, input_backend: str = "auto", rc_rate: float = 20.0):
+        """
+        Initialize the drone controller with recording capabilities.
+
+        Args:
+            input_backend: "auto", "keyboard" (real press/release events) or "termios"
+            rc_rate: RC setpoint packets per second while mapping
+        """
         self.movement_speed = 38  # cm/s
         self.rotation_speed = 70  # degrees/s
+
+        # Key input source and the coasting time it leaves unmeasured (set per session)
+        self.input_backend = input_backend
+        self.halt_delay = 0.0
+
+        # Fixed-rate RC output, running while keyboard control is active
+        self.rc_rate = rc_rate
+        self.rc_streamer: Optional[RCStreamer] = None
+
+        # Shared state-stream cache, odometry and video snapshots, provided by the caller in run()
+        self.telemetry = None
+        self.odometry: Optional[OdometryEngine] = None
+        self.frame_capture: Optional[FrameCapture] = None
+        self.signatures = {}  # Waypoint id -> visual signature, filled in by the snapshot encoder
+        self.settle_time = 0.5  # Seconds of coasting after a stop included in measured distances
+        # Measured/estimated distance ratios outside this range are taken as odometry dropouts, not corrections
+        self.odometry_plausible_ratio = (0.25, 4.0)
+        self._last_start_time = 0.0
+        self._pending_measurements = []
         
         # Movement tracking
         self.current_movement = None
@@ -26,63 +69,35 @@ class RealTimeDroneController:
         self.active_keys = set()
         self.add_movement = False
         
-        # JSON file for storing movement data
+        # JSON file for storing movement data, and the journal that protects it until saved
         self.data_file = f"drone_movements_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        self.journal = MovementJournal(journal_path_for(self.data_file))
     
     def get_drone_state(self, drone_instance=None):
-        """Get current drone state including position and yaw."""
+        """Get current drone state including height, yaw and battery."""
         try:
-            state = {}
-
-            # Get yaw (facing direction)
-            try:
-                attitude_str = drone_instance.send_command_with_return("attitude?", timeout=3)
-                print(f"Raw attitude response: '{attitude_str}'")  # Debug line
-                
-                # Parse attitude string like "pitch:0;roll:0;yaw:45;"
-                state['yaw'] = 0  # Default value
-                if attitude_str and ':' in attitude_str:
-                    attitude_parts = attitude_str.split(';')
-                    for part in attitude_parts:
-                        if part.strip() and 'yaw:' in part:
-                            try:
-                                yaw_value = part.split(':')[1].strip()
-                                if yaw_value:
-                                    state['yaw'] = int(yaw_value)
-                                    break
-                            except (ValueError, IndexError) as e:
-                                print(f"⚠️  Failed to parse yaw from '{part}': {e}")
-                                continue
-            except Exception as e:
-                print(f"⚠️  Attitude query failed: {e}")
-                state['yaw'] = 0
+            if self.telemetry is not None:
+                return self.telemetry.get_drone_state()
 
-            # Get height
-            try:
-                height_str = self.tello.send_command_with_return("height?", timeout=3)
-                # Height returns like "10dm" (decimeters), convert to cm
-                height_dm = int(height_str.replace('dm', ''))
-                state['height'] = height_dm * 10  # Convert dm to cm
-            except Exception as e:
-                print(f"⚠️  Height query failed: {e}")
-                state['height'] = 0
-            
-            # Get battery level
-            try:
-                battery_str = self.tello.send_command_with_return("battery?", timeout=3)
-                state['battery'] = int(battery_str)
-            except Exception as e:
-                print(f"⚠️  Battery query failed: {e}")
-                state['battery'] = 0
-            
-
-            return state
+            # No state stream available, fall back to blocking queries
+            return {
+                'yaw': query_yaw(drone_instance),
+                'height': query_height(drone_instance),
+                'battery': query_battery(drone_instance),
+            }
         except Exception as e:
             print(f"Error getting drone state: {e}")
             return {'height': 0, 'yaw': 0, 'battery': 0}
 
-    def start_movement(self, direction, movement_type="move", drone_instance=None):
-        """Start a movement in the specified direction."""
+    def _send_rc(self, drone_instance, left_right, forward_backward, up_down, yaw):
+        """Set the RC setpoint, streamed by the RC thread when it is running."""
+        if self.rc_streamer is not None:
+            self.rc_streamer.set_setpoint(left_right, forward_backward, up_down, yaw)
+        else:
+            drone_instance.send_rc_control(left_right, forward_backward, up_down, yaw)
+
+    def start_movement(self, direction, movement_type="move", drone_instance=None, timestamp=None):
+        """Start a movement in the specified direction (timestamp: key press time, time.monotonic())."""
         print(f"🚀 start_movement called: {movement_type} {direction}")  # Debug
         
         if self.current_movement is not None:
@@ -90,8 +105,10 @@ class RealTimeDroneController:
             return  # Already moving
         
         try: 
-            drone_state = self.get_drone_state(drone_instance)
-            start_yaw = drone_state.get('yaw', 0)  # Default to 0 if not available
+            if self.telemetry is not None:
+                start_yaw = self.telemetry.get_yaw()
+            else:
+                start_yaw = self.get_drone_state(drone_instance).get('yaw', 0)
         except Exception as e:
             print(f"Error getting drone state: {e}")
             start_yaw = 0
@@ -99,9 +116,10 @@ class RealTimeDroneController:
         self.current_movement = {
             'type': movement_type,
             'direction': direction,
-            'start_time': time.time(),
+            'start_time': timestamp if timestamp is not None else time.monotonic(),
             'start_yaw': start_yaw,
         }
+        self._last_start_time = self.current_movement['start_time']
         
         print(f"📝 Created movement record: {self.current_movement}")  # Debug
         
@@ -112,13 +130,13 @@ class RealTimeDroneController:
 
                 print(f"📡 Sending RC control for {direction}")  # Debug
                 if direction == "forward":
-                    drone_instance.send_rc_control(0, self.movement_speed, 0, 0)
+                    self._send_rc(drone_instance, 0, self.movement_speed, 0, 0)
                 elif direction == "backward":
-                    drone_instance.send_rc_control(0, -self.movement_speed, 0, 0)
+                    self._send_rc(drone_instance, 0, -self.movement_speed, 0, 0)
                 elif direction == "left":
-                    drone_instance.send_rc_control(-self.movement_speed, 0, 0, 0)
+                    self._send_rc(drone_instance, -self.movement_speed, 0, 0, 0)
                 elif direction == "right":
-                    drone_instance.send_rc_control(self.movement_speed, 0, 0, 0)
+                    self._send_rc(drone_instance, self.movement_speed, 0, 0, 0)
                 print(f"✅ RC control sent for {direction}")  # Debug
                     
             elif movement_type == "lift":
@@ -126,9 +144,9 @@ class RealTimeDroneController:
 
                 print(f"📡 Sending RC control for lift {direction}")  # Debug
                 if direction == "up":
-                    drone_instance.send_rc_control(0, 0, self.movement_speed, 0)
+                    self._send_rc(drone_instance, 0, 0, self.movement_speed, 0)
                 elif direction == "down":
-                    drone_instance.send_rc_control(0, 0, -self.movement_speed, 0)
+                    self._send_rc(drone_instance, 0, 0, -self.movement_speed, 0)
                 print(f"✅ RC control sent for lift {direction}")  # Debug
                     
             elif movement_type == "rotate":
@@ -136,9 +154,9 @@ class RealTimeDroneController:
 
                 print(f"📡 Sending RC control for rotate {direction}")  # Debug
                 if direction == "anticlockwise":
-                    drone_instance.send_rc_control(0, 0, 0, -self.rotation_speed)
+                    self._send_rc(drone_instance, 0, 0, 0, -self.rotation_speed)
                 elif direction == "clockwise":
-                    drone_instance.send_rc_control(0, 0, 0, self.rotation_speed)
+                    self._send_rc(drone_instance, 0, 0, 0, self.rotation_speed)
                 print(f"✅ RC control sent for rotate {direction}")  # Debug
                     
         except Exception as e:
@@ -147,8 +165,8 @@ class RealTimeDroneController:
             traceback.print_exc()
             self.current_movement = None
     
-    def stop_movement(self, drone_instance=None):
-        """Stop current movement and record the event."""
+    def stop_movement(self, drone_instance=None, timestamp=None):
+        """Stop current movement and record the event (timestamp: key release time, time.monotonic())."""
         if self.current_movement is None:
             return
         
@@ -156,7 +174,7 @@ class RealTimeDroneController:
             print("Stopping rotation movement...")
             # Stop drone rotation
             try:
-                drone_instance.send_rc_control(0, 0, 0, 0)
+                self._send_rc(drone_instance, 0, 0, 0, 0)
             except Exception as e:
                 print(f"Error stopping rotation movement: {e}")
                 
@@ -165,13 +183,14 @@ class RealTimeDroneController:
         
         # Stop drone movement
         try:
-            drone_instance.send_rc_control(0, 0, 0, 0)
+            self._send_rc(drone_instance, 0, 0, 0, 0)
         except Exception as e:
             print(f"Error stopping movement: {e}")
         
         # Calculate movement duration and distance
-        end_time = time.time()
-        duration = end_time - self.current_movement['start_time'] + 0.5 # Add a small buffer to account for halt delay
+        end_time = timestamp if timestamp is not None else time.monotonic()
+        # Backends that detect releases late add the coasting time they miss
+        duration = end_time - self.current_movement['start_time'] + self.halt_delay
         
         # Calculate distance moved
         distance = self.movement_speed * duration  # cm
@@ -188,14 +207,66 @@ class RealTimeDroneController:
         
         # Add to current waypoint movements
         self.current_waypoint_movements.append(movement_event)
+        self.journal.append('movement', movement=dict(movement_event))
         
         print(f"Recorded {movement_event['type']} {movement_event['direction']} at {movement_event['start_yaw']} degree(s): "
               f"{movement_event['distance']:.1f}cm")
+
+        if self.odometry is not None:
+            # Replace the estimate once the drone has coasted to a stop
+            timer = threading.Timer(self.settle_time + 0.2, self._apply_odometry,
+                                    (movement_event, self.current_movement['start_time'], end_time))
+            timer.daemon = True
+            timer.start()
+            self._pending_measurements.append(timer)
         
         self.current_movement = None
+
+    def _apply_odometry(self, movement_event, start_time, end_time):
+        """Overwrite a recorded distance with the displacement measured by odometry."""
+        window_end = end_time + self.settle_time
+        if start_time < self._last_start_time < window_end:
+            window_end = self._last_start_time  # The next movement already started
+        displacement = self.odometry.displacement(start_time, window_end)
+        if displacement is None:
+            return  # Track does not cover the movement, keep the estimate
+
+        dx, dy, dz = displacement
+        if movement_event['type'] == 'move':
+            offset = {'forward': 0, 'backward': 180, 'left': -90, 'right': 90}[movement_event['direction']]
+            heading = math.radians(movement_event['start_yaw'] + offset)
+            measured = dx * math.cos(heading) + dy * math.sin(heading)
+        else:
+            measured = dz if movement_event['direction'] == 'up' else -dz
+
+        estimate = movement_event['distance']
+        low, high = self.odometry_plausible_ratio
+        if not estimate * low <= measured <= estimate * high:
+            # vgx/vgy come in dm/s, so short or slow moves can integrate to no motion at all
+            print(f"\r⚠️  Odometry measured {measured:.1f}cm for {movement_event['type']} "
+                  f"{movement_event['direction']}, keeping the {estimate:.1f}cm estimate")
+            return
+        movement_event['distance'] = round(measured, 2)
+        self.journal.append('measurement', id=movement_event['id'], distance=movement_event['distance'])
+        print(f"\r📏 Measured {movement_event['type']} {movement_event['direction']}: "
+              f"{movement_event['distance']:.1f}cm (estimated {estimate:.1f}cm)")
+
+    def _finish_measurements(self):
+        """Wait for outstanding odometry measurements before saving."""
+        for timer in self._pending_measurements:
+            timer.join()
+        self._pending_measurements = []
     
     def mark_waypoint(self, name=None, auto_generated=False):
         """Mark a waypoint and save current movement cluster."""
+        # Snapshot the view before prompting for the name; the encoder thread writes it
+        snapshot = None
+        if self.frame_capture is not None:
+            waypoint_id = f"WP_{self.waypoint_counter + 1:03d}"
+            snapshot = snapshot_path(self.data_file, waypoint_id, image_format=self.frame_capture.image_format)
+            if not self.frame_capture.capture(snapshot, on_frame=lambda frame: self._store_signature(waypoint_id, frame)):
+                snapshot = None
+
         if not auto_generated and not name:
             name = input("Enter waypoint name: ").strip()
             if not name:
@@ -209,137 +280,76 @@ class RealTimeDroneController:
             'name': name or f"Waypoint_{self.waypoint_counter}",
             'movements_to_here': self.current_waypoint_movements.copy()
         }
+        if snapshot:
+            waypoint['snapshot'] = os.path.basename(snapshot)  # Relative to the session file
         
         self.waypoints.append(waypoint)
+        self.journal.append('waypoint', id=waypoint_id, name=waypoint['name'],
+                            **({'snapshot': waypoint['snapshot']} if snapshot else {}))
         
         print(f"Waypoint marked: {waypoint['name']} (ID: {waypoint_id})")
+        if snapshot:
+            print(f"Snapshot: {snapshot}")
         print(f"Movements recorded: {len(self.current_waypoint_movements)} events")
         
         # Reset movements for next waypoint cluster
         self.current_waypoint_movements = []
     
+    def _store_signature(self, waypoint_id: str, frame):
+        """Keep the visual signature of a waypoint's view (runs on the snapshot encoder thread)."""
+        signature = encode_signature(compute_signature(frame))
+        self.signatures[waypoint_id] = signature
+        self.journal.append('signature', id=waypoint_id, signature=signature)
+
     def save_to_json(self):
         """Save all waypoints and movements to JSON file."""
-        processed_waypoints = []
-        for waypoint in self.waypoints: 
-            processed_movements = []
-
-            # Movement type is either 'move', or 'lift' only
-            for movement in waypoint['movements_to_here']:
-                if movement['type'] == 'move':
-                    yaw = movement['start_yaw']
-                    if movement['direction'] == 'forward':
-                        yaw += 0
-                    elif movement['direction'] == 'backward':
-                        yaw += 180
-                    elif movement['direction'] == 'left':
-                        yaw -= 90
-                    elif movement['direction'] == 'right':
-                        yaw += 90
-                    
-                    # Normalize yaw to -180 to 180 range
-                    if yaw > 180: 
-                        yaw -= 360
-                    elif yaw < -180:
-                        yaw += 360
-                    
-                    processed_movement = {
-                        'id': movement['id'],
-                        'type': movement['type'],
-                        'yaw': yaw, 
-                        'distance': movement['distance'],
-                        'timestamp': movement['timestamp']
-                    }
-
-                    processed_movements.append(processed_movement)
-                
-                else: 
-                    # For 'lift' movements, we can just record the type distance and direction
-                    processed_movement = {
-                        'id': movement['id'],
-                        'type': movement['type'],
-                        'direction': movement['direction'],
-                        'distance': movement['distance'],
-                        'timestamp': movement['timestamp']
-                    }
-                    processed_movements.append(processed_movement)
-
-            processed_waypoint = {
-                'id': waypoint['id'],
-                'name': waypoint['name'],
-                'movements_to_here': processed_movements
-            }
-
-            processed_waypoints.append(processed_waypoint)
-
-        data = {
-            'session_info': {
-                'total_waypoints': len(self.waypoints),
-                'total_movements': sum(len(wp['movements_to_here']) for wp in self.waypoints)
-            },
-            'waypoints': processed_waypoints
-        }
+        if self.frame_capture is not None:
+            self.frame_capture.flush()  # Signatures of the last waypoints may still be computing
+        for waypoint in self.waypoints:
+            if waypoint['id'] in self.signatures:
+                waypoint['signature'] = self.signatures[waypoint['id']]
+        data = build_session_data(self.waypoints)
         
         try:
-            with open(self.data_file, 'w') as f:
+            # Write to a temporary file first so a crash never leaves a half-written map
+            temp_file = self.data_file + ".tmp"
+            with open(temp_file, 'w') as f:
                 json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())  # On disk before the journal that protects it is removed
+            os.replace(temp_file, self.data_file)
             print(f"Data saved to {self.data_file}")
+            return True
         except Exception as e:
             print(f"Error saving data: {e}")
+            return False
     
-    def get_key(self):
-        """Get a single key press without blocking."""
-        if select.select([sys.stdin], [], [], 0.5) == ([sys.stdin], [], []):
-            # Read a single character from stdin
-            key = sys.stdin.read(1).lower()
-            
-            if key == '\x1b':
-
-                time.sleep(0.02)  # Allow time for escape sequence
-                if select.select([sys.stdin], [], [], 0.1)[0]: 
-                    bracket = sys.stdin.read(1)
-                    if bracket == '[' and select.select([sys.stdin], [], [], 0.1)[0]:
-                        arrow = sys.stdin.read(1)
-                        arrow_map = {
-                            'A': 'up',  # Up arrow
-                            'B': 'down',  # Down arrow
-                            'C': 'right',  # Right arrow
-                            'D': 'left'   # Left arrow
-                        }
-                        return arrow_map.get(arrow, 'unknown_key')
-                return 'incomplete'
-            elif key == '[': 
-                # Ignore the alphebet key character that follows
-                if select.select([sys.stdin], [], [], 0.1)[0]:
-                    sys.stdin.read(1)
-                return 'ignored_key'  
-            else: 
-                return key  # Regular key press
-        return None
-
     def handle_keypress(self, drone_instance=None):
-        """Handle keyboard input for drone control using termios."""
-        
-        # Save original terminal settings
-        old_settings = termios.tcgetattr(sys.stdin)
-        
+        """Handle keyboard press/release events for drone control."""
+        backend = create_input_backend(self.input_backend)
+        backend.start()
+        self.halt_delay = backend.halt_delay
+
+        self.rc_streamer = RCStreamer(drone_instance, rate=self.rc_rate)
+        self.rc_streamer.start()
+
         try:
-            # Set terminal to raw mode for immediate key detection
-            tty.setraw(sys.stdin)
-            
             activeMovementKey = None
             x_pressed = False
             last_battery_check = 0
-            
-            print("🎮 Keyboard controls active!")
-            
+
+            print(f"\r🎮 Keyboard controls active! ({backend.name} input)")
+
             while True:
                 # Battery check every 5 seconds
                 current_time = time.time()
                 if current_time - last_battery_check > 5:
                     try:
-                        battery_str = drone_instance.send_command_with_return("battery?", timeout=5)
-                        battery = int(battery_str)
+                        if self.telemetry is not None:
+                            battery = self.telemetry.get_battery()
+                        else:
+                            battery_str = drone_instance.send_command_with_return("battery?", timeout=5)
+                            battery = int(battery_str)
                         if battery < 20:
                             print(f"\r⚠️  Low battery ({battery}%)               ")
                             if battery < 10:
@@ -348,96 +358,80 @@ class RealTimeDroneController:
                         last_battery_check = current_time
                     except Exception as e:
                         print(f"\rError checking battery: {e}")
-                
-                # Get key input
-                key = self.get_key()
-                
-                if key:
-                    print(f"\r🎮 Key: '{key}'                    ")
-                    
-                    if key == 'q':  
-                        print("\r--- Finishing mapping session ---")
-                        break
-                    elif key == 'x': 
-                        if not x_pressed:
-                            if self.current_movement:
-                                self.stop_movement(drone_instance=drone_instance)
-                                activeMovementKey = None
-
-                            print("\r--- Marking Waypoint ---")
-                            termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
-
-                            self.mark_waypoint()
-
-                            old_settings = termios.tcgetattr(sys.stdin)
-                            tty.setraw(sys.stdin)
-                            x_pressed = True
-                        else:
-                            print("\r--- Waypoint already marked ---")
-                            continue
-                    elif key in ['w', 'a', 's', 'd', 'up', 'down', 'left', 'right']:
-                        x_pressed = False  # Reset x_pressed flag
-                        if key != activeMovementKey:
-                            # Stop current movement if any
-                            if activeMovementKey:
-                                print(f"\r🛑 Stopping movement: {activeMovementKey}        ")
-                                self.stop_movement(drone_instance=drone_instance)
-
-                            # Start new movement
-                            activeMovementKey = key
-                            print(f"\r🚀 Starting movement: {key}        ")
-                            
-                            match key:
-                                case 'w': 
-                                    self.start_movement('forward', 'move', drone_instance)
-                                case 's': 
-                                    self.start_movement('backward', 'move', drone_instance)
-                                case 'a': 
-                                    self.start_movement('left', 'move', drone_instance)
-                                case 'd': 
-                                    self.start_movement('right', 'move', drone_instance)
-                                case 'up':  
-                                    self.start_movement('up', 'lift', drone_instance)
-                                case 'down':  
-                                    self.start_movement('down', 'lift', drone_instance)
-                                case 'left':  
-                                    self.start_movement('anticlockwise', 'rotate', drone_instance)
-                                case 'right':  
-                                    self.start_movement('clockwise', 'rotate', drone_instance)
-                        else: 
-                            # Same movement continues
-                            print(f"\r🚀 Continuing movement: {activeMovementKey}    ")
-                            continue
-                    else:
-                        # Stop movement or remain still on other keys
-                        print(f"\r🎮 Unrecognized key: '{key}'                  ")
+
+                # Wait briefly for the next key event
+                event = backend.read_event(timeout=0.05)
+                if event is None:
+                    continue
+                key = event.key
+
+                if not event.pressed:
+                    # Releasing the held key ends its movement at the release time
+                    if key == activeMovementKey:
+                        print(f"\r🛑 Key released, stopping movement: {key}    ")
+                        self.stop_movement(drone_instance=drone_instance, timestamp=event.timestamp)
+                        activeMovementKey = None
+                    continue
+
+                print(f"\r🎮 Key: '{key}'                    ")
+
+                if key == 'q':
+                    print("\r--- Finishing mapping session ---")
+                    break
+                elif key == 'x':
+                    if not x_pressed:
                         if self.current_movement:
-                            print("\r🛑 Stopping current movement due to unrecognized key")
-                            self.stop_movement(drone_instance=drone_instance)
+                            self.stop_movement(drone_instance=drone_instance, timestamp=event.timestamp)
                             activeMovementKey = None
-                        continue
+
+                        print("\r--- Marking Waypoint ---")
+                        backend.suspend()
+
+                        self.mark_waypoint()
+
+                        backend.resume()
+                        x_pressed = True
+                    else:
+                        print("\r--- Waypoint already marked ---")
+                elif key in self.MOVEMENT_KEYS:
+                    x_pressed = False  # Reset x_pressed flag
+                    # Stop current movement if any
+                    if activeMovementKey:
+                        print(f"\r🛑 Stopping movement: {activeMovementKey}        ")
+                        self.stop_movement(drone_instance=drone_instance, timestamp=event.timestamp)
+
+                    # Start new movement
+                    activeMovementKey = key
+                    print(f"\r🚀 Starting movement: {key}        ")
+                    direction, movement_type = self.MOVEMENT_KEYS[key]
+                    self.start_movement(direction, movement_type, drone_instance, timestamp=event.timestamp)
                 else:
-                    # No key pressed, stop any movement
+                    # Stop movement or remain still on other keys
+                    print(f"\r🎮 Unrecognized key: '{key}'                  ")
                     if self.current_movement:
-                        print("\r🛑 No key pressed, stopping current movement    ")
-                        self.stop_movement(drone_instance=drone_instance)
+                        print("\r🛑 Stopping current movement due to unrecognized key")
+                        self.stop_movement(drone_instance=drone_instance, timestamp=event.timestamp)
                         activeMovementKey = None
-                    continue
-                
-                time.sleep(0.05)  # Fast responsive loop
-                
+
         except Exception as e:
             print(f"\rError in keyboard handling: {e}")
         finally:
-            # Restore terminal settings
-            termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
+            self.rc_streamer.stop()
+            self.rc_streamer = None
+            backend.stop()
             print("\r🎮 Keyboard controls ended            ")
     
     
-    def run(self, drone_instance=None):
+    def run(self, drone_instance=None, telemetry: Optional[TelemetryCache] = None,
+            odometry: Optional[OdometryEngine] = None, frame_capture: Optional[FrameCapture] = None):
         """Main control loop."""
         
+        self.telemetry = telemetry
+        self.odometry = odometry
+        self.frame_capture = frame_capture
+
         print("Starting keyboard control... Press ESC to exit")
+        self.journal.open(data_file=self.data_file)
         
         # Mark the first waypoint automatically
         self.mark_waypoint("START", auto_generated=True)
@@ -452,12 +446,17 @@ class RealTimeDroneController:
             # Ensure the last waypoint is marked if there are movements
             if self.current_movement:
                 self.stop_movement(drone_instance=drone_instance)
+            self._finish_measurements()
             
             # Mark final waypoint if there are pending movements
             if self.current_waypoint_movements:
                 self.mark_waypoint("END", auto_generated=True)
 
-            # Save data to JSON file
-            self.save_to_json()
+            # Save data to JSON file; the journal is only needed until that succeeds
+            self.journal.close()
+            if self.save_to_json():
+                os.remove(self.journal.path)
+            else:
+                print(f"⚠️  Session kept in {self.journal.path}, recover it with: python movement_journal.py recover {self.journal.path}")
                 
             print(f"\nSession complete! Data saved to: {self.data_file}")
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+SQLite catalog of mapping sessions.
+
+Keeps one row per drone_movements_* file (JSON or .tmap) with its waypoint
+names, counts, total path length, bounding box and last-flown time. Files
+are only re-read when their mtime or size changes, so listing and
+searching thousands of archived sessions stays fast.
+
+Usage:
+    python session_catalog.py list [--search NAME] [--min-waypoints N]
+    python session_catalog.py waypoints NAME
+"""
+import argparse
+import fnmatch
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from path_index import LENGTH, PathIndex
+from waypoint_map import EXTENSION as MAP_EXTENSION, WaypointMap
+
+PATTERNS = ("drone_movements_*.json", f"drone_movements_*{MAP_EXTENSION}")
+DEFAULT_DB = "session_catalog.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    waypoint_count INTEGER NOT NULL DEFAULT 0,
+    movement_count INTEGER NOT NULL DEFAULT 0,
+    path_length REAL NOT NULL DEFAULT 0,
+    min_x REAL, min_y REAL, min_z REAL,
+    max_x REAL, max_y REAL, max_z REAL,
+    last_flown REAL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS waypoints (
+    path TEXT NOT NULL REFERENCES sessions(path) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (path, position)
+);
+CREATE INDEX IF NOT EXISTS waypoints_by_name ON waypoints (name COLLATE NOCASE);
+"""
+
+
+def _contains_pattern(text: str) -> str:
+    """LIKE pattern matching text anywhere, with its own %, _ and \\ taken literally (ESCAPE '\\')."""
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+@dataclass
+class SessionEntry:
+    """Catalog summary of one mapping session file."""
+    path: str
+    modified: float  # File mtime (epoch seconds)
+    waypoint_count: int
+    movement_count: int
+    path_length: float  # cm along the recorded chain
+    bounding_box: Tuple[Tuple[float, float, float], Tuple[float, float, float]]
+    last_flown: Optional[float] = None
+    waypoint_names: List[str] = field(default_factory=list)
+
+    def describe(self, max_names: int = 4) -> str:
+        """One-line summary used by the menus and the CLI."""
+        (min_x, min_y, min_z), (max_x, max_y, max_z) = self.bounding_box
+        names = ", ".join(self.waypoint_names[:max_names])
+        if len(self.waypoint_names) > max_names:
+            names += ", ..."
+        flown = datetime.fromtimestamp(self.last_flown).strftime('%Y-%m-%d %H:%M') if self.last_flown else "never"
+        return (f"{self.path} | {self.waypoint_count} waypoints, {self.path_length / 100:.1f} m, "
+                f"{(max_x - min_x) / 100:.1f}x{(max_y - min_y) / 100:.1f}x{(max_z - min_z) / 100:.1f} m, "
+                f"flown: {flown} | {names}")
+
+
+class SessionCatalog:
+    """SQLite index over the session files in a directory."""
+
+    def __init__(self, directory: str = ".", db_path: Optional[str] = None):
+        """
+        Open (or create) the catalog.
+
+        Args:
+            directory: Directory holding the drone_movements_* files
+            db_path: Catalog database (defaults to session_catalog.db in that directory)
+        """
+        self.directory = directory
+        self.db_path = db_path or os.path.join(directory, DEFAULT_DB)
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def _scan(self) -> Dict[str, os.stat_result]:
+        """Session files in the directory with their stat results."""
+        files = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and any(fnmatch.fnmatch(entry.name, pattern) for pattern in PATTERNS):
+                    path = entry.name if self.directory == "." else entry.path
+                    files[path] = entry.stat()
+        return files
+
+    def refresh(self) -> int:
+        """Bring the catalog up to date with the directory; returns the number of files (re)indexed."""
+        files = self._scan()
+        known = {path: (mtime_ns, size) for path, mtime_ns, size
+                 in self.connection.execute("SELECT path, mtime_ns, size FROM sessions")}
+
+        indexed = 0
+        with self.connection:
+            for path in known.keys() - files.keys():
+                self.connection.execute("DELETE FROM sessions WHERE path = ?", (path,))
+            for path, stat in files.items():
+                if known.get(path) != (stat.st_mtime_ns, stat.st_size):
+                    self._index_file(path, stat)
+                    indexed += 1
+        return indexed
+
+    def _index_file(self, path: str, stat: os.stat_result):
+        """Read one session file and store its summary."""
+        waypoints, error = [], None
+        try:
+            if path.endswith(MAP_EXTENSION):
+                waypoint_map = WaypointMap(path)
+                waypoints = waypoint_map.waypoints
+                path_index = waypoint_map.path_index()
+            else:
+                with open(path, 'r') as f:
+                    waypoints = json.load(f).get('waypoints', [])
+                path_index = PathIndex.from_records([wp.get('movements_to_here', []) for wp in waypoints])
+            (min_x, min_y, min_z), (max_x, max_y, max_z) = path_index.bounding_box()
+            path_length = float(path_index.cumulative[-1, LENGTH])
+            movement_count = path_index.movement_count
+        except Exception as e:
+            error = str(e)
+            waypoints, movement_count, path_length = [], 0, 0.0
+            min_x = min_y = min_z = max_x = max_y = max_z = 0.0
+
+        # Upsert keeps last_flown across re-indexing
+        self.connection.execute("""
+            INSERT INTO sessions (path, mtime_ns, size, waypoint_count, movement_count, path_length,
+                                  min_x, min_y, min_z, max_x, max_y, max_z, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                mtime_ns = excluded.mtime_ns, size = excluded.size,
+                waypoint_count = excluded.waypoint_count, movement_count = excluded.movement_count,
+                path_length = excluded.path_length,
+                min_x = excluded.min_x, min_y = excluded.min_y, min_z = excluded.min_z,
+                max_x = excluded.max_x, max_y = excluded.max_y, max_z = excluded.max_z,
+                error = excluded.error
+        """, (path, stat.st_mtime_ns, stat.st_size, len(waypoints), movement_count, path_length,
+              min_x, min_y, min_z, max_x, max_y, max_z, error))
+        self.connection.execute("DELETE FROM waypoints WHERE path = ?", (path,))
+        self.connection.executemany(
+            "INSERT INTO waypoints (path, position, id, name) VALUES (?, ?, ?, ?)",
+            [(path, position, wp.get('id', ''), wp.get('name', '')) for position, wp in enumerate(waypoints)])
+
+    def sessions(self, search: Optional[str] = None, min_waypoints: int = 0,
+                 limit: Optional[int] = None) -> List[SessionEntry]:
+        """
+        Readable sessions, newest file name first.
+
+        Args:
+            search: Case-insensitive text matched against file and waypoint names
+            min_waypoints: Skip sessions with fewer waypoints
+            limit: Maximum number of sessions to return
+        """
+        selection = "FROM sessions WHERE error IS NULL AND waypoint_count >= ?"
+        params: list = [min_waypoints]
+        if search:
+            pattern = _contains_pattern(search)
+            selection += (" AND (path LIKE ? ESCAPE '\\' OR path IN "
+                          "(SELECT path FROM waypoints WHERE name LIKE ? ESCAPE '\\' COLLATE NOCASE))")
+            params += [pattern, pattern]
+        selection += " ORDER BY path DESC"
+        if limit is not None:
+            selection += " LIMIT ?"
+            params.append(limit)
+
+        entries = [SessionEntry(path=row[0], modified=row[1] / 1e9, waypoint_count=row[2], movement_count=row[3],
+                                path_length=row[4], bounding_box=(tuple(row[5:8]), tuple(row[8:11])),
+                                last_flown=row[11])
+                   for row in self.connection.execute(
+                       "SELECT path, mtime_ns, waypoint_count, movement_count, path_length, "
+                       "min_x, min_y, min_z, max_x, max_y, max_z, last_flown " + selection, params)]
+
+        # Names for the same selection through a join, so no bound variable per session
+        by_path = {entry.path: entry for entry in entries}
+        if by_path:
+            for path, name in self.connection.execute(
+                    "SELECT waypoints.path, waypoints.name FROM waypoints "
+                    f"JOIN (SELECT path {selection}) AS selected ON selected.path = waypoints.path "
+                    "ORDER BY waypoints.path, waypoints.position", params):
+                by_path[path].waypoint_names.append(name)
+        return entries
+
+    def find_waypoints(self, name: str) -> List[Tuple[str, str, str]]:
+        """(path, waypoint id, waypoint name) of every waypoint whose name contains the text."""
+        return list(self.connection.execute(
+            "SELECT path, id, name FROM waypoints WHERE name LIKE ? ESCAPE '\\' COLLATE NOCASE "
+            "ORDER BY path DESC, position", (_contains_pattern(name),)))
+
+    def mark_flown(self, path: str, when: Optional[float] = None):
+        """Record that a route from this session was just flown."""
+        with self.connection:
+            self.connection.execute("UPDATE sessions SET last_flown = ? WHERE path = ?",
+                                    (when if when is not None else time.time(), path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search the catalog of mapping sessions')
+    parser.add_argument('--directory', default='.', help='Directory holding the session files')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    list_parser = subparsers.add_parser('list', help='List sessions, newest first')
+    list_parser.add_argument('--search', help='Match file or waypoint names')
+    list_parser.add_argument('--min-waypoints', type=int, default=0)
+    list_parser.add_argument('--limit', type=int)
+    waypoint_parser = subparsers.add_parser('waypoints', help='Find waypoints by name across all sessions')
+    waypoint_parser.add_argument('name')
+    args = parser.parse_args()
+
+    catalog = SessionCatalog(args.directory)
+    try:
+        start = time.perf_counter()
+        indexed = catalog.refresh()
+        if args.command == 'list':
+            entries = catalog.sessions(search=args.search, min_waypoints=args.min_waypoints, limit=args.limit)
+            for entry in entries:
+                print(entry.describe())
+            print(f"\n{len(entries)} sessions ({indexed} re-indexed) in {(time.perf_counter() - start) * 1000:.0f} ms")
+        else:
+            for path, waypoint_id, name in catalog.find_waypoints(args.name):
+                print(f"{path}: {waypoint_id} '{name}'")
+    finally:
+        catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Swarm navigation: several drones flying one waypoint map at the same time.
+
+Every drone gets its own WaypointNavigationManager (current waypoint, plan
+cache, cost model) and its own worker thread. A shared scheduler hands out
+destinations from a job list and books the map resources each leg needs in
+a reservation table:
+
+- the recorded segments (corridors) between consecutive waypoints and the
+  waypoints along the leg, for the leg's estimated time window
+- the destination, from the leg's start until the drone flies on again
+
+A drone waiting at a waypoint holds it, and a leg only starts when none of
+its resources is booked by another drone over the same window, so two
+drones never share a corridor. The run ends with the fleet throughput in
+waypoints visited per minute.
+
+Real Tello EDUs in station mode are built with djitellopy's TelloSwarm,
+which shares one socket and tells the drones apart by IP. Simulators on one
+machine share an IP, so they are driven by TelloBridge clients instead,
+each with its own sockets:
+
+    python swarm_navigation.py drone_movements_20250708_181217.json --simulate 3 --rounds 2
+    python swarm_navigation.py map.json --drone 127.0.0.1:9889:9890 --drone 127.0.0.1:9891:9892
+    python swarm_navigation.py map.json --client djitellopy --drone 192.168.1.11 --drone 192.168.1.12
+"""
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from command_metrics import CommandMetrics, instrument, metrics_path
+from cost_model import FlightCostModel
+from health_monitor import HealthMonitor
+from plan_compiler import HeadingStrategy
+from telemetry import TelemetryCache
+from waypoint_navigation import RouteMode, WaypointNavigationManager
+
+INFINITY = float('inf')
+LEG_MARGIN = 2.0  # Seconds added to every leg window for estimate error
+OVERRUN_RECHECK = 1.0  # Seconds between checks on a leg that has overrun its window
+SIMULATOR_BASE_PORT = 9889  # --simulate puts drone i on this + 2i, state on the port after
+
+Resource = Tuple[str, int]  # ('segment', i) joins waypoints i and i + 1; ('waypoint', i)
+
+
+@dataclass
+class Reservation:
+    """One booking of a map resource."""
+    owner: str
+    resource: Hashable
+    start: float
+    end: float  # INFINITY while a drone holds a waypoint
+
+
+class ReservationTable:
+    """
+    Time windows during which map resources are booked.
+
+    Bookings stay in the table until they are released, and one that runs
+    past its end (a leg slower than estimated) keeps blocking until then.
+    """
+
+    def __init__(self):
+        self._bookings: Dict[Hashable, List[Reservation]] = defaultdict(list)
+
+    def _conflict_end(self, owner: str, resource: Hashable, start: float, end: float, now: float) -> Optional[float]:
+        """End of the latest booking by another owner that overlaps [start, end), or None if free."""
+        latest = None
+        for booking in self._bookings.get(resource, ()):
+            if booking.owner == owner:
+                continue
+            # A booking past its end is still in use; assume it goes on a little longer and check again then
+            booking_end = booking.end if booking.end > now else now + OVERRUN_RECHECK
+            if booking.start < end and start < booking_end:
+                latest = booking_end if latest is None else max(latest, booking_end)
+        return latest
+
+    def earliest_start(self, owner: str, resources: Sequence[Hashable], duration: float,
+                       hold: Optional[Hashable], now: float) -> float:
+        """
+        Earliest time from now at which the resources are free for duration.
+
+        Args:
+            owner: Drone asking (its own bookings never conflict)
+            resources: Resources used during the window
+            duration: Length of the window in seconds
+            hold: Resource that must stay free from the start on (the destination)
+            now: Current time
+
+        Returns:
+            Start time, or INFINITY if a resource is held indefinitely
+        """
+        start = now
+        while start < INFINITY:
+            conflicts = [self._conflict_end(owner, resource, start, start + duration, now) for resource in resources]
+            if hold is not None:
+                conflicts.append(self._conflict_end(owner, hold, start, INFINITY, now))
+            conflicts = [end for end in conflicts if end is not None]
+            if not conflicts:
+                return start
+            start = max(conflicts)  # Every earlier start still overlaps that booking
+        return INFINITY
+
+    def book(self, owner: str, resources: Sequence[Hashable], start: float, end: float) -> List[Reservation]:
+        bookings = [Reservation(owner, resource, start, end) for resource in resources]
+        for booking in bookings:
+            self._bookings[booking.resource].append(booking)
+        return bookings
+
+    def release(self, bookings: Sequence[Reservation]):
+        for booking in bookings:
+            entries = self._bookings.get(booking.resource)
+            if entries and booking in entries:
+                entries.remove(booking)
+
+
+@dataclass
+class SwarmDrone:
+    """One drone of the swarm with its own navigation state."""
+    name: str
+    tello: object
+    manager: WaypointNavigationManager
+    telemetry: Optional[TelemetryCache] = None
+    health_monitor: Optional[HealthMonitor] = None
+    visits: int = 0
+    flight_seconds: float = 0.0
+    wait_seconds: float = 0.0  # Hovering until a booked window opened
+    failed: bool = False
+    parking: List[Reservation] = field(default_factory=list)  # Hold on the current waypoint
+
+
+@dataclass
+class Leg:
+    """A booked flight from a drone's current waypoint to a destination."""
+    drone: SwarmDrone
+    target: str
+    resources: List[Resource]
+    duration: float
+    start: float
+    bookings: List[Reservation] = field(default_factory=list)
+    parking: List[Reservation] = field(default_factory=list)  # Hold on the destination
+
+
+class SwarmScheduler:
+    """Assigns destinations to drones and books the corridors they fly through."""
+
+    def __init__(self, jobs: Sequence[str], route_mode: RouteMode = RouteMode.CHAIN, vertical_factor=1.0,
+                 strategy: HeadingStrategy = HeadingStrategy.TURN, smooth: bool = False,
+                 leg_margin: float = LEG_MARGIN):
+        """
+        Initialize the scheduler.
+
+        Args:
+            jobs: Waypoint ids to visit, one visit each (repeat an id to visit it again)
+            route_mode, vertical_factor, strategy, smooth: Planning options for every leg
+            leg_margin: Seconds added to every estimated leg window
+        """
+        self.pending: List[str] = list(jobs)
+        self.route_mode = route_mode
+        self.vertical_factor = vertical_factor
+        self.strategy = strategy
+        self.smooth = smooth
+        self.leg_margin = leg_margin
+        self.table = ReservationTable()
+        self.unreachable: List[str] = []
+        self.first_departure: Optional[float] = None
+        self.last_arrival: Optional[float] = None
+        self._condition = threading.Condition()
+        self._active: Dict[str, SwarmDrone] = {}
+        self._idle: set = set()  # Active drones that found no job they could book
+        self._booked = 0  # Legs booked and not finished
+
+    def add_drone(self, drone: SwarmDrone):
+        """Register a drone and hold the waypoint it starts at."""
+        with self._condition:
+            index = drone.manager.waypoints[drone.manager.current_waypoint_id].index
+            drone.parking = self.table.book(drone.name, [('waypoint', index)], time.monotonic(), INFINITY)
+            self._active[drone.name] = drone
+
+    def retire(self, drone: SwarmDrone):
+        """Stop assigning work to a drone; it keeps holding where it is."""
+        with self._condition:
+            self._active.pop(drone.name, None)
+            self._idle.discard(drone.name)
+            self._condition.notify_all()
+
+    def cancel(self):
+        """Drop the destinations not yet handed out."""
+        with self._condition:
+            self.pending.clear()
+            self._condition.notify_all()
+
+    def _leg_resources(self, drone: SwarmDrone, target: str) -> Tuple[List[Resource], float]:
+        """Resources used by a leg and its estimated duration."""
+        manager = drone.manager
+        heading = drone.telemetry.get_yaw() if drone.telemetry is not None else None
+        plan, _ = manager.plan_route(manager.current_waypoint_id, target, route_mode=self.route_mode,
+                                     vertical_factor=self.vertical_factor, strategy=self.strategy,
+                                     start_heading=heading, smooth=self.smooth)
+        duration = manager.estimate_plan(plan, start_heading=heading).total_seconds + self.leg_margin
+        # Direct legs leave the recorded corridors; booking the chain between the ends is a conservative proxy
+        low, high = sorted((manager.waypoints[manager.current_waypoint_id].index, manager.waypoints[target].index))
+        resources = [('segment', i) for i in range(low, high)] + [('waypoint', i) for i in range(low, high + 1)]
+        return resources, duration
+
+    def _book(self, drone: SwarmDrone, target: str, resources: List[Resource], duration: float,
+              start: float) -> Leg:
+        leg = Leg(drone=drone, target=target, resources=resources, duration=duration, start=start)
+        leg.bookings = self.table.book(drone.name, resources, start, start + duration)
+        leg.parking = self.table.book(drone.name, [('waypoint', drone.manager.waypoints[target].index)],
+                                      start, INFINITY)
+        return leg
+
+    def next_leg(self, drone: SwarmDrone) -> Optional[Leg]:
+        """
+        Book the pending destination this drone can reach soonest, waiting while none is free.
+
+        Returns:
+            The booked leg (its start may lie in the future), or None when there is no more work
+        """
+        with self._condition:
+            while True:
+                if not self.pending:
+                    return None
+                now = time.monotonic()
+                best = None
+                for target in dict.fromkeys(self.pending):
+                    if target == drone.manager.current_waypoint_id:
+                        continue  # A visit means flying there; another drone takes it once this one leaves
+                    resources, duration = self._leg_resources(drone, target)
+                    hold = ('waypoint', drone.manager.waypoints[target].index)
+                    start = self.table.earliest_start(drone.name, resources, duration, hold, now)
+                    if start < INFINITY and (best is None or start + duration < best[0]):
+                        best = (start + duration, target, resources, duration, start)
+                if best is not None:
+                    _, target, resources, duration, start = best
+                    self.pending.remove(target)
+                    self._idle.discard(drone.name)
+                    self._booked += 1
+                    return self._book(drone, target, resources, duration, start)
+
+                self._idle.add(drone.name)
+                if self._booked == 0 and self._idle >= set(self._active):
+                    # Every remaining destination is behind a drone that will not move again
+                    self.unreachable.extend(self.pending)
+                    self.pending.clear()
+                    self._condition.notify_all()
+                    return None
+                self._condition.wait(timeout=1.0)
+
+    def begin(self, leg: Leg) -> bool:
+        """
+        Confirm a leg can take off now; otherwise rebook it later and return False.
+
+        A leg is rechecked because the drone before it may have overrun its window.
+        """
+        with self._condition:
+            now = time.monotonic()
+            hold = ('waypoint', leg.drone.manager.waypoints[leg.target].index)
+            self.table.release(leg.bookings + leg.parking)
+            start = self.table.earliest_start(leg.drone.name, leg.resources, leg.duration, hold, now)
+            if start > now:
+                rebooked = self._book(leg.drone, leg.target, leg.resources, leg.duration, start)
+                leg.start, leg.bookings, leg.parking = start, rebooked.bookings, rebooked.parking
+                return False
+            leg.start = now
+            leg.bookings = self.table.book(leg.drone.name, leg.resources, now, now + leg.duration)
+            leg.parking = self.table.book(leg.drone.name, [hold], now, INFINITY)
+            # The leg's own bookings now cover the waypoint the drone leaves
+            self.table.release(leg.drone.parking)
+            leg.drone.parking = []
+            if self.first_departure is None:
+                self.first_departure = now
+            return True
+
+    def finish(self, leg: Leg, success: bool):
+        """Free a flown leg's corridors; a failed leg keeps them, as the drone's position is unknown."""
+        with self._condition:
+            self._booked -= 1
+            if success:
+                self.table.release(leg.bookings)
+                leg.drone.parking = leg.parking
+                self.last_arrival = time.monotonic()
+            else:
+                for booking in leg.bookings:
+                    booking.end = INFINITY
+            self._idle.clear()
+            self._condition.notify_all()
+
+
+class SwarmNavigator:
+    """Flies several drones over one map, each from its own worker thread."""
+
+    def __init__(self, map_file: str, route_mode: RouteMode = RouteMode.CHAIN, vertical_factor=1.0,
+                 strategy: HeadingStrategy = HeadingStrategy.TURN, smooth: bool = False,
+                 command_metrics: Optional[CommandMetrics] = None):
+        self.map_file = map_file
+        self.route_mode = route_mode
+        self.vertical_factor = vertical_factor
+        self.strategy = strategy
+        self.smooth = smooth
+        self.command_metrics = command_metrics  # Shared by the whole fleet
+        self.drones: List[SwarmDrone] = []
+        self.scheduler: Optional[SwarmScheduler] = None
+        self.is_running = False
+
+    def add_drone(self, name: str, tello, start_waypoint_id: Optional[str] = None) -> SwarmDrone:
+        """Load the map for a new drone standing at start_waypoint_id (default: the next free waypoint)."""
+        manager = WaypointNavigationManager()
+        if not manager.load_waypoint_file(self.map_file, verbose=not self.drones):
+            raise ValueError(f"Could not load {self.map_file}")
+        # Drones start from the saved calibration and refine their own copy in flight;
+        # one shared file would be rewritten by every thread
+        manager.cost_model = FlightCostModel.load(manager.cost_model_file)
+        manager.cost_model_file = None
+        if start_waypoint_id is None:
+            if len(self.drones) >= len(manager.waypoint_order):
+                raise ValueError(f"{self.map_file} has fewer waypoints than drones")
+            start_waypoint_id = manager.waypoint_order[len(self.drones)]
+        manager.current_waypoint_id = start_waypoint_id
+        if self.command_metrics is not None:
+            instrument(tello, self.command_metrics)
+            manager.command_metrics = self.command_metrics
+        telemetry = TelemetryCache(tello)
+        manager.telemetry = telemetry
+        drone = SwarmDrone(name=name, tello=tello, manager=manager, telemetry=telemetry,
+                           health_monitor=HealthMonitor(telemetry=telemetry))
+        self.drones.append(drone)
+        return drone
+
+    def run(self, stops: Optional[Sequence[str]] = None, rounds: int = 1) -> Dict:
+        """
+        Visit every stop rounds times with the whole fleet.
+
+        Returns:
+            Report with the visits, timings and throughput of each drone and of the fleet
+        """
+        stops = list(stops or self.drones[0].manager.waypoint_order)
+        self.scheduler = SwarmScheduler([stop for _ in range(rounds) for stop in stops],
+                                        route_mode=self.route_mode, vertical_factor=self.vertical_factor,
+                                        strategy=self.strategy, smooth=self.smooth)
+        for drone in self.drones:
+            self.scheduler.add_drone(drone)
+
+        self.is_running = True
+        threads = [threading.Thread(target=self._fly, args=(drone,), name=f"swarm-{drone.name}", daemon=True)
+                   for drone in self.drones]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            print("\n🛑 Swarm interrupted by user, landing after the current legs")
+            self.is_running = False
+            self.scheduler.cancel()
+            for thread in threads:
+                thread.join()
+        return self.report()
+
+    def _fly(self, drone: SwarmDrone):
+        """Worker thread: connect, take off, fly booked legs until the work runs out, land."""
+        try:
+            drone.tello.connect(wait_for_state=False)
+            drone.telemetry.start()
+            drone.telemetry.wait_for_state(timeout=2)
+            drone.health_monitor.start()
+            drone.tello.takeoff()
+            time.sleep(2)  # Wait for stabilization
+            self._record_wait("takeoff stabilization", 2.0)
+            print(f"🛫 {drone.name} airborne at {drone.manager.current_waypoint_id}")
+
+            while self.is_running:
+                if drone.health_monitor.is_critical:
+                    print(f"🚨 {drone.name}: critical health, leaving the swarm")
+                    break
+                leg = self.scheduler.next_leg(drone)
+                if leg is None:
+                    break
+                wait_start = time.monotonic()
+                while True:
+                    delay = leg.start - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)  # Hover until the booked window opens
+                    if self.scheduler.begin(leg):
+                        break
+                waited = time.monotonic() - wait_start
+                drone.wait_seconds += waited
+                self._record_wait("corridor wait", waited)
+
+                flight_start = time.monotonic()
+                success = drone.manager.navigate_to_waypoint(leg.target, drone_instance=drone.tello,
+                                                             vertical_factor=self.vertical_factor,
+                                                             route_mode=self.route_mode, strategy=self.strategy,
+                                                             smooth=self.smooth)
+                self.scheduler.finish(leg, success)
+                if not success:
+                    drone.failed = True
+                    print(f"❌ {drone.name}: leg to {leg.target} failed, holding its corridors")
+                    break
+                drone.flight_seconds += time.monotonic() - flight_start
+                drone.visits += 1
+        except Exception as e:
+            drone.failed = True
+            print(f"❌ {drone.name}: {e}")
+        finally:
+            self.scheduler.retire(drone)
+            self._land(drone)
+
+    def _record_wait(self, label: str, seconds: float):
+        if self.command_metrics is not None:
+            self.command_metrics.record_wait(label, seconds)
+
+    @staticmethod
+    def _land(drone: SwarmDrone):
+        try:
+            drone.tello.land()
+        except Exception as e:
+            print(f"⚠️  {drone.name}: landing failed: {e}")
+        drone.health_monitor.stop()
+        drone.telemetry.stop()
+
+    def report(self) -> Dict:
+        """Visits and throughput per drone and for the whole fleet."""
+        scheduler = self.scheduler
+        if scheduler.first_departure is not None and scheduler.last_arrival is not None:
+            elapsed = scheduler.last_arrival - scheduler.first_departure
+        else:
+            elapsed = 0.0
+        visits = sum(drone.visits for drone in self.drones)
+        return {
+            'visits': visits,
+            'elapsed_seconds': elapsed,
+            'waypoints_per_minute': visits * 60.0 / elapsed if elapsed > 0 else 0.0,
+            'unreachable': list(scheduler.unreachable),
+            'drones': [{
+                'name': drone.name,
+                'visits': drone.visits,
+                'flight_seconds': drone.flight_seconds,
+                'wait_seconds': drone.wait_seconds,
+                'waypoints_per_minute': drone.visits * 60.0 / elapsed if elapsed > 0 else 0.0,
+                'failed': drone.failed,
+            } for drone in self.drones],
+        }
+
+
+def print_report(report: Dict):
+    print("\n📊 SWARM REPORT")
+    print("-" * 40)
+    for drone in report['drones']:
+        status = " (failed)" if drone['failed'] else ""
+        print(f"  {drone['name']}: {drone['visits']} visits, {drone['flight_seconds']:.0f} s flying, "
+              f"{drone['wait_seconds']:.0f} s waiting for corridors{status}")
+    if report['unreachable']:
+        print(f"⚠️  Unreachable: {', '.join(report['unreachable'])}")
+    print(f"🚀 Fleet: {report['visits']} waypoints in {report['elapsed_seconds']:.0f} s "
+          f"= {report['waypoints_per_minute']:.1f} waypoints/min")
+
+
+def parse_drone(spec: str) -> Tuple[str, int, int]:
+    """HOST[:PORT[:STATE_PORT]] of one drone."""
+    parts = spec.split(':')
+    host = parts[0]
+    port = int(parts[1]) if len(parts) > 1 else 8889
+    state_port = int(parts[2]) if len(parts) > 2 else 8890
+    return host, port, state_port
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Fly several drones over one waypoint map at once')
+    parser.add_argument('map', help='Session file (drone_movements_*.json or .tmap)')
+    parser.add_argument('--drone', action='append', default=[], metavar='HOST[:PORT[:STATE_PORT]]',
+                        help='Drone to fly (repeatable)')
+    parser.add_argument('--simulate', type=int, default=0, metavar='N',
+                        help='Start N local simulators and fly them')
+    parser.add_argument('--client', choices=['djitellopy', 'asyncio'], default='asyncio',
+                        help='asyncio TelloBridge per drone, or djitellopy TelloSwarm (one IP per drone)')
+    parser.add_argument('--start', nargs='+', metavar='WAYPOINT',
+                        help='Start waypoint of each drone (default: the first waypoints in order)')
+    parser.add_argument('--stops', nargs='+', metavar='WAYPOINT', help='Waypoints to visit (default: all)')
+    parser.add_argument('--rounds', type=int, default=1, help='Times every stop is visited')
+    parser.add_argument('--route', choices=[mode.value for mode in RouteMode], default=RouteMode.CHAIN.value)
+    parser.add_argument('--heading', choices=[strategy.value for strategy in HeadingStrategy],
+                        default=HeadingStrategy.TURN.value)
+    parser.add_argument('--smooth', action='store_true', help='Fly curves through intermediate waypoints')
+    parser.add_argument('--vertical-factor', type=float, default=1.0)
+    args = parser.parse_args()
+
+    simulators = []
+    specs = [parse_drone(spec) for spec in args.drone]
+    if args.simulate:
+        from tello_simulator import SimulatorConfig, TelloSimulator
+        for i in range(args.simulate):
+            config = SimulatorConfig(port=SIMULATOR_BASE_PORT + 2 * i, state_port=SIMULATOR_BASE_PORT + 2 * i + 1)
+            simulators.append(TelloSimulator(config))
+            simulators[-1].start()
+            specs.append(('127.0.0.1', config.port, config.state_port))
+    if not specs:
+        parser.error("give at least one --drone or --simulate N")
+
+    if args.client == 'djitellopy':
+        from djitellopy import TelloSwarm  # Routes replies by IP, so one drone per address
+        tellos = TelloSwarm.fromIps([host for host, _, _ in specs]).tellos
+    else:
+        from async_tello import TelloBridge
+        tellos = [TelloBridge(host=host, port=port, local_port=0, state_port=state_port)
+                  for host, port, state_port in specs]
+
+    metrics = CommandMetrics()
+    navigator = SwarmNavigator(args.map, route_mode=RouteMode(args.route), vertical_factor=args.vertical_factor,
+                               strategy=HeadingStrategy(args.heading), smooth=args.smooth, command_metrics=metrics)
+    try:
+        starts = args.start or []
+        for i, tello in enumerate(tellos):
+            navigator.add_drone(f"drone{i + 1}", tello, start_waypoint_id=starts[i] if i < len(starts) else None)
+        print_report(navigator.run(stops=args.stops, rounds=args.rounds))
+        metrics.finish()
+        metrics.print_report()
+        metrics.save(metrics_path(metrics.started_at))
+        print(f"⏱️  Command timing saved to {metrics_path(metrics.started_at)}")
+    finally:
+        for tello in tellos:
+            try:
+                tello.end()
+            except Exception:
+                pass
+        for simulator in simulators:
+            simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+import time
+import threading
+from typing import Callable, Dict, List, Optional
+
+
+def parse_attitude_yaw(attitude_str: str) -> int:
+    """Parse the yaw out of an attitude response like "pitch:0;roll:0;yaw:45;"."""
+    yaw = 0  # Default value
+    if attitude_str and ':' in attitude_str:
+        for part in attitude_str.split(';'):
+            if part.strip() and 'yaw:' in part:
+                try:
+                    yaw_value = part.split(':')[1].strip()
+                    if yaw_value:
+                        yaw = int(yaw_value)
+                        break
+                except (ValueError, IndexError) as e:
+                    print(f"⚠️  Failed to parse yaw from '{part}': {e}")
+                    continue
+    return yaw
+
+
+def query_yaw(drone_instance=None) -> int:
+    """Query the yaw with a blocking attitude? round trip."""
+    try:
+        attitude_str = drone_instance.send_command_with_return("attitude?", timeout=3)
+        return parse_attitude_yaw(attitude_str)
+    except Exception as e:
+        print(f"⚠️  Attitude query failed: {e}")
+        return 0
+
+
+def query_height(drone_instance=None) -> int:
+    """Query the height in cm with a blocking height? round trip."""
+    try:
+        height_str = drone_instance.send_command_with_return("height?", timeout=3)
+        # Height returns like "10dm" (decimeters), convert to cm
+        return int(height_str.replace('dm', '')) * 10
+    except Exception as e:
+        print(f"⚠️  Height query failed: {e}")
+        return 0
+
+
+def query_tof(drone_instance=None) -> int:
+    """Query the time-of-flight distance in cm with a blocking tof? round trip."""
+    try:
+        tof_str = drone_instance.send_command_with_return("tof?", timeout=3)
+        # ToF returns like "801mm", convert to cm
+        return int(tof_str.replace('mm', '')) // 10
+    except Exception as e:
+        print(f"⚠️  ToF query failed: {e}")
+        return 0
+
+
+def query_battery(drone_instance=None) -> int:
+    """Query the battery percentage with a blocking battery? round trip."""
+    try:
+        battery_str = drone_instance.send_command_with_return("battery?", timeout=3)
+        return int(battery_str)
+    except Exception as e:
+        print(f"⚠️  Battery query failed: {e}")
+        return 0
+
+
+class TelemetryCache:
+    """
+    Shared in-memory view of the Tello state stream (UDP 8890).
+
+    djitellopy already parses every state packet into a fresh dict; a single
+    watcher thread notices each new dict, timestamps it and fans it out to
+    subscribers. Readers get values from memory and only fall back to a
+    blocking query when the stream has gone stale.
+    """
+
+    def __init__(self, drone_instance=None, max_age: float = 0.5, poll_interval: float = 0.02):
+        """
+        Initialize the telemetry cache.
+
+        Args:
+            drone_instance: Connected Tello (or compatible) instance
+            max_age: Seconds after which cached state is considered stale
+            poll_interval: Seconds between checks for a new state packet
+        """
+        self.drone_instance = drone_instance
+        self.max_age = max_age
+        self.poll_interval = poll_interval
+
+        self._state: Dict = {}
+        self._state_time: float = 0.0  # time.monotonic() of the newest packet
+        self._packet_count = 0
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[float, Dict], None]] = []
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start watching the state stream."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._watch_state, name="TelemetryCache", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching the state stream."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def wait_for_state(self, timeout: float = 1.0) -> bool:
+        """Block until the first state packet arrives or the timeout expires."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.is_fresh():
+                return True
+            time.sleep(self.poll_interval)
+        return self.is_fresh()
+
+    def subscribe(self, callback: Callable[[float, Dict], None]):
+        """Register a callback invoked as callback(timestamp, state) for every new packet."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[float, Dict], None]):
+        """Remove a previously registered callback."""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _watch_state(self):
+        """Poll the drone's parsed state and publish every new packet."""
+        last_state = None
+        while self._running:
+            try:
+                state = self.drone_instance.get_current_state()
+            except Exception:
+                state = None
+
+            # djitellopy swaps in a new dict per packet, so identity marks a new one
+            if state and state is not last_state:
+                last_state = state
+                timestamp = time.monotonic()
+                with self._lock:
+                    self._state = state
+                    self._state_time = timestamp
+                    self._packet_count += 1
+                    subscribers = list(self._subscribers)
+                for callback in subscribers:
+                    try:
+                        callback(timestamp, state)
+                    except Exception as e:
+                        print(f"⚠️  Telemetry subscriber failed: {e}")
+
+            time.sleep(self.poll_interval)
+
+    def age(self) -> float:
+        """Seconds since the newest state packet (infinite if none yet)."""
+        if not self._state_time:
+            return float('inf')
+        return time.monotonic() - self._state_time
+
+    def is_fresh(self) -> bool:
+        """True if the cached state is newer than max_age."""
+        return self.age() <= self.max_age
+
+    @property
+    def packet_count(self) -> int:
+        """Number of state packets seen so far."""
+        return self._packet_count
+
+    def snapshot(self) -> Dict:
+        """Return the newest state dict and its timestamp."""
+        with self._lock:
+            return {'state': dict(self._state), 'timestamp': self._state_time}
+
+    def _get_field(self, key: str):
+        """Return a cached field if it is fresh, otherwise None."""
+        if not self.is_fresh():
+            return None
+        return self._state.get(key)
+
+    def get_yaw(self) -> int:
+        """Yaw in degrees (-180 to 180)."""
+        yaw = self._get_field('yaw')
+        if yaw is None:
+            return query_yaw(self.drone_instance)
+        return int(yaw)
+
+    def get_height(self) -> int:
+        """Height above takeoff point in cm."""
+        height = self._get_field('h')
+        if height is None:
+            return query_height(self.drone_instance)
+        return int(height)
+
+    def get_tof(self) -> int:
+        """Time-of-flight distance to the ground in cm."""
+        tof = self._get_field('tof')
+        if tof is None:
+            return query_tof(self.drone_instance)
+        return int(tof)
+
+    def get_battery(self) -> int:
+        """Battery percentage (raises if the stream is stale and the query fails)."""
+        battery = self._get_field('bat')
+        if battery is None:
+            # Callers treat a failed battery read as an error, never as 0%
+            return int(self.drone_instance.send_command_with_return("battery?", timeout=3))
+        return int(battery)
+
+    def get_velocity(self) -> Dict[str, int]:
+        """Velocities vgx/vgy/vgz from the state stream (zero when stale; there is no query for them)."""
+        return {key: int(self._get_field(key) or 0) for key in ('vgx', 'vgy', 'vgz')}
+
+    def get_drone_state(self) -> Dict:
+        """Return yaw, height, tof, battery and velocities in one dict."""
+        state = {
+            'yaw': self.get_yaw(),
+            'height': self.get_height(),
+            'tof': self.get_tof(),
+        }
+        try:
+            state['battery'] = self.get_battery()
+        except Exception as e:
+            print(f"⚠️  Battery query failed: {e}")
+            state['battery'] = 0
+        state.update(self.get_velocity())
+        state['age'] = self.age()
+        return state
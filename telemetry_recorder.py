@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped flight telemetry recorder (.ttlm).
+
+Every state packet of a session is stored as one fixed-size row of a NumPy
+structured array in a preallocated ring file:
+
+    b"TTLM" | version (uint32) | header length (uint64) | rows written (uint64) | header JSON | padding | rows
+
+The header JSON holds the capacity, the session start time and the
+session mode. Rows are written straight into the memory map through
+per-field column views, and the row count in the preamble is updated after
+each row. A crash therefore loses at most the row being written. Once the
+ring is full the oldest rows are overwritten, so memory and disk use stay
+bounded however long the session runs.
+
+Usage:
+    python telemetry_recorder.py summary drone_movements_20250708_181217.ttlm
+    python telemetry_recorder.py summary *.ttlm
+"""
+import argparse
+import glob
+import json
+import os
+import struct
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+MAGIC = b"TTLM"
+VERSION = 1
+EXTENSION = ".ttlm"
+_PREAMBLE = struct.Struct("<4sIQQ")
+_COUNT_OFFSET = 16  # Byte offset of the rows-written counter in the preamble
+_ALIGN = 8
+DEFAULT_CAPACITY = 1 << 16  # Rows kept, about 1.8 h of 10 Hz state packets (3.5 MB)
+
+# One row per state packet; 't' is seconds since the recorder started
+STATE_DTYPE = np.dtype([
+    ('t', '<f8'),
+    ('pitch', '<i2'), ('roll', '<i2'), ('yaw', '<i2'),
+    ('vgx', '<i2'), ('vgy', '<i2'), ('vgz', '<i2'),
+    ('templ', '<i2'), ('temph', '<i2'),
+    ('tof', '<i2'), ('h', '<i2'), ('bat', '<i2'), ('time', '<i2'),
+    ('mid', '<i2'), ('x', '<i2'), ('y', '<i2'), ('z', '<i2'),
+    ('baro', '<f4'), ('agx', '<f4'), ('agy', '<f4'), ('agz', '<f4'),
+])
+STATE_FIELDS = STATE_DTYPE.names[1:]
+
+
+def _align(position: int) -> int:
+    return (position + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def telemetry_path_for(data_file: str) -> str:
+    """Telemetry log next to a session file."""
+    return os.path.splitext(data_file)[0] + EXTENSION
+
+
+class TelemetryRecorder:
+    """Appends state packets to a memory-mapped ring file."""
+
+    def __init__(self, path: str, capacity: int = DEFAULT_CAPACITY, mode: str = ""):
+        """
+        Initialize the recorder.
+
+        Args:
+            path: .ttlm file to create (an existing one is replaced)
+            capacity: Rows kept before the oldest are overwritten
+            mode: Session label stored in the header ("mapping", "navigation", ...)
+        """
+        self.path = path
+        self.capacity = capacity
+        self.mode = mode
+        self.count = 0
+        self._start = 0.0
+        self._rows: Optional[np.memmap] = None
+        self._columns: Dict[str, np.ndarray] = {}
+        self._counter: Optional[np.memmap] = None
+        self._telemetry = None
+
+    def open(self):
+        """Create the ring file and map it."""
+        header = json.dumps({'capacity': self.capacity, 'start_time': datetime.now().isoformat(),
+                             'mode': self.mode, 'dtype': STATE_DTYPE.descr}).encode('utf-8')
+        data_offset = _align(_PREAMBLE.size + len(header))
+        with open(self.path, 'wb') as f:
+            f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header), 0))
+            f.write(header)
+            # Sized up front; untouched rows stay sparse on most filesystems
+            f.truncate(data_offset + self.capacity * STATE_DTYPE.itemsize)
+        self._rows = np.memmap(self.path, dtype=STATE_DTYPE, mode='r+', offset=data_offset, shape=(self.capacity,))
+        self._columns = {name: self._rows[name] for name in STATE_DTYPE.names}
+        self._counter = np.memmap(self.path, dtype='<u8', mode='r+', offset=_COUNT_OFFSET, shape=(1,))
+        self._start = time.monotonic()
+        self.count = 0
+
+    def attach(self, telemetry):
+        """Record every packet the telemetry cache sees, from its watcher thread."""
+        if self._rows is None:
+            self.open()
+        self._telemetry = telemetry
+        telemetry.subscribe(self.record)
+
+    def record(self, timestamp: float, state: Dict):
+        """Write one state packet (timestamp: time.monotonic() of its arrival)."""
+        row = self.count % self.capacity
+        columns = self._columns
+        columns['t'][row] = timestamp - self._start
+        for name in STATE_FIELDS:
+            value = state.get(name)
+            try:
+                columns[name][row] = value if value is not None else 0
+            except (TypeError, ValueError, OverflowError):
+                columns[name][row] = 0  # Garbled field in this packet
+        self.count += 1
+        self._counter[0] = self.count  # Published after the row is complete
+
+    def close(self):
+        """Stop recording and flush the map to disk."""
+        if self._telemetry is not None:
+            self._telemetry.unsubscribe(self.record)
+            self._telemetry = None
+        if self._rows is not None:
+            self._rows.flush()
+            self._counter.flush()
+            self._rows = self._counter = None
+            self._columns = {}
+
+
+@dataclass
+class TelemetryLog:
+    """Rows of one recorded session, oldest first."""
+    path: str
+    rows: np.ndarray  # STATE_DTYPE records
+    start_time: str
+    mode: str
+    overwritten: int  # Oldest rows lost to the ring wrapping
+
+    @property
+    def duration(self) -> float:
+        return float(self.rows['t'][-1] - self.rows['t'][0]) if len(self.rows) > 1 else 0.0
+
+
+def load_telemetry(path: str) -> TelemetryLog:
+    """
+    Map a .ttlm file read-only.
+
+    Rows are a view straight into the file unless the ring has wrapped, in
+    which case the two halves are joined into one array in time order.
+    """
+    with open(path, 'rb') as f:
+        magic, version, header_length, count = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a telemetry log")
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported telemetry log version {version}")
+        header = json.loads(f.read(header_length).decode('utf-8'))
+    capacity = header['capacity']
+    rows = np.memmap(path, dtype=STATE_DTYPE, mode='r', offset=_align(_PREAMBLE.size + header_length),
+                     shape=(capacity,))
+    if count <= capacity:
+        ordered = rows[:count]
+    else:
+        split = count % capacity
+        ordered = np.concatenate((rows[split:], rows[:split]))
+    return TelemetryLog(path=path, rows=ordered, start_time=header['start_time'], mode=header.get('mode', ''),
+                        overwritten=max(0, count - capacity))
+
+
+def load_many(paths: Iterable[str]) -> List[TelemetryLog]:
+    """Load several logs, skipping unreadable ones."""
+    logs = []
+    for path in paths:
+        try:
+            logs.append(load_telemetry(path))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Skipping {path}: {e}")
+    return logs
+
+
+def find_telemetry_logs(directory: str = ".") -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, f"*{EXTENSION}")))
+
+
+def summarize(log: TelemetryLog) -> Dict:
+    """Headline numbers of one flight, computed on the whole columns at once."""
+    rows = log.rows
+    if len(rows) == 0:
+        return {'path': log.path, 'rows': 0}
+    return {
+        'path': log.path,
+        'mode': log.mode,
+        'start_time': log.start_time,
+        'rows': len(rows),
+        'overwritten': log.overwritten,
+        'duration_s': round(log.duration, 1),
+        'rate_hz': round((len(rows) - 1) / log.duration, 1) if log.duration > 0 else 0.0,
+        'battery_used': int(rows['bat'][0]) - int(rows['bat'][-1]),
+        'max_height_cm': int(rows['h'].max()),
+        'max_temperature_c': int(rows['temph'].max()),
+        'max_speed_cm_s': round(float(np.sqrt(rows['vgx'].astype(np.float32) ** 2 + rows['vgy'] ** 2
+                                              + rows['vgz'] ** 2).max()) * 10, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect recorded flight telemetry')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    summary = subparsers.add_parser('summary', help='Summarize telemetry logs')
+    summary.add_argument('logs', nargs='*', help=f'{EXTENSION} files (default: all in the current directory)')
+    summary.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+    args = parser.parse_args()
+
+    results = [summarize(log) for log in load_many(args.logs or find_telemetry_logs())]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        if not result['rows']:
+            print(f"{result['path']}: empty")
+            continue
+        print(f"{result['path']} ({result['mode'] or 'session'}, {result['start_time']}): "
+              f"{result['rows']} rows over {result['duration_s']} s at {result['rate_hz']} Hz, "
+              f"battery -{result['battery_used']}%, max height {result['max_height_cm']} cm, "
+              f"max speed {result['max_speed_cm_s']} cm/s, max temp {result['max_temperature_c']}°C")
+
+
+if __name__ == "__main__":
+    main()
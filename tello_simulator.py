@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Local Tello simulator
+=====================
+
+Speaks the Tello SDK text protocol over UDP so the navigation system can be
+run and benchmarked without a drone:
+
+- listens for commands on the command port (8889 by default)
+- streams state packets to the client's state port (8890) once "command" is received
+- simulates takeoff/land, move_*, rotate_*, go, curve, rc, speed and the ? queries
+  with a simple kinematic model, configurable latency, packet loss and battery drain
+
+djitellopy binds local port 8889 itself, so when the simulator runs on the same
+machine give it another port and point the app at it:
+
+    python tello_simulator.py --port 9889
+    python main.py --host 127.0.0.1 --port 9889
+"""
+
+import math
+import queue
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from plan_compiler import MAX_CURVE_RADIUS, MIN_CURVE_RADIUS, curve_geometry
+
+
+@dataclass
+class SimulatorConfig:
+    """Tunable parameters of the simulated drone and link."""
+    host: str = "127.0.0.1"
+    port: int = 8889
+    state_port: int = 8890
+    state_rate: float = 10.0  # state packets per second
+    latency: float = 0.0  # seconds added to every response
+    jitter: float = 0.0  # uniform random extra latency in seconds
+    packet_loss: float = 0.0  # probability of dropping any datagram (in or out)
+    battery_drain: float = 8.0  # percent per minute while flying
+    idle_drain: float = 0.5  # percent per minute while landed
+    speed: float = 100.0  # cm/s for move/go commands (changed by "speed x")
+    rotation_rate: float = 90.0  # degrees/s for rotate commands
+    accel_overhead: float = 0.4  # seconds of acceleration/braking per maneuver
+    takeoff_height: int = 80  # cm
+    takeoff_time: float = 4.0  # seconds
+    land_time: float = 3.0  # seconds
+    tick_rate: float = 50.0  # physics updates per second
+    seed: Optional[int] = None
+    verbose: bool = False
+
+
+class SimulatedDrone:
+    """Kinematic drone model in a world frame (x along yaw 0, y along yaw 90, z up)."""
+
+    def __init__(self, config: SimulatorConfig):
+        self.config = config
+        self.x = 0.0
+        self.y = 0.0
+        self.z = 0.0
+        self.yaw = 0.0
+        self.battery = 100.0
+        self.flying = False
+        self.speed = config.speed
+        self.flight_time = 0.0
+        self.started = time.monotonic()
+
+        # RC setpoint (cm/s and deg/s, body frame) and the active timed maneuver
+        self.rc = (0.0, 0.0, 0.0, 0.0)  # left/right, forward/back, up/down, yaw
+        self.maneuver: Optional[Tuple[float, float, float, float, float]] = None  # vx, vy, vz, yaw_rate, end
+        self.velocity = (0.0, 0.0, 0.0)
+        self.lock = threading.Lock()
+
+    def body_to_world(self, forward: float, right: float) -> Tuple[float, float]:
+        """Rotate a body-frame horizontal vector into the world frame."""
+        rad = math.radians(self.yaw)
+        return (forward * math.cos(rad) - right * math.sin(rad),
+                forward * math.sin(rad) + right * math.cos(rad))
+
+    def step(self, dt: float, now: float):
+        """Advance the model by dt seconds."""
+        with self.lock:
+            if self.flying:
+                if self.maneuver is not None and now < self.maneuver[4]:
+                    vx, vy, vz, yaw_rate, _ = self.maneuver
+                else:
+                    self.maneuver = None
+                    right, forward, up, yaw_rate = self.rc
+                    vx, vy = self.body_to_world(forward, right)
+                    vz = up
+                    if self.z <= 0 and vz < 0:
+                        vz = 0.0
+
+                self.x += vx * dt
+                self.y += vy * dt
+                self.z = max(0.0, self.z + vz * dt)
+                self.yaw = (self.yaw + yaw_rate * dt + 180) % 360 - 180
+                self.velocity = (vx, vy, vz)
+                self.flight_time += dt
+                drain = self.config.battery_drain
+            else:
+                self.velocity = (0.0, 0.0, 0.0)
+                drain = self.config.idle_drain
+
+            self.battery = max(0.0, self.battery - drain * dt / 60.0)
+
+    def state_packet(self) -> str:
+        """Format the current state like a Tello state datagram."""
+        with self.lock:
+            vx, vy, vz = self.velocity
+            return (
+                "mid:-1;x:0;y:0;z:0;mpry:0,0,0;pitch:0;roll:0;"
+                f"yaw:{int(round(self.yaw))};"
+                # Velocities are reported in dm/s
+                f"vgx:{int(round(vx / 10))};vgy:{int(round(vy / 10))};vgz:{int(round(vz / 10))};"
+                f"templ:{self.temperature() - 2};temph:{self.temperature()};"
+                f"tof:{int(self.z) + 10};h:{int(self.z)};bat:{int(self.battery)};"
+                f"baro:{self.z / 100:.2f};time:{int(self.flight_time)};"
+                "agx:0.00;agy:0.00;agz:-1000.00;\r\n"
+            )
+
+    def temperature(self) -> int:
+        """Rough motor temperature that rises the longer the drone runs."""
+        return int(min(90, 55 + (time.monotonic() - self.started) / 20))
+
+
+class TelloSimulator:
+    """UDP server that emulates a Tello on the command and state ports."""
+
+    # Commands that take time to execute and answer "ok" when done
+    TIMED_COMMANDS = {
+        'takeoff', 'land', 'up', 'down', 'left', 'right', 'forward', 'back',
+        'cw', 'ccw', 'go', 'curve', 'flip',
+    }
+
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        self.config = config or SimulatorConfig()
+        self.drone = SimulatedDrone(self.config)
+        self.random = random.Random(self.config.seed)
+
+        self.command_socket: Optional[socket.socket] = None
+        self.state_socket: Optional[socket.socket] = None
+        self.client_address: Optional[Tuple[str, int]] = None
+        self.sdk_mode = False
+
+        self.commands_received = 0
+        self.is_running = False
+        self._work_queue: "queue.Queue[Tuple[str, Tuple[str, int]]]" = queue.Queue()
+        self._threads = []
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self):
+        """Bind the sockets and start the simulator threads."""
+        self.command_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.command_socket.bind((self.config.host, self.config.port))
+        self.command_socket.settimeout(0.2)
+
+        # Send state from the same address the client talks to, so djitellopy matches it
+        self.state_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.state_socket.bind((self.config.host, 0))
+
+        self.is_running = True
+        for target, name in ((self._receive_loop, "sim-receiver"),
+                             (self._physics_loop, "sim-physics"),
+                             (self._work_loop, "sim-worker")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        print(f"🛰️  Tello simulator listening on {self.config.host}:{self.config.port}")
+
+    def stop(self):
+        """Stop the simulator threads and close the sockets."""
+        self.is_running = False
+        self._work_queue.put(("", ("", 0)))
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._threads = []
+        for sock in (self.command_socket, self.state_socket):
+            if sock is not None:
+                sock.close()
+
+    def serve_forever(self):
+        """Run until interrupted."""
+        self.start()
+        try:
+            while self.is_running:
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            print("\n🛑 Simulator interrupted by user")
+        finally:
+            self.stop()
+
+    # ------------------------------------------------------------------ link
+
+    def _lost(self) -> bool:
+        """Decide whether a datagram is dropped."""
+        return self.config.packet_loss > 0 and self.random.random() < self.config.packet_loss
+
+    def _reply(self, text: str, address: Tuple[str, int]):
+        """Send a response after the configured latency, subject to packet loss."""
+        if self._lost():
+            return
+        delay = self.config.latency + self.random.uniform(0, self.config.jitter)
+
+        def send():
+            try:
+                self.command_socket.sendto(text.encode('utf-8'), address)
+            except OSError:
+                pass
+
+        if delay > 0:
+            timer = threading.Timer(delay, send)
+            timer.daemon = True
+            timer.start()
+        else:
+            send()
+
+    def _receive_loop(self):
+        """Receive commands; answer queries and rc inline, queue timed commands."""
+        while self.is_running:
+            try:
+                data, address = self.command_socket.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            if self._lost():
+                continue
+
+            command = data.decode('utf-8', errors='ignore').strip()
+            self.commands_received += 1
+            if self.config.verbose:
+                print(f"📥 {address[0]}:{address[1]} -> {command}")
+
+            keyword = command.split(' ')[0]
+            if keyword in self.TIMED_COMMANDS:
+                self._work_queue.put((command, address))
+            else:
+                response = self.handle_command(command, address)
+                if response is not None:
+                    self._reply(response, address)
+
+    def _work_loop(self):
+        """Execute timed commands one at a time, like the drone does."""
+        while self.is_running:
+            command, address = self._work_queue.get()
+            if not self.is_running:
+                break
+            response = self.handle_command(command, address)
+            if response is not None:
+                self._reply(response, address)
+
+    def _physics_loop(self):
+        """Integrate the kinematic model and emit state packets."""
+        tick = 1.0 / self.config.tick_rate
+        state_interval = 1.0 / self.config.state_rate
+        last = time.monotonic()
+        next_state = last
+        while self.is_running:
+            time.sleep(tick)
+            now = time.monotonic()
+            self.drone.step(now - last, now)
+            last = now
+
+            if self.client_address is not None and now >= next_state:
+                next_state = now + state_interval
+                if not self._lost():
+                    try:
+                        packet = self.drone.state_packet().encode('ASCII')
+                        self.state_socket.sendto(packet, (self.client_address[0], self.config.state_port))
+                    except OSError:
+                        pass
+
+    # ------------------------------------------------------------------ commands
+
+    def handle_command(self, command: str, address: Tuple[str, int]) -> Optional[str]:
+        """Execute a single SDK command and return its response (None for no response)."""
+        parts = command.split()
+        if not parts:
+            return None
+        keyword, args = parts[0], parts[1:]
+
+        try:
+            if keyword == 'command':
+                self.sdk_mode = True
+                self.client_address = address
+                return 'ok'
+            if not self.sdk_mode:
+                return None  # A real Tello ignores everything before "command"
+
+            if keyword.endswith('?'):
+                return self._handle_query(keyword)
+            if keyword == 'rc':
+                self._handle_rc(args)
+                return None  # rc never answers
+            if keyword in ('streamon', 'streamoff', 'stop', 'wifi', 'mon', 'moff'):
+                if keyword == 'stop':
+                    with self.drone.lock:
+                        self.drone.rc = (0.0, 0.0, 0.0, 0.0)
+                        self.drone.maneuver = None
+                return 'ok'
+            if keyword == 'speed':
+                speed = float(args[0])
+                if not 10 <= speed <= 100:
+                    return 'error'
+                self.drone.speed = speed
+                return 'ok'
+            if keyword == 'emergency':
+                with self.drone.lock:
+                    self.drone.flying = False
+                    self.drone.z = 0.0
+                    self.drone.maneuver = None
+                return 'ok'
+            if keyword == 'takeoff':
+                return self._takeoff()
+            if keyword == 'land':
+                return self._land()
+            if keyword in ('up', 'down', 'left', 'right', 'forward', 'back'):
+                return self._move(keyword, int(args[0]))
+            if keyword in ('cw', 'ccw'):
+                return self._rotate(keyword, int(args[0]))
+            if keyword == 'go':
+                x, y, z, speed = (int(value) for value in args[:4])
+                return self._go(x, y, z, speed)
+            if keyword == 'curve':
+                x1, y1, z1, x2, y2, z2, speed = (int(value) for value in args[:7])
+                return self._curve((x1, y1, z1), (x2, y2, z2), speed)
+            if keyword == 'flip':
+                return self._timed(0.0, 0.0, 0.0, 0.0, 1.0) if self.drone.flying else 'error'
+        except (ValueError, IndexError):
+            return 'error'
+
+        return 'unknown command: ' + keyword
+
+    def _handle_query(self, keyword: str) -> str:
+        """Answer a read command."""
+        drone = self.drone
+        with drone.lock:
+            answers = {
+                'battery?': f"{int(drone.battery)}",
+                'height?': f"{int(round(drone.z / 10))}dm",
+                'tof?': f"{int(drone.z * 10) + 100}mm",
+                'attitude?': f"pitch:0;roll:0;yaw:{int(round(drone.yaw))};",
+                'speed?': f"{drone.speed:.1f}",
+                'time?': f"{int(drone.flight_time)}s",
+                'temp?': f"{drone.temperature() - 2}~{drone.temperature()}C",
+                'baro?': f"{drone.z / 100:.2f}",
+                'acceleration?': "agx:0.00;agy:0.00;agz:-1000.00;",
+                'wifi?': "90",
+                'sdk?': "30",
+                'sn?': "SIMULATOR0001",
+            }
+        return answers.get(keyword, 'error')
+
+    def _handle_rc(self, args):
+        """Update the RC setpoint (values -100..100 map to cm/s and deg/s)."""
+        values = [max(-100.0, min(100.0, float(value))) for value in args[:4]]
+        if len(values) == 4:
+            with self.drone.lock:
+                self.drone.rc = tuple(values)
+
+    def _timed(self, vx: float, vy: float, vz: float, yaw_rate: float, duration: float, brake: bool = True) -> str:
+        """Run a constant-velocity maneuver, wait for it (and the braking overhead), then answer ok."""
+        with self.drone.lock:
+            self.drone.rc = (0.0, 0.0, 0.0, 0.0)
+            self.drone.maneuver = (vx, vy, vz, yaw_rate, time.monotonic() + duration)
+        time.sleep(duration + (self.config.accel_overhead if brake else 0.0))
+        return 'ok'
+
+    def _takeoff(self) -> str:
+        if self.drone.flying or self.drone.battery < 10:
+            return 'error'
+        with self.drone.lock:
+            self.drone.flying = True
+        return self._timed(0.0, 0.0, self.config.takeoff_height / self.config.takeoff_time, 0.0,
+                           self.config.takeoff_time)
+
+    def _land(self) -> str:
+        if not self.drone.flying:
+            return 'error'
+        self._timed(0.0, 0.0, -self.drone.z / self.config.land_time, 0.0, self.config.land_time)
+        with self.drone.lock:
+            self.drone.flying = False
+            self.drone.z = 0.0
+        return 'ok'
+
+    def _move(self, keyword: str, distance: int) -> str:
+        if not self.drone.flying or not 20 <= distance <= 500:
+            return 'error'
+        forward = {'forward': 1, 'back': -1}.get(keyword, 0) * distance
+        right = {'right': 1, 'left': -1}.get(keyword, 0) * distance
+        up = {'up': 1, 'down': -1}.get(keyword, 0) * distance
+        return self._go(forward, -right, up, int(self.drone.speed))
+
+    def _rotate(self, keyword: str, degrees: int) -> str:
+        if not self.drone.flying or not 1 <= degrees <= 360:
+            return 'error'
+        rate = self.config.rotation_rate if keyword == 'cw' else -self.config.rotation_rate
+        return self._timed(0.0, 0.0, 0.0, rate, degrees / self.config.rotation_rate)
+
+    def _go(self, x: int, y: int, z: int, speed: int) -> str:
+        """Fly a body-frame vector (x forward, y left, z up) at the given speed."""
+        if not self.drone.flying or not 10 <= speed <= 100:
+            return 'error'
+        if any(abs(value) > 500 for value in (x, y, z)) or all(abs(value) <= 20 for value in (x, y, z)):
+            return 'error'
+        length = math.sqrt(x * x + y * y + z * z)
+        duration = length / speed
+        with self.drone.lock:
+            dx, dy = self.drone.body_to_world(x, -y)
+        return self._timed(dx / duration, dy / duration, z / duration, 0.0, duration)
+
+    def _curve(self, point1: Tuple[int, int, int], point2: Tuple[int, int, int], speed: int) -> str:
+        """Approximate a curve as two straight legs through point1 to point2, braking only at the end."""
+        if not self.drone.flying or not 10 <= speed <= 60:
+            return 'error'
+        if any(abs(value) > 500 for value in point1 + point2):
+            return 'error'
+        if any(all(abs(value) <= 20 for value in point) for point in (point1, point2)):
+            return 'error'
+        geometry = curve_geometry(point1, point2)
+        if geometry is None or not MIN_CURVE_RADIUS <= geometry[0] <= MAX_CURVE_RADIUS:
+            return 'error'  # The SDK rejects straight lines and radii outside 0.5-10 m
+        response = 'ok'
+        previous = (0, 0, 0)
+        for point in (point1, point2):
+            leg = tuple(b - a for a, b in zip(previous, point))
+            length = math.sqrt(sum(value * value for value in leg))
+            if length > 0:
+                duration = length / speed
+                with self.drone.lock:
+                    dx, dy = self.drone.body_to_world(leg[0], -leg[1])
+                response = self._timed(dx / duration, dy / duration, leg[2] / duration, 0.0, duration,
+                                       brake=point is point2)
+            previous = point
+        return response
+
+
+def main():
+    """Command line entry point for the simulator."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local Tello SDK simulator')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind the command socket to')
+    parser.add_argument('--port', type=int, default=8889, help='Command port')
+    parser.add_argument('--state-port', type=int, default=8890, help='Client port that receives state packets')
+    parser.add_argument('--state-rate', type=float, default=10.0, help='State packets per second')
+    parser.add_argument('--latency', type=float, default=0.0, help='Response latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency in seconds')
+    parser.add_argument('--loss', type=float, default=0.0, help='Packet loss probability (0-1)')
+    parser.add_argument('--battery-drain', type=float, default=8.0, help='Battery percent per minute while flying')
+    parser.add_argument('--rotation-rate', type=float, default=90.0, help='Rotation rate in degrees/s')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for latency and loss')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every received command')
+    args = parser.parse_args()
+
+    config = SimulatorConfig(
+        host=args.host,
+        port=args.port,
+        state_port=args.state_port,
+        state_rate=args.state_rate,
+        latency=args.latency,
+        jitter=args.jitter,
+        packet_loss=args.loss,
+        battery_drain=args.battery_drain,
+        rotation_rate=args.rotation_rate,
+        seed=args.seed,
+        verbose=args.verbose,
+    )
+    TelloSimulator(config).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
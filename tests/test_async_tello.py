@@ -0,0 +1,73 @@
+"""
+Response correlation of AsyncTello when queries and control commands are
+in flight together.
+
+Run with: python -m pytest tests
+"""
+import asyncio
+import os
+import sys
+import unittest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from async_tello import QUERY_PATTERNS, AsyncTello, TelloBridge, TelloCommandError, _PendingCommand
+
+DRONE = ('192.168.10.1', 8889)
+
+
+class ResponseMatchingTest(unittest.TestCase):
+
+    def correlate(self, commands, responses):
+        """Queue commands in order, deliver responses, return {command: response or None}."""
+        async def run():
+            client = AsyncTello()
+            loop = asyncio.get_running_loop()
+            pending = [_PendingCommand(command, loop.create_future()) for command in commands]
+            client._pending.extend(pending)
+            for response in responses:
+                client._on_response(response.encode('utf-8'), DRONE)
+            return {entry.command: entry.future.result() if entry.future.done() else None for entry in pending}
+        return asyncio.run(run())
+
+    def test_ok_never_answers_a_query(self):
+        for query in QUERY_PATTERNS:
+            with self.subTest(query=query):
+                self.assertEqual(self.correlate([query, 'forward 50'], ['ok']),
+                                 {query: None, 'forward 50': 'ok'})
+
+    def test_error_goes_to_the_control_command(self):
+        answered = self.correlate(['battery?', 'forward 50'], ['error Motor stop'])
+        self.assertEqual(answered, {'battery?': None, 'forward 50': 'error Motor stop'})
+
+    def test_query_answer_while_move_runs(self):
+        answered = self.correlate(['forward 50', 'battery?', 'sn?'], ['87', '0TQZH77ED00W4B', 'ok'])
+        self.assertEqual(answered, {'forward 50': 'ok', 'battery?': '87', 'sn?': '0TQZH77ED00W4B'})
+
+    def test_error_answers_a_query_when_no_control_is_waiting(self):
+        self.assertEqual(self.correlate(['battery?'], ['error']), {'battery?': 'error'})
+
+    def test_late_control_error_is_not_handed_to_a_query(self):
+        async def run():
+            client = AsyncTello()
+            client._late.append((_PendingCommand('forward 50', None).pattern, 1e12))
+            future = asyncio.get_running_loop().create_future()
+            client._pending.append(_PendingCommand('battery?', future))
+            client._on_response(b'error', DRONE)
+            return future.done()
+        self.assertFalse(asyncio.run(run()))
+
+
+class BridgeBatteryTest(unittest.TestCase):
+
+    def test_unparseable_battery_raises_command_error(self):
+        bridge = TelloBridge.__new__(TelloBridge)
+        bridge.client = AsyncTello()
+        bridge._run = lambda coroutine, timeout=None: (coroutine.close(), "error Not joystick")[1]
+        with self.assertRaises(TelloCommandError):
+            bridge.get_battery()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Press/release inference of TermiosBackend on scripted key sequences.
+
+Run with: python -m pytest tests
+"""
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+import input_backends
+from input_backends import TermiosBackend
+
+AUTOREPEAT = 0.03  # Seconds between autorepeated characters of a held key
+
+
+class ScriptedTerminal:
+    """Feeds (time, key) pairs to a TermiosBackend on a simulated clock."""
+
+    def __init__(self, keys):
+        self.now = 0.0
+        self.keys = sorted(keys)
+
+    def read_key(self, timeout):
+        if self.keys and self.keys[0][0] <= self.now + timeout:
+            at, key = self.keys.pop(0)
+            self.now = max(self.now, at)
+            return key
+        self.now += timeout
+        return None
+
+
+def hold(key, start, duration):
+    """Characters a terminal delivers while key is held: the first, then autorepeat."""
+    count = int(duration / AUTOREPEAT) + 1
+    return [(start + i * AUTOREPEAT, key) for i in range(count)]
+
+
+class TermiosBackendTest(unittest.TestCase):
+
+    def events(self, keys, until=5.0, release_timeout=0.5):
+        terminal = ScriptedTerminal(keys)
+        backend = TermiosBackend(release_timeout=release_timeout)
+        backend._read_key = terminal.read_key
+        clock = types.SimpleNamespace(monotonic=lambda: terminal.now, sleep=lambda seconds: None)
+        events = []
+        with mock.patch.object(input_backends, "time", clock):
+            while terminal.now < until or backend._pending:
+                event = backend.read_event(timeout=0.05)
+                if event is not None:
+                    events.append((event.key, event.pressed, round(event.timestamp, 3)))
+        return events
+
+    def test_hold_is_one_press_and_one_release(self):
+        events = self.events(hold('w', 1.0, 1.0))
+        self.assertEqual([(key, pressed) for key, pressed, _ in events], [('w', True), ('w', False)])
+        self.assertAlmostEqual(events[0][2], 1.0)
+        self.assertAlmostEqual(events[1][2], 1.99 + 0.5, delta=0.06)
+
+    def test_switching_keys_presses_the_new_key(self):
+        events = self.events(hold('w', 1.0, 1.0) + hold('d', 2.05, 1.0))
+        self.assertEqual([(key, pressed) for key, pressed, _ in events],
+                         [('w', True), ('w', False), ('d', True), ('d', False)])
+        self.assertAlmostEqual(events[1][2], 2.05)
+        self.assertAlmostEqual(events[2][2], 2.05)
+
+    def test_tap_during_hold_is_not_lost(self):
+        events = self.events(hold('w', 1.0, 1.0) + [(1.5, 'x')], until=3.0)
+        pressed = [key for key, is_press, _ in events if is_press]
+        self.assertIn('x', pressed)
+        self.assertEqual([(key, is_press) for key, is_press, _ in events[:3]],
+                         [('w', True), ('w', False), ('x', True)])
+
+    def test_release_after_timeout_without_repeats(self):
+        events = self.events([(1.0, 'q')], release_timeout=0.3)
+        self.assertEqual(events, [('q', True, 1.0), ('q', False, 1.3)])
+
+    def test_suspend_drops_pending_press(self):
+        backend = TermiosBackend()
+        backend._pending.append(input_backends.KeyEvent('x', pressed=True, timestamp=0.0))
+        with mock.patch.object(input_backends.termios, "tcsetattr"):
+            backend._old_settings = object()
+            backend.suspend()
+        self.assertFalse(backend._pending)
+
+
+if __name__ == "__main__":
+    unittest.main()
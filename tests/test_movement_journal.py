@@ -0,0 +1,97 @@
+"""
+Crash recovery of a mapping session from its movement journal, and the
+durable save that replaces it.
+
+Run with: python -m pytest tests
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from movement_journal import MovementJournal, compact_journal, journal_path_for, read_journal
+from realtime_drone_control import RealTimeDroneController
+
+
+def movement(movement_id, movement_type, direction, distance, start_yaw=0):
+    return {'id': movement_id, 'type': movement_type, 'direction': direction, 'distance': distance,
+            'start_yaw': start_yaw, 'timestamp': "2025-07-08T18:00:00"}
+
+
+class MovementJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="movement_journal_")
+        self.data_file = os.path.join(self.directory, "drone_movements_20250708_180000.json")
+        self.journal_path = journal_path_for(self.data_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write_session(self):
+        journal = MovementJournal(self.journal_path)
+        journal.open(data_file=self.data_file)
+        journal.append('movement', movement=movement("m1", "move", "forward", 120.0, start_yaw=90))
+        journal.append('measurement', id="m1", distance=104.5)
+        journal.append('movement', movement=movement("m2", "lift", "up", 40.0))
+        journal.append('signature', id="WP_001", signature="c2lnMQ==")  # Encoder finished before the waypoint record
+        journal.append('waypoint', id="WP_001", name="kitchen", snapshot="WP_001.jpg")
+        journal.append('movement', movement=movement("m3", "move", "left", 60.0))
+        journal.append('measurement', id="unknown", distance=1.0)
+        journal.append('waypoint', id="WP_002", name="door")
+        journal.append('movement', movement=movement("m4", "move", "backward", 30.0, start_yaw=-170))
+        journal.close()
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write('{"event": "waypoint", "id": "WP_0')  # Torn by a crash mid-write
+
+    def test_replay_with_torn_last_line(self):
+        self.write_session()
+        records = read_journal(self.journal_path)
+        self.assertEqual([record['event'] for record in records][-1], 'movement')
+
+        output = compact_journal(self.journal_path)
+        self.assertEqual(output, self.data_file)
+        with open(output, 'r') as f:
+            data = json.load(f)
+
+        waypoints = data['waypoints']
+        self.assertEqual([waypoint['name'] for waypoint in waypoints], ["kitchen", "door", "END"])
+        self.assertEqual(data['session_info'], {'total_waypoints': 3, 'total_movements': 4})
+
+        kitchen = waypoints[0]
+        self.assertEqual(kitchen['snapshot'], "WP_001.jpg")
+        self.assertEqual(kitchen['signature'], "c2lnMQ==")
+        self.assertEqual([(m['id'], m['distance']) for m in kitchen['movements_to_here']],
+                         [("m1", 104.5), ("m2", 40.0)])
+        self.assertEqual(kitchen['movements_to_here'][0]['yaw'], 90)
+        self.assertEqual(kitchen['movements_to_here'][1]['direction'], "up")
+
+        self.assertEqual(waypoints[1]['movements_to_here'][0]['yaw'], -90)
+        self.assertNotIn('signature', waypoints[1])
+        self.assertEqual(waypoints[2]['id'], "WP_003")
+        self.assertEqual(waypoints[2]['movements_to_here'][0]['yaw'], 10)
+        self.assertFalse(os.path.exists(self.data_file + ".tmp"))
+
+    def test_save_is_synced_before_replace(self):
+        controller = RealTimeDroneController()
+        controller.data_file = self.data_file
+        controller.waypoints = [{'id': "WP_001", 'name': "START", 'movements_to_here': []}]
+        calls = []
+        with mock.patch("realtime_drone_control.os.fsync", side_effect=lambda fd: calls.append('fsync')), \
+                mock.patch("realtime_drone_control.os.replace",
+                           side_effect=lambda *args: calls.append('replace') or shutil.move(*args)), \
+                mock.patch("builtins.print"):
+            self.assertTrue(controller.save_to_json())
+        self.assertEqual(calls, ['fsync', 'replace'])
+        with open(self.data_file, 'r') as f:
+            self.assertEqual(json.load(f)['session_info']['total_waypoints'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Displacement checks for PlanCompiler: what the commands fly plus the plan's
+residual must add up to what the movements recorded.
+
+Run with: python -m pytest tests
+"""
+import glob
+import itertools
+import math
+import os
+import sys
+import unittest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from plan_compiler import MIN_DISTANCE, HeadingStrategy, PlanCompiler
+from waypoint_navigation import NavigationMovement, RouteMode, WaypointNavigationManager
+
+TOLERANCE = 1e-6
+
+
+def move(distance, yaw):
+    return NavigationMovement(id="m", type="move", distance=distance, yaw=yaw)
+
+
+def lift(distance, direction):
+    return NavigationMovement(id="l", type="lift", distance=distance, direction=direction)
+
+
+def recorded_displacement(movements):
+    """World-frame displacement (x along yaw 0, y along yaw 90, z up) of the movements."""
+    x = y = z = 0.0
+    for movement in movements:
+        if movement.type == "move":
+            rad = math.radians(movement.yaw or 0)
+            x += movement.distance * math.cos(rad)
+            y += movement.distance * math.sin(rad)
+        else:
+            z += movement.distance if movement.direction == "up" else -movement.distance
+    return x, y, z
+
+
+def flown_displacement(commands, start_heading):
+    """World-frame displacement of a command list, following the headings it rotates to."""
+    heading = start_heading
+    x = y = z = 0.0
+    for command in commands:
+        if command.name == "rotate_to":
+            heading = command.args[0]
+            continue
+        forward, left, up = PlanCompiler._body_displacement([command])
+        if forward or left:
+            dx, dy = PlanCompiler._to_world(forward, left, heading)
+            x, y = x + dx, y + dy
+        z += up
+    return x, y, z
+
+
+class PlanDisplacementTest(unittest.TestCase):
+
+    def assertAccountedFor(self, movements, start_heading=0, compiler=None):
+        """Compile under every strategy and smoothing and check flown + residual == recorded."""
+        compiler = compiler or PlanCompiler()
+        expected = recorded_displacement(movements)
+        plans = []
+        for strategy, smooth in itertools.product(HeadingStrategy, (False, True)):
+            plan = compiler.compile(movements, start_heading=start_heading, strategy=strategy,
+                                    smooth=smooth)
+            flown = flown_displacement(plan.commands, start_heading)
+            for axis, recorded, actual, residual in zip("xyz", expected, flown, plan.residual):
+                self.assertAlmostEqual(actual + residual, recorded, delta=TOLERANCE,
+                                       msg=f"{axis} with {strategy.value}, smooth={smooth}: "
+                                           f"{[command.describe() for command in plan.commands]}")
+            plans.append(plan)
+        return plans
+
+    def test_short_climb_after_move_is_reported(self):
+        for plan in self.assertAccountedFor([move(20.4, 0), lift(19.5, "up")]):
+            self.assertAlmostEqual(plan.residual[2], 19.5, delta=1)
+            self.assertTrue(plan.notes)
+
+    def test_lift_only_routes(self):
+        for distance in (5, 19.5, 20, 20.4, 45.6, 512):
+            for direction in ("up", "down"):
+                self.assertAccountedFor([lift(distance, direction)])
+
+    def test_opposing_lifts_net_out(self):
+        self.assertAccountedFor([lift(229, "down"), move(80, 90), lift(213, "up")])
+        for plan in self.assertAccountedFor([lift(229, "down"), lift(213, "up")]):
+            self.assertEqual(plan.commands, [])
+            self.assertAlmostEqual(plan.residual[2], -16)
+            self.assertTrue(plan.notes)
+
+    def test_short_lifts_accumulate_into_a_flyable_one(self):
+        for plan in self.assertAccountedFor([lift(12, "up"), move(60, 0), lift(12, "up"), move(60, 90)]):
+            self.assertLess(abs(plan.residual[2]), MIN_DISTANCE)
+
+    def test_near_minimum_moves(self):
+        for distance, yaw in itertools.product((19.6, 20, 20.4, 21, 39.9), (0, 5, 30, 45, 89, 135, -170)):
+            self.assertAccountedFor([move(distance, yaw)])
+            self.assertAccountedFor([move(distance, yaw), lift(19.5, "up")])
+            self.assertAccountedFor([move(distance, yaw), move(distance, yaw + 90)], start_heading=17)
+
+    def test_off_heading_vector_inside_minimum_is_flown(self):
+        for plan in self.assertAccountedFor([move(20, 5)]):
+            self.assertTrue(plan.commands)
+
+    def test_axis_commands_without_vectorize(self):
+        self.assertAccountedFor([move(20.4, 30), lift(25, "up"), move(150, 120), lift(19.5, "down")],
+                                compiler=PlanCompiler(vectorize=False))
+
+    def test_recorded_sessions(self):
+        for path in sorted(glob.glob(os.path.join(REPO, "drone_movements_*.json"))):
+            manager = WaypointNavigationManager()
+            manager.cost_model_file = None
+            self.assertTrue(manager.load_waypoint_file(path, verbose=False))
+            for (start, end), route_mode in itertools.product(itertools.permutations(manager.waypoint_order, 2),
+                                                              RouteMode):
+                movements, _ = manager.calculate_navigation_path(end, route_mode, from_waypoint_id=start)
+                with self.subTest(session=os.path.basename(path), start=start, end=end, mode=route_mode.value):
+                    for start_heading in (None, 0, 123):
+                        self.assertAccountedFor(movements, start_heading=start_heading)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
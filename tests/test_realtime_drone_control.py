@@ -0,0 +1,63 @@
+"""
+Odometry corrections of recorded movement distances.
+
+Run with: python -m pytest tests
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from realtime_drone_control import RealTimeDroneController
+
+
+class FixedOdometry:
+    """Reports the same displacement for any window."""
+
+    def __init__(self, displacement):
+        self._displacement = displacement
+
+    def displacement(self, start_time, end_time):
+        return self._displacement
+
+
+class ApplyOdometryTest(unittest.TestCase):
+
+    def measure(self, displacement, distance=80.0, movement_type="move", direction="forward", start_yaw=0):
+        controller = RealTimeDroneController()
+        controller.odometry = FixedOdometry(displacement)
+        controller.journal = mock.Mock()
+        event = {'id': "m1", 'type': movement_type, 'direction': direction, 'distance': distance,
+                 'start_yaw': start_yaw}
+        with mock.patch("builtins.print"):
+            controller._apply_odometry(event, 10.0, 11.0)
+        return event['distance'], controller.journal.append.call_args_list
+
+    def test_plausible_measurement_replaces_the_estimate(self):
+        distance, journal = self.measure((0.0, 93.4, 0.0), start_yaw=90)
+        self.assertEqual(distance, 93.4)
+        self.assertEqual(journal, [mock.call('measurement', id="m1", distance=93.4)])
+
+    def test_lift_measurement(self):
+        self.assertEqual(self.measure((0.0, 0.0, -35.0), distance=40.0, movement_type="lift", direction="down")[0],
+                         35.0)
+
+    def test_no_motion_keeps_the_estimate(self):
+        for displacement in ((0.0, 0.0, 0.0), (5.0, 0.0, 0.0), (-30.0, 0.0, 0.0)):
+            with self.subTest(displacement=displacement):
+                distance, journal = self.measure(displacement)
+                self.assertEqual(distance, 80.0)
+                self.assertEqual(journal, [])
+
+    def test_implausibly_long_measurement_keeps_the_estimate(self):
+        self.assertEqual(self.measure((400.0, 0.0, 0.0))[0], 80.0)
+
+    def test_uncovered_window_keeps_the_estimate(self):
+        self.assertEqual(self.measure(None)[0], 80.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
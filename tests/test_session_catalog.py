@@ -0,0 +1,85 @@
+"""
+Session listing and name search of SessionCatalog.
+
+Run with: python -m pytest tests
+"""
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from session_catalog import SessionCatalog
+
+
+def session(names):
+    return {'waypoints': [{'id': f"WP_{index + 1:03d}", 'name': name, 'movements_to_here': []}
+                          for index, name in enumerate(names)]}
+
+
+class SessionCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="session_catalog_")
+        sessions = {
+            "drone_movements_20250701_100000.json": ["START", "kitchen", "100%_charge"],
+            "drone_movements_20250702_100000.json": ["START", "hall", "door_a"],
+            "drone_movements_20250703_100000.json": ["START", "doorXa", "garage"],
+        }
+        for file_name, names in sessions.items():
+            with open(os.path.join(self.directory, file_name), 'w') as f:
+                json.dump(session(names), f)
+        self.catalog = SessionCatalog(self.directory)
+        self.catalog.refresh()
+
+    def tearDown(self):
+        self.catalog.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def names(self, entries):
+        return [os.path.basename(entry.path)[16:24] for entry in entries]
+
+    def test_listing_with_names(self):
+        entries = self.catalog.sessions()
+        self.assertEqual(self.names(entries), ["20250703", "20250702", "20250701"])
+        self.assertEqual(entries[1].waypoint_names, ["START", "hall", "door_a"])
+        limited = self.catalog.sessions(limit=1)
+        self.assertEqual(len(limited), 1)
+        self.assertEqual(limited[0].waypoint_names, ["START", "doorXa", "garage"])
+
+    def test_search_wildcards_are_literal(self):
+        self.assertEqual(self.names(self.catalog.sessions(search="door_a")), ["20250702"])
+        self.assertEqual(self.names(self.catalog.sessions(search="100%")), ["20250701"])
+        self.assertEqual(self.catalog.sessions(search="a%e"), [])
+        self.assertEqual(self.names(self.catalog.sessions(search="KITCHEN")), ["20250701"])
+        self.assertEqual([name for _, _, name in self.catalog.find_waypoints("_a")], ["door_a"])
+        self.assertEqual(self.catalog.find_waypoints("\\"), [])
+
+    def test_more_sessions_than_bound_variables(self):
+        connection = self.catalog.connection
+        if not hasattr(connection, "setlimit"):
+            self.skipTest("sqlite3 connection limits need Python 3.11")
+        connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)  # Oldest SQLite default; builds differ
+        count = 2000
+        with self.catalog.connection:
+            self.catalog.connection.executemany(
+                "INSERT INTO sessions (path, mtime_ns, size, waypoint_count) VALUES (?, 0, 0, 1)",
+                [(f"archive/drone_movements_{index:06d}.json",) for index in range(count)])
+            self.catalog.connection.executemany(
+                "INSERT INTO waypoints (path, position, id, name) VALUES (?, 0, 'WP_001', 'START')",
+                [(f"archive/drone_movements_{index:06d}.json",) for index in range(count)])
+        try:
+            entries = self.catalog.sessions()
+        except sqlite3.OperationalError as e:
+            self.fail(f"Listing failed: {e}")
+        self.assertEqual(len(entries), count + 3)
+        self.assertTrue(all(entry.waypoint_names for entry in entries))
+
+
+if __name__ == "__main__":
+    unittest.main()
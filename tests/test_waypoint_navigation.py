@@ -0,0 +1,106 @@
+"""
+Cost-model samples taken while executing a plan, on a simulated clock.
+
+Run with: python -m pytest tests
+"""
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+import waypoint_navigation
+from cost_model import ROTATION, SETTLE, FlightCostModel
+from plan_compiler import CompiledPlan, PlanCommand
+from waypoint_navigation import NavigationDirection, WaypointNavigationManager
+
+YAW_QUERY_SECONDS = 0.3
+TURN_SECONDS = 2.0
+MOVE_SECONDS = 1.0
+COAST_SECONDS = 0.4  # The state stream reports motion this long after a move is acknowledged
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeDrone:
+    def __init__(self, clock):
+        self.clock = clock
+        self.stopped_at = 0.0
+
+    def set_speed(self, speed):
+        pass
+
+    def send_rc_control(self, *values):
+        pass
+
+    def rotate_clockwise(self, degrees):
+        self.clock.now += TURN_SECONDS
+
+    def move_forward(self, distance):
+        self.clock.now += MOVE_SECONDS
+        self.stopped_at = self.clock.now + COAST_SECONDS
+
+
+class FakeTelemetry:
+    poll_interval = 0.02
+
+    def __init__(self, clock, drone, fresh=True):
+        self.clock, self.drone, self.fresh = clock, drone, fresh
+
+    def is_fresh(self):
+        return self.fresh
+
+    def get_yaw(self):
+        self.clock.now += YAW_QUERY_SECONDS  # As slow as a query for the test's sake
+        return 0
+
+    def get_velocity(self):
+        moving = self.clock.now < self.drone.stopped_at
+        return {'vgx': 3 if moving else 0, 'vgy': 0, 'vgz': 0}
+
+
+class ExecuteNavigationSamplesTest(unittest.TestCase):
+
+    def execute(self, fresh=True):
+        clock = Clock()
+        drone = FakeDrone(clock)
+        manager = WaypointNavigationManager()
+        manager.cost_model_file = None
+        manager.cost_model = FlightCostModel()
+        manager.telemetry = FakeTelemetry(clock, drone, fresh=fresh)
+        plan = CompiledPlan(commands=[PlanCommand("rotate_to", (90,), heading=90),
+                                      PlanCommand("move_forward", (100,), heading=90)],
+                            source_movements=1)
+        fake_time = types.SimpleNamespace(monotonic=lambda: clock.now, sleep=clock.sleep)
+        with mock.patch.object(waypoint_navigation, "time", fake_time), mock.patch("builtins.print"):
+            self.assertTrue(manager._execute_navigation(plan, NavigationDirection.FORWARD, drone_instance=drone))
+        return manager.cost_model.samples
+
+    def test_rotation_sample_excludes_the_yaw_query(self):
+        samples = self.execute()
+        self.assertEqual(len(samples[ROTATION]), 1)
+        degrees, seconds = samples[ROTATION][0]
+        self.assertEqual(degrees, 90)
+        self.assertAlmostEqual(seconds, TURN_SECONDS)
+
+    def test_settle_is_measured_from_velocity(self):
+        samples = self.execute()
+        self.assertEqual(len(samples[SETTLE]), 1)
+        self.assertAlmostEqual(samples[SETTLE][0][1], COAST_SECONDS, delta=FakeTelemetry.poll_interval)
+
+    def test_fixed_hover_without_state_stream_is_not_a_sample(self):
+        samples = self.execute(fresh=False)
+        self.assertEqual(list(samples[SETTLE]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
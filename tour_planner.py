@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Visiting order for multi-waypoint tours.
+
+Given a matrix of pairwise costs (estimated flight seconds, not necessarily
+symmetric), find the order that visits every stop once with the lowest
+total cost, optionally from a fixed first stop and to a fixed last stop.
+Up to EXACT_LIMIT free stops are solved exactly with Held-Karp dynamic
+programming; larger sets use nearest-neighbour construction refined by
+2-opt segment reversals.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+EXACT_LIMIT = 12  # Free stops solved exactly (Held-Karp is O(n^2 2^n))
+
+
+@dataclass
+class Tour:
+    """Visiting order over the indices of a cost matrix."""
+    order: List[int]
+    cost: float
+    exact: bool  # True if the order is proven optimal
+    baseline_cost: float = 0.0  # Cost of visiting the nodes in the order given
+
+
+def path_cost(costs: np.ndarray, order: Sequence[int]) -> float:
+    """Total cost of visiting the nodes in order."""
+    return float(sum(costs[a, b] for a, b in zip(order, order[1:])))
+
+
+def solve_tour(costs: np.ndarray, nodes: Sequence[int], start: Optional[int] = None,
+               end: Optional[int] = None) -> Tour:
+    """
+    Order the nodes to minimize the total path cost.
+
+    Args:
+        costs: Square matrix, costs[a, b] = cost of flying from a to b
+        nodes: Node indices to visit (start and end may be among them)
+        start: Node the path must begin at, or None to choose the best
+        end: Node the path must finish at, or None to finish anywhere
+    """
+    free = [node for node in dict.fromkeys(nodes) if node not in (start, end)]
+    if len(free) <= EXACT_LIMIT:
+        order = _held_karp(costs, free, start, end)
+        exact = True
+    else:
+        order = _two_opt(costs, _nearest_neighbour(costs, free, start, end),
+                         fixed_start=start is not None, fixed_end=end is not None)
+        exact = False
+    given = list(dict.fromkeys(([start] if start is not None else []) + free + ([end] if end is not None else [])))
+    return Tour(order=order, cost=path_cost(costs, order), exact=exact, baseline_cost=path_cost(costs, given))
+
+
+def _held_karp(costs: np.ndarray, free: List[int], start: Optional[int], end: Optional[int]) -> List[int]:
+    """Exact path order by dynamic programming over subsets of the free nodes."""
+    n = len(free)
+    if n == 0:
+        return [node for node in (start, end) if node is not None]
+    sub = costs[np.ix_(free, free)]
+    # best[mask, j]: cheapest path covering the nodes in mask and ending at free[j]
+    best = np.full((1 << n, n), np.inf)
+    parent = np.full((1 << n, n), -1, dtype=np.int64)
+    bits = 1 << np.arange(n)
+    best[bits, np.arange(n)] = costs[start, free] if start is not None else 0.0
+
+    for mask in range(1, 1 << n):
+        row = best[mask]
+        if not np.isfinite(row).any():
+            continue
+        # candidates[j, k] = best path over mask ending at j, extended to k
+        candidates = row[:, None] + sub
+        extend = np.argmin(candidates, axis=0)
+        values = candidates[extend, np.arange(n)]
+        for k in np.nonzero((mask & bits) == 0)[0]:
+            target = mask | bits[k]
+            if values[k] < best[target, k]:
+                best[target, k] = values[k]
+                parent[target, k] = extend[k]
+
+    full = (1 << n) - 1
+    final = best[full] + (costs[free, end] if end is not None else 0.0)
+    last = int(np.argmin(final))
+    order, mask = [], full
+    while last >= 0:
+        order.append(free[last])
+        last, mask = int(parent[mask, last]), mask & ~int(bits[last])
+    order.reverse()
+    return ([start] if start is not None else []) + order + ([end] if end is not None else [])
+
+
+def _nearest_neighbour(costs: np.ndarray, free: List[int], start: Optional[int], end: Optional[int]) -> List[int]:
+    """Greedy path: always fly to the cheapest unvisited node next."""
+    remaining = list(free)
+    if start is None:
+        # Begin at the node with the cheapest way out
+        start = min(remaining, key=lambda node: min(costs[node, other] for other in remaining if other != node))
+        remaining.remove(start)
+    order = [start]
+    while remaining:
+        nearest = min(remaining, key=lambda node: costs[order[-1], node])
+        remaining.remove(nearest)
+        order.append(nearest)
+    if end is not None:
+        order.append(end)
+    return order
+
+
+def _two_opt(costs: np.ndarray, order: List[int], fixed_start: bool, fixed_end: bool) -> List[int]:
+    """
+    Reverse segments while that shortens the path.
+
+    Costs may be asymmetric, so a reversal also changes the cost of the
+    edges inside the segment; prefix sums of the forward and backward edge
+    costs give each candidate's change in O(1).
+    """
+    order = list(order)
+    first = 1 if fixed_start else 0
+    last = len(order) - (2 if fixed_end else 1)
+    improved = True
+    while improved:
+        improved = False
+        forward = np.concatenate(([0.0], np.cumsum([costs[a, b] for a, b in zip(order, order[1:])])))
+        backward = np.concatenate(([0.0], np.cumsum([costs[b, a] for a, b in zip(order, order[1:])])))
+        for i in range(first, last):
+            for j in range(i + 1, last + 1):
+                # Reverse order[i..j]
+                before = order[i - 1] if i > 0 else None
+                after = order[j + 1] if j + 1 < len(order) else None
+                old = forward[j] - forward[i]
+                new = backward[j] - backward[i]
+                if before is not None:
+                    old += costs[before, order[i]]
+                    new += costs[before, order[j]]
+                if after is not None:
+                    old += costs[order[j], after]
+                    new += costs[order[i], after]
+                if new < old - 1e-9:
+                    order[i:j + 1] = order[i:j + 1][::-1]
+                    improved = True
+                    break
+            if improved:
+                break
+    return order
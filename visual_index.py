@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Visual waypoint signatures and the index used to verify arrivals.
+
+A signature is the camera view shrunk to a 24x32 grayscale thumbnail by
+averaging blocks of every other pixel, with its mean removed and scaled
+to unit length, so the dot product of two signatures is their normalized
+cross-correlation (insensitive to exposure changes). Signatures are stored in the session
+file as base64 int8 vectors of 768 bytes. VisualIndex stacks every
+waypoint's signature into one matrix, so matching a live frame against the
+whole map is a single matrix-vector product.
+
+Usage:
+    python visual_index.py drone_movements_20250708_181217.json arrival.jpg [more.jpg ...]
+"""
+import base64
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+SIGNATURE_SHAPE = (24, 32)  # Thumbnail rows and columns
+SAMPLE_STRIDE = 2  # Every other pixel in each direction feeds the block averages
+VERIFY_THRESHOLD = 0.75  # Lowest correlation with the target that counts as verified
+_BGR_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+
+def compute_signature(frame: np.ndarray) -> np.ndarray:
+    """Unit-length, zero-mean float32 signature of a BGR (or grayscale) frame."""
+    rows, cols = SIGNATURE_SHAPE
+    height, width = frame.shape[:2]
+    if height < rows * SAMPLE_STRIDE or width < cols * SAMPLE_STRIDE:
+        raise ValueError(f"Frame {width}x{height} is too small for a {cols}x{rows} signature")
+    sampled = frame[::SAMPLE_STRIDE, ::SAMPLE_STRIDE]
+    if sampled.ndim == 2:
+        sampled = sampled[..., None]
+    # Block sums in integers (no float copy of the frame), then block means
+    row_starts = np.arange(rows) * sampled.shape[0] // rows
+    col_starts = np.arange(cols) * sampled.shape[1] // cols
+    sums = np.add.reduceat(np.add.reduceat(sampled, row_starts, axis=0, dtype=np.uint32), col_starts, axis=1)
+    counts = np.outer(np.diff(row_starts, append=sampled.shape[0]), np.diff(col_starts, append=sampled.shape[1]))
+    small = sums.astype(np.float32) / counts[..., None]
+    gray = small @ _BGR_WEIGHTS if small.shape[-1] == 3 else small[..., 0]
+    vector = gray.ravel()
+    vector -= vector.mean()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def encode_signature(signature: np.ndarray) -> str:
+    """Quantize a signature to int8 and encode it for the session file."""
+    peak = float(np.abs(signature).max()) or 1.0
+    return base64.b64encode(np.round(signature * (127 / peak)).astype(np.int8).tobytes()).decode('ascii')
+
+
+def decode_signature(text: str) -> np.ndarray:
+    vector = np.frombuffer(base64.b64decode(text), dtype=np.int8).astype(np.float32)
+    if vector.size != SIGNATURE_SHAPE[0] * SIGNATURE_SHAPE[1]:
+        raise ValueError(f"Signature has {vector.size} values, expected {SIGNATURE_SHAPE[0] * SIGNATURE_SHAPE[1]}")
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+@dataclass
+class VisualMatch:
+    """Best match of a view against the index, compared with the expected waypoint."""
+    waypoint_id: str  # Best matching waypoint
+    score: float  # Its correlation with the view (-1 to 1)
+    expected_id: Optional[str] = None
+    expected_score: Optional[float] = None  # None if the expected waypoint has no signature
+
+    @property
+    def verified(self) -> bool:
+        return (self.expected_id == self.waypoint_id and self.expected_score is not None
+                and self.expected_score >= VERIFY_THRESHOLD)
+
+    def describe(self) -> str:
+        if self.verified:
+            return f"arrived and verified at {self.waypoint_id} (similarity {self.score:.2f})"
+        if self.expected_id is not None and self.expected_score is None:
+            return f"{self.expected_id} has no signature; closest match is {self.waypoint_id} ({self.score:.2f})"
+        if self.expected_id == self.waypoint_id:
+            return f"closest match is {self.waypoint_id}, but only at similarity {self.score:.2f}"
+        expected = f", {self.expected_id} {self.expected_score:.2f}" if self.expected_id is not None else ""
+        return f"closest match is {self.waypoint_id} ({self.score:.2f}{expected})"
+
+
+class VisualIndex:
+    """Waypoint signatures of one map, stacked for vectorized matching."""
+
+    def __init__(self, waypoint_ids: List[str], signatures: np.ndarray):
+        self.waypoint_ids = waypoint_ids
+        self.signatures = np.ascontiguousarray(signatures, dtype=np.float32)  # (waypoints, 768)
+        self._rows = {wp_id: row for row, wp_id in enumerate(waypoint_ids)}
+
+    @classmethod
+    def from_waypoints(cls, waypoints: Iterable[Tuple[str, Optional[str]]]) -> Optional["VisualIndex"]:
+        """Index the (id, encoded signature) pairs that have a signature; None if none has."""
+        ids, vectors = [], []
+        for wp_id, text in waypoints:
+            if text:
+                ids.append(wp_id)
+                vectors.append(decode_signature(text))
+        if not ids:
+            return None
+        return cls(ids, np.stack(vectors))
+
+    def __len__(self) -> int:
+        return len(self.waypoint_ids)
+
+    def __contains__(self, waypoint_id: str) -> bool:
+        return waypoint_id in self._rows
+
+    def scores(self, signature: np.ndarray) -> np.ndarray:
+        """Correlation of a signature with every indexed waypoint."""
+        return self.signatures @ signature
+
+    def match(self, frame: np.ndarray, expected_id: Optional[str] = None) -> VisualMatch:
+        """Match a BGR frame against every waypoint, reporting on expected_id if given."""
+        scores = self.scores(compute_signature(frame))
+        best = int(np.argmax(scores))
+        expected_score = None
+        if expected_id in self._rows:
+            expected_score = float(scores[self._rows[expected_id]])
+        return VisualMatch(waypoint_id=self.waypoint_ids[best], score=float(scores[best]),
+                           expected_id=expected_id, expected_score=expected_score)
+
+
+def main():
+    import argparse
+
+    from waypoint_navigation import WaypointNavigationManager
+
+    parser = argparse.ArgumentParser(description='Match images against the waypoint signatures of a map')
+    parser.add_argument('map', help='Session file (drone_movements_*.json or .tmap)')
+    parser.add_argument('images', nargs='+', help='Images to match, e.g. arrival snapshots')
+    args = parser.parse_args()
+
+    manager = WaypointNavigationManager()
+    if not manager.load_waypoint_file(args.map, verbose=False):
+        raise SystemExit(1)
+    if manager.visual_index is None:
+        raise SystemExit(f"❌ {args.map} has no waypoint signatures (map it with --snapshots)")
+
+    import cv2
+    for path in args.images:
+        frame = cv2.imread(path)
+        if frame is None:
+            print(f"❌ {path}: not a readable image")
+            continue
+        ranked = manager.visual_index.scores(compute_signature(frame))
+        order = np.argsort(ranked)[::-1][:3]
+        print(f"{path}: " + ", ".join(f"{manager.visual_index.waypoint_ids[i]} {ranked[i]:.2f}" for i in order))
+
+
+if __name__ == "__main__":
+    main()
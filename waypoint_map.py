@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Columnar binary waypoint maps (.tmap).
+
+A .tmap file holds the same data as a drone_movements_*.json file, laid out
+for memory mapping:
+
+    b"TMAP" | version (uint32) | header length (uint64) | header JSON | padding | columns
+
+The header carries the session info, the waypoint ids and names, and the
+location of each column. The columns are fixed-width arrays with one row
+per movement (kind, yaw, distance, direction, timestamp, flags, uuid), plus
+the waypoint offset table. Waypoint i owns rows offsets[i]:offsets[i + 1].
+UUIDs are stored as 16 raw bytes and ISO timestamps as int64 microseconds.
+Any movement that would not survive that encoding exactly is kept verbatim
+in the header, so conversion is lossless in both directions.
+
+Usage:
+    python waypoint_map.py to-map drone_movements_20250708_181217.json
+    python waypoint_map.py to-json drone_movements_20250708_181217.tmap   # -> ...181217.from_tmap.json
+"""
+import argparse
+import json
+import math
+import os
+import struct
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from path_index import DOWN, LIFT, MOVE, NO_DIRECTION, UP, PathIndex
+
+MAGIC = b"TMAP"
+VERSION = 1
+EXTENSION = ".tmap"
+_PREAMBLE = struct.Struct("<4sIQ")
+_ALIGN = 8
+
+# Per-movement columns: name -> (dtype, trailing shape)
+COLUMNS = {
+    'kind': (np.int8, ()),
+    'yaw': (np.float64, ()),
+    'distance': (np.float64, ()),
+    'direction': (np.int8, ()),
+    'timestamp': (np.int64, ()),
+    'flags': (np.uint8, ()),
+    'uuid': (np.uint8, (16,)),
+}
+
+# Flag bits
+HAS_YAW = 1
+YAW_IS_INT = 2
+HAS_DIRECTION = 4
+DISTANCE_IS_INT = 8
+HAS_TIMESTAMP = 16
+
+_EPOCH = datetime(1970, 1, 1)
+_KIND_NAMES = {MOVE: "move", LIFT: "lift"}
+_DIRECTION_NAMES = {NO_DIRECTION: None, UP: "up", DOWN: "down"}
+
+
+def _align(position: int) -> int:
+    return (position + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _encode_timestamp(text: str) -> int:
+    """ISO timestamp (naive, as written by datetime.isoformat) to int64 microseconds."""
+    delta = datetime.fromisoformat(text) - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _decode_timestamp(value: int) -> str:
+    return (_EPOCH + timedelta(microseconds=int(value))).isoformat()
+
+
+def _encode_movement(movement: Dict) -> Optional[tuple]:
+    """Encode one JSON movement as a column row, or None if it needs to be kept verbatim."""
+    try:
+        kind = MOVE if movement['type'] == "move" else LIFT
+        flags = 0
+        yaw = math.nan
+        if 'yaw' in movement:
+            flags |= HAS_YAW
+            if movement['yaw'] is not None:
+                yaw = float(movement['yaw'])
+                if isinstance(movement['yaw'], int):
+                    flags |= YAW_IS_INT
+        direction = NO_DIRECTION
+        if 'direction' in movement:
+            flags |= HAS_DIRECTION
+            direction = {None: NO_DIRECTION, "up": UP, "down": DOWN}[movement['direction']]
+        if isinstance(movement['distance'], int):
+            flags |= DISTANCE_IS_INT
+        timestamp = 0
+        if 'timestamp' in movement:
+            flags |= HAS_TIMESTAMP
+            timestamp = _encode_timestamp(movement['timestamp'])
+        row = (kind, yaw, float(movement['distance']), direction, timestamp, flags,
+               uuid.UUID(movement['id']).bytes)
+    except (KeyError, ValueError, TypeError, AttributeError):
+        return None
+
+    # Only accept the encoding if it decodes to exactly the same record, key order and types included
+    decoded = _decode_row(*row)
+    if list(decoded) != list(movement) or any(decoded[key] != value or type(decoded[key]) is not type(value)
+                                              for key, value in movement.items()):
+        return None
+    return row
+
+
+def _decode_row(kind, yaw, distance, direction, timestamp, flags, raw_uuid) -> Dict:
+    """Rebuild a movement in the save_to_json layout from one column row."""
+    flags = int(flags)
+    record = {'id': str(uuid.UUID(bytes=bytes(raw_uuid))), 'type': _KIND_NAMES[int(kind)]}
+    if flags & HAS_YAW:
+        record['yaw'] = None if math.isnan(yaw) else int(yaw) if flags & YAW_IS_INT else float(yaw)
+    if flags & HAS_DIRECTION:
+        record['direction'] = _DIRECTION_NAMES[int(direction)]
+    record['distance'] = int(distance) if flags & DISTANCE_IS_INT else float(distance)
+    if flags & HAS_TIMESTAMP:
+        record['timestamp'] = _decode_timestamp(timestamp)
+    return record
+
+
+def write_map(data: Dict, path: str):
+    """Write a waypoint file dict (the save_to_json layout) as a .tmap file."""
+    waypoints = data.get('waypoints', [])
+    movements = [movement for waypoint in waypoints for movement in waypoint.get('movements_to_here', [])]
+    count = len(movements)
+
+    offsets = np.zeros(len(waypoints) + 1, dtype=np.int64)
+    np.cumsum([len(waypoint.get('movements_to_here', [])) for waypoint in waypoints], out=offsets[1:])
+
+    empty_row = (LIFT, math.nan, 0.0, NO_DIRECTION, 0, 0, bytes(16))
+    rows, verbatim = [], {}
+    for i, movement in enumerate(movements):
+        row = _encode_movement(movement)
+        if row is None:
+            verbatim[str(i)] = movement
+            row = empty_row
+        rows.append(row)
+
+    values = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+    columns = {}
+    for (name, (dtype, shape)), column in zip(COLUMNS.items(), values):
+        if name == 'uuid':
+            columns[name] = np.frombuffer(b"".join(column), dtype=dtype).reshape((count,) + shape)
+        else:
+            columns[name] = np.array(column, dtype=dtype).reshape((count,) + shape)
+    columns['offsets'] = offsets
+
+    # Column positions are relative to the aligned end of the header
+    layout, position = {}, 0
+    for name, array in columns.items():
+        layout[name] = [position, list(array.shape)]
+        position = _align(position + array.nbytes)
+
+    header = {
+        'key_order': list(data),
+        'top_level': {key: value for key, value in data.items() if key != 'waypoints'},
+        'waypoints': [{key: value for key, value in waypoint.items() if key != 'movements_to_here'}
+                      for waypoint in waypoints],
+        'verbatim': verbatim,
+        'columns': layout,
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        data_start = _align(f.tell())
+        for name, array in columns.items():
+            f.seek(data_start + layout[name][0])
+            f.write(np.ascontiguousarray(array).tobytes())
+
+
+class WaypointMap:
+    """
+    A .tmap file opened with numpy.memmap.
+
+    Opening reads only the header; column pages are loaded by the OS as
+    rows are touched, and movement dicts are only built for the ranges
+    asked for.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a waypoint map")
+            if version > VERSION:
+                raise ValueError(f"{path} uses map format version {version}, newest supported is {VERSION}")
+            header = json.loads(f.read(header_length).decode('utf-8'))
+        data_start = _align(_PREAMBLE.size + header_length)
+
+        self._key_order: List[str] = header['key_order']
+        self._top_level: Dict = header['top_level']
+        self.session_info: Dict = self._top_level.get('session_info', {})
+        self.waypoints: List[Dict] = header['waypoints']
+        self._verbatim: Dict[int, Dict] = {int(i): movement for i, movement in header['verbatim'].items()}
+
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, (position, shape) in header['columns'].items():
+            dtype = COLUMNS[name][0] if name in COLUMNS else np.int64
+            if np.prod(shape) == 0:
+                self.columns[name] = np.zeros(shape, dtype=dtype)  # mmap cannot map zero bytes
+            else:
+                self.columns[name] = np.memmap(path, dtype=dtype, mode='r', offset=data_start + position,
+                                               shape=tuple(shape))
+        self.offsets = self.columns['offsets']
+
+    @property
+    def waypoint_count(self) -> int:
+        return len(self.waypoints)
+
+    @property
+    def movement_count(self) -> int:
+        return int(self.offsets[-1])
+
+    def waypoint_bounds(self, index: int) -> tuple:
+        """Row range [start, stop) of the movements leading to waypoint index."""
+        return int(self.offsets[index]), int(self.offsets[index + 1])
+
+    def records(self, start: int, stop: int) -> List[Dict]:
+        """Movements in rows [start, stop) in the save_to_json layout."""
+        rows = zip(*(self.columns[name][start:stop] for name in COLUMNS))
+        return [self._verbatim.get(i) or _decode_row(*row) for i, row in enumerate(rows, start)]
+
+    def path_index(self) -> PathIndex:
+        """Build the path index straight from the columns."""
+        kinds, yaws = self.columns['kind'], self.columns['yaw']
+        distances, directions = self.columns['distance'], self.columns['direction']
+        if self._verbatim:
+            # Rows kept verbatim have no column values; fill them in for the index
+            kinds, yaws, distances, directions = (np.array(column) for column in (kinds, yaws, distances, directions))
+            for i, movement in self._verbatim.items():
+                kinds[i] = MOVE if movement.get('type') == "move" else LIFT
+                yaws[i] = movement.get('yaw') if movement.get('yaw') is not None else np.nan
+                distances[i] = movement.get('distance') or 0.0
+                directions[i] = {"up": UP, "down": DOWN}.get(movement.get('direction'), NO_DIRECTION)
+        return PathIndex(kinds, yaws, distances, directions, self.offsets)
+
+    def to_dict(self) -> Dict:
+        """The whole map in the save_to_json layout."""
+        waypoints = []
+        for index, waypoint in enumerate(self.waypoints):
+            record = dict(waypoint)
+            record['movements_to_here'] = self.records(*self.waypoint_bounds(index))
+            waypoints.append(record)
+        return {key: waypoints if key == 'waypoints' else self._top_level[key] for key in self._key_order}
+
+
+def json_to_map(json_path: str, map_path: Optional[str] = None) -> str:
+    """Convert a drone_movements_*.json file to .tmap; returns the output path."""
+    map_path = map_path or os.path.splitext(json_path)[0] + EXTENSION
+    with open(json_path, 'r') as f:
+        write_map(json.load(f), map_path)
+    return map_path
+
+
+def map_to_json(map_path: str, json_path: Optional[str] = None, force: bool = False) -> str:
+    """
+    Convert a .tmap file back to the JSON layout; returns the output path.
+
+    The default output is <base>.from_tmap.json, never the <base>.json the
+    map was usually converted from, and an existing file at the default
+    path is only replaced with force.
+    """
+    if json_path is None:
+        json_path = os.path.splitext(map_path)[0] + ".from_tmap.json"
+        if os.path.exists(json_path) and not force:
+            raise FileExistsError(f"{json_path} already exists; pass -o or --force to replace it")
+    data = WaypointMap(map_path).to_dict()
+    with open(json_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    return json_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert waypoint maps between JSON and the columnar .tmap format')
+    parser.add_argument('command', choices=['to-map', 'to-json'])
+    parser.add_argument('input', help='Waypoint file to convert')
+    parser.add_argument('-o', '--output', help='Output path (defaults to the input path with .tmap, '
+                                                   'or .from_tmap.json for to-json)')
+    parser.add_argument('--force', action='store_true', help='Replace an existing to-json output at the default path')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'to-map':
+            output = json_to_map(args.input, args.output)
+        else:
+            output = map_to_json(args.input, args.output, force=args.force)
+    except FileExistsError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    print(f"✅ Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
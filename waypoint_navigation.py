@@ -1,15 +1,34 @@
 #!/usr/bin/env python3
 import json
+import math
 import time
 import uuid
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from collections import OrderedDict
+
+import numpy as np
+
+from command_metrics import CommandMetrics
+from frame_capture import FrameCapture, snapshot_path
+from cost_model import DEFAULT_FILE as COST_MODEL_FILE, FlightCostModel, PlanEstimate
+from odometry import OdometryEngine, Pose
+from path_index import PathIndex
+from waypoint_map import EXTENSION as MAP_EXTENSION, WaypointMap
+from plan_compiler import CompiledPlan, HeadingStrategy, PlanCompiler, normalize_angle
+from telemetry import TelemetryCache, query_yaw
+from tour_planner import Tour, solve_tour
+from visual_index import VisualIndex, VisualMatch
 
 class NavigationDirection(Enum):
     FORWARD = "forward"    # Top-down in waypoint file
     REVERSE = "reverse"    # Bottom-up in waypoint file
 
+class RouteMode(Enum):
+    CHAIN = "chain"        # Replay every recorded segment between the waypoints
+    DIRECT = "direct"      # Fly the straight-line displacement between the waypoints
+
 @dataclass
 class NavigationMovement:
     """Represents a single movement instruction."""
@@ -49,13 +68,48 @@ class NavigationMovement:
             # For lift type, yaw is not applicable
             return self.yaw  # Keep same (None for lift type)
 
+    @classmethod
+    def from_record(cls, mov_data: Dict) -> 'NavigationMovement':
+        """Create a movement from its waypoint file record."""
+        return cls(
+            id=mov_data['id'],
+            type=mov_data['type'],
+            direction=mov_data.get('direction', None),
+            distance=mov_data['distance'],
+            yaw=mov_data.get('yaw', None)
+        )
+
+class MovementView(Sequence):
+    """Read-only movement list over a columnar map; movements are only built for the rows read."""
+
+    def __init__(self, waypoint_map: WaypointMap, start: int = 0, stop: Optional[int] = None):
+        self.waypoint_map = waypoint_map
+        self.start = start
+        self.stop = waypoint_map.movement_count if stop is None else stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            records = self.waypoint_map.records(self.start + start, self.start + stop)
+            return [NavigationMovement.from_record(record) for record in records[::step]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("movement index out of range")
+        return NavigationMovement.from_record(self.waypoint_map.records(self.start + index, self.start + index + 1)[0])
+
 @dataclass
 class Waypoint:
     """Represents a waypoint with its movements."""
     id: str
     name: str
-    movements_to_here: List[NavigationMovement]
+    movements_to_here: Sequence[NavigationMovement]
     index: int  # Position in the waypoint sequence
+    heading: Optional[float] = None  # Yaw required on arrival (e.g. camera-facing), if any
+    signature: Optional[str] = None  # Encoded visual signature of the view when it was marked
 
 class WaypointNavigationManager:
     """Manages waypoint navigation and pathfinding."""
@@ -66,51 +120,61 @@ class WaypointNavigationManager:
         self.current_waypoint_id: str = "WP_001"  # Always start at START
         self.session_info: Dict = {}
         self.json_file_path: str = ""
+        self.telemetry: Optional[TelemetryCache] = None  # Shared state-stream cache
+        self.odometry: Optional[OdometryEngine] = None  # Measured position track
+        self.frame_capture: Optional[FrameCapture] = None  # Video snapshots on arrival
+        self.visual_index: Optional[VisualIndex] = None  # Waypoint signatures, rebuilt on every load
+        self.last_verification: Optional[VisualMatch] = None  # Visual check of the latest arrival
+        self.command_metrics: Optional[CommandMetrics] = None  # Session command timing, settle waits included
+        self.plan_compiler = PlanCompiler(speed=55)
+        self.settle_time = 0.5  # Seconds to hover after each translation when there is no state stream
+        self.settle_timeout = 3.0  # Longest wait for the state stream to report the drone stopped
+        # Prefix sums over all movements, rebuilt on every load
+        self.path_index: Optional[PathIndex] = None
+        self._movements: Sequence[NavigationMovement] = []  # All movements, back to back
+        self.waypoint_map: Optional[WaypointMap] = None  # Backing store of a columnar map
+        self._plan_cache: "OrderedDict[Tuple, Tuple[CompiledPlan, NavigationDirection]]" = OrderedDict()
+        self.plan_cache_size = 256
+        self.cost_model_file: Optional[str] = COST_MODEL_FILE  # None keeps the calibration in memory
+        self._cost_model: Optional[FlightCostModel] = None  # Loaded on first estimate or navigation
+
+    @property
+    def cost_model(self) -> FlightCostModel:
+        """Flight cost model, recalibrated after every navigation; loaded from cost_model_file when first needed."""
+        if self._cost_model is None:
+            self._cost_model = FlightCostModel.load(self.cost_model_file) if self.cost_model_file else FlightCostModel()
+        return self._cost_model
+
+    @cost_model.setter
+    def cost_model(self, model: FlightCostModel):
+        self._cost_model = model
     
-    def load_waypoint_file(self, json_file_path: str) -> bool:
-        """Load waypoints from JSON file into memory."""
+    def load_waypoint_file(self, json_file_path: str, verbose: bool = True) -> bool:
+        """Load waypoints from a JSON file, or memory-map a columnar .tmap map (verbose=False only reports errors)."""
         try:
-            print(f"📖 Loading waypoint file: {json_file_path}")
-            
-            with open(json_file_path, 'r') as file:
-                data = json.load(file)
-            
-            self.json_file_path = json_file_path
-            self.session_info = data.get('session_info', {})
-            waypoints_data = data.get('waypoints', [])
+            if verbose:
+                print(f"📖 Loading waypoint file: {json_file_path}")
             
             # Clear existing data
             self.waypoints.clear()
             self.waypoint_order.clear()
+            self._movements = []
+            self.waypoint_map = None
+            self._plan_cache.clear()
             
-            # Load waypoints in order
-            for index, wp_data in enumerate(waypoints_data):
-                movements = []
-                for mov_data in wp_data.get('movements_to_here', []):
-                    movement = NavigationMovement(
-                        id=mov_data['id'],
-                        type=mov_data['type'],
-                        direction=mov_data.get('direction', None),
-                        distance=mov_data['distance'],
-                        yaw=mov_data.get('yaw', None)
-                    )
-                    movements.append(movement)
-                
-                waypoint = Waypoint(
-                    id=wp_data['id'],
-                    name=wp_data['name'],
-                    movements_to_here=movements,
-                    index=index
-                )
-                
-                self.waypoints[waypoint.id] = waypoint
-                self.waypoint_order.append(waypoint.id)
+            if json_file_path.endswith(MAP_EXTENSION):
+                self._load_waypoint_map(json_file_path)
+            else:
+                self._load_waypoint_json(json_file_path)
+            self.visual_index = VisualIndex.from_waypoints(
+                (wp_id, self.waypoints[wp_id].signature) for wp_id in self.waypoint_order)
             
             # Reset to start position
             self.current_waypoint_id = "WP_001"
             
-            print(f"✅ Loaded {len(self.waypoints)} waypoints successfully")
-            self._print_waypoint_summary()
+            if verbose:
+                print(f"✅ Loaded {len(self.waypoints)} waypoints successfully")
+                self._print_waypoint_summary()
             
             return True
             
@@ -118,6 +182,61 @@ class WaypointNavigationManager:
             print(f"❌ Error loading waypoint file: {e}")
             return False
     
+    def _load_waypoint_json(self, json_file_path: str):
+        """Parse a drone_movements_*.json file into movement objects."""
+        with open(json_file_path, 'r') as file:
+            data = json.load(file)
+        
+        self.json_file_path = json_file_path
+        self.session_info = data.get('session_info', {})
+        waypoints_data = data.get('waypoints', [])
+        
+        # Load waypoints in order
+        movements_list = []
+        for index, wp_data in enumerate(waypoints_data):
+            movements = [NavigationMovement.from_record(mov_data) for mov_data in wp_data.get('movements_to_here', [])]
+            
+            waypoint = Waypoint(
+                id=wp_data['id'],
+                name=wp_data['name'],
+                movements_to_here=movements,
+                index=index,
+                heading=wp_data.get('heading'),
+                signature=wp_data.get('signature')
+            )
+            
+            self.waypoints[waypoint.id] = waypoint
+            self.waypoint_order.append(waypoint.id)
+            movements_list.extend(movements)
+        
+        self._movements = movements_list
+        self.path_index = PathIndex.from_waypoints(
+            [self.waypoints[wp_id].movements_to_here for wp_id in self.waypoint_order])
+    
+    def _load_waypoint_map(self, map_file_path: str):
+        """Memory-map a columnar map; movements are only built for the paths flown."""
+        waypoint_map = WaypointMap(map_file_path)
+        
+        self.json_file_path = map_file_path
+        self.session_info = waypoint_map.session_info
+        self.waypoint_map = waypoint_map
+        
+        for index, wp_data in enumerate(waypoint_map.waypoints):
+            start, stop = waypoint_map.waypoint_bounds(index)
+            waypoint = Waypoint(
+                id=wp_data['id'],
+                name=wp_data['name'],
+                movements_to_here=MovementView(waypoint_map, start, stop),
+                index=index,
+                heading=wp_data.get('heading'),
+                signature=wp_data.get('signature')
+            )
+            self.waypoints[waypoint.id] = waypoint
+            self.waypoint_order.append(waypoint.id)
+        
+        self._movements = MovementView(waypoint_map)
+        self.path_index = waypoint_map.path_index()
+    
     def _print_waypoint_summary(self):
         """Print a summary of loaded waypoints."""
         print("\n📍 WAYPOINT SUMMARY")
@@ -128,6 +247,10 @@ class WaypointNavigationManager:
             print(f"{status} {waypoint.id}: '{waypoint.name}'")
         print("=" * 50)
     
+    def get_waypoint_position(self, waypoint_id: str, vertical_factor=1.0) -> Tuple[float, float, float]:
+        """Dead-reckoned (x, y, z) of a waypoint in cm relative to START (x along yaw 0, y along yaw 90)."""
+        return self.path_index.position(self.waypoints[waypoint_id].index, vertical_factor)
+    
     def get_available_destinations(self) -> List[Tuple[str, str]]:
         """Get list of waypoints drone can navigate to (excluding current)."""
         destinations = []
@@ -137,22 +260,32 @@ class WaypointNavigationManager:
                 destinations.append((wp_id, waypoint.name))
         return destinations
     
-    def calculate_navigation_path(self, target_waypoint_id: str) -> Tuple[List[NavigationMovement], NavigationDirection]:
+    def calculate_navigation_path(self, target_waypoint_id: str, route_mode: RouteMode = RouteMode.CHAIN,
+                                  from_waypoint_id: Optional[str] = None) -> Tuple[List[NavigationMovement], NavigationDirection]:
         """
         Calculate the movement sequence to navigate from current to target waypoint.
         
+        Args:
+            target_waypoint_id: Destination waypoint ID
+            route_mode: CHAIN replays the recorded segments, DIRECT flies the straight line
+            from_waypoint_id: Start waypoint ID (defaults to the current waypoint)
+        
         Returns:
             Tuple of (movements_list, direction)
         """
         if target_waypoint_id not in self.waypoints:
             raise ValueError(f"Target waypoint {target_waypoint_id} not found")
         
-        current_waypoint = self.waypoints[self.current_waypoint_id]
+        current_waypoint = self.waypoints[from_waypoint_id or self.current_waypoint_id]
         target_waypoint = self.waypoints[target_waypoint_id]
         
         current_index = current_waypoint.index
         target_index = target_waypoint.index
         
+        if route_mode == RouteMode.DIRECT:
+            direction = NavigationDirection.FORWARD if target_index > current_index else NavigationDirection.REVERSE
+            return self._calculate_direct_path(current_index, target_index), direction
+        
         if target_index > current_index:
             # Forward navigation (top-down)
             return self._calculate_forward_path(current_index, target_index), NavigationDirection.FORWARD
@@ -162,33 +295,145 @@ class WaypointNavigationManager:
     
     def _calculate_forward_path(self, current_waypoint_index: int, target_waypoint_index: int) -> List[NavigationMovement]:
         """Calculate forward navigation path (normal order)."""
-        movements = []
-        
-        # Collect all movements from next waypoint to target waypoint
-        for i in range(current_waypoint_index + 1, target_waypoint_index + 1):
-            waypoint_id = self.waypoint_order[i]
-            waypoint = self.waypoints[waypoint_id]
-            movements.extend(waypoint.movements_to_here)
-        
-        return movements
+        # Movements from the next waypoint up to the target are one contiguous slice
+        start, stop = self.path_index.slice_bounds(current_waypoint_index, target_waypoint_index)
+        return self._movements[start:stop]
     
     def _calculate_reverse_path(self, current_waypoint_index: int, target_waypoint_index: int) -> List[NavigationMovement]:
         """Calculate reverse navigation path (reversed movements)."""
+        # Reverse the order AND reverse each individual movement of the slice in between
+        start, stop = self.path_index.slice_bounds(current_waypoint_index, target_waypoint_index)
+        return [mov.reverse() for mov in reversed(self._movements[start:stop])]
+    
+    def _calculate_direct_path(self, current_waypoint_index: int, target_waypoint_index: int) -> List[NavigationMovement]:
+        """Calculate a straight-line path: one horizontal move plus the net climb and descent."""
+        # Climbs and descents stay apart so the vertical factor applies as in chain mode
+        dx, dy, climb, descent = self.path_index.displacement(current_waypoint_index, target_waypoint_index)
+        
+        route_id = f"direct-{self.waypoint_order[current_waypoint_index]}-{self.waypoint_order[target_waypoint_index]}"
         movements = []
+        if math.hypot(dx, dy) > 0:
+            movements.append(NavigationMovement(id=f"{route_id}-move", type="move", distance=math.hypot(dx, dy),
+                                                yaw=math.degrees(math.atan2(dy, dx))))
+        if climb > 0:
+            movements.append(NavigationMovement(id=f"{route_id}-up", type="lift", distance=climb, direction="up"))
+        if descent > 0:
+            movements.append(NavigationMovement(id=f"{route_id}-down", type="lift", distance=descent, direction="down"))
+        return movements
+    
+    def plan_route(self, from_waypoint_id: str, target_waypoint_id: str, route_mode: RouteMode = RouteMode.CHAIN,
+                   vertical_factor=1.0, strategy: HeadingStrategy = HeadingStrategy.TURN,
+                   start_heading: Optional[float] = None, smooth: bool = False) -> Tuple[CompiledPlan, NavigationDirection]:
+        """
+        Compile the plan between two waypoints, served from an LRU cache for hot pairs.
         
-        # Collect all movements from current waypoint back to target waypoint
-        # Reverse the order AND reverse each individual movement
-        for i in range(current_waypoint_index, target_waypoint_index, -1):
-            waypoint_id = self.waypoint_order[i]
-            waypoint = self.waypoints[waypoint_id]
-            
-            # Reverse each movement and add to list in reverse order
-            reversed_movements = [mov.reverse() for mov in reversed(waypoint.movements_to_here)]
-            movements.extend(reversed_movements)
+        TURN plans are compiled without a start heading, so they begin with an absolute
+        rotation and can be reused whatever the drone's yaw is. STRAFE plans are flown
+        relative to start_heading (rounded to a degree), which is part of the cache key.
+        With smooth, pairs of legs (including those meeting at intermediate waypoints)
+        are flown as curves where the SDK allows.
+        """
+        direction = (NavigationDirection.FORWARD
+                     if self.waypoints[target_waypoint_id].index > self.waypoints[from_waypoint_id].index
+                     else NavigationDirection.REVERSE)
+        if strategy == HeadingStrategy.TURN or start_heading is None:
+            start_heading = None
+        else:
+            start_heading = int(round(start_heading))
+        key = (from_waypoint_id, target_waypoint_id, direction, vertical_factor, route_mode, strategy,
+               start_heading, smooth, self.plan_compiler.config)
+        cached = self._plan_cache.get(key)
+        if cached is not None:
+            self._plan_cache.move_to_end(key)
+            return cached
         
-        return movements
+        movements, direction = self.calculate_navigation_path(target_waypoint_id, route_mode=route_mode,
+                                                              from_waypoint_id=from_waypoint_id)
+        plan = self.compile_navigation(movements, direction, vertical_factor=vertical_factor,
+                                       start_heading=start_heading, strategy=strategy,
+                                       end_heading=self.waypoints[target_waypoint_id].heading, smooth=smooth)
+        self._plan_cache[key] = (plan, direction)
+        if len(self._plan_cache) > self.plan_cache_size:
+            self._plan_cache.popitem(last=False)
+        return plan, direction
+    
+    def path_summary(self, from_waypoint_id: str, target_waypoint_id: str) -> Dict[str, float]:
+        """Net displacement and recorded path length between two waypoints in O(1)."""
+        from_index = self.waypoints[from_waypoint_id].index
+        target_index = self.waypoints[target_waypoint_id].index
+        dx, dy, climb, descent = self.path_index.displacement(from_index, target_index)
+        return {
+            'dx': dx,
+            'dy': dy,
+            'dz': climb - descent,
+            'straight_distance': math.sqrt(dx * dx + dy * dy + (climb - descent) ** 2),
+            'path_length': self.path_index.path_length(from_index, target_index),
+        }
+    
+    def estimate_plan(self, plan: CompiledPlan, start_heading: Optional[float] = None) -> PlanEstimate:
+        """Predicted duration of a compiled plan at the compiler's speed."""
+        return self.cost_model.estimate_plan(plan, self.plan_compiler.speed, start_heading=start_heading)
+    
+    def estimate_route(self, target_waypoint_id: str, route_mode: RouteMode = RouteMode.CHAIN, vertical_factor=1.0,
+                       from_waypoint_id: Optional[str] = None, strategy: HeadingStrategy = HeadingStrategy.TURN,
+                       smooth: bool = False) -> Tuple[CompiledPlan, PlanEstimate]:
+        """
+        Plan a route (from the current waypoint by default) and predict how long it will take.
+        
+        The current heading comes from the telemetry yaw when a state stream is
+        available; otherwise the first rotation is costed as an average turn.
+        """
+        heading = self.telemetry.get_yaw() if self.telemetry is not None else None
+        plan, _ = self.plan_route(from_waypoint_id or self.current_waypoint_id, target_waypoint_id,
+                                  route_mode=route_mode, vertical_factor=vertical_factor,
+                                  strategy=strategy, start_heading=heading, smooth=smooth)
+        return plan, self.estimate_plan(plan, start_heading=heading)
+    
+    def plan_tour(self, stop_ids: Sequence[str], first_waypoint_id: Optional[str] = None,
+                  last_waypoint_id: Optional[str] = None, route_mode: RouteMode = RouteMode.CHAIN,
+                  vertical_factor=1.0, strategy: HeadingStrategy = HeadingStrategy.TURN, smooth: bool = False) -> Tour:
+        """
+        Order a set of stops to minimize the estimated flight time from the current waypoint.
+        
+        Pair costs are the cost model's estimate of each compiled route, with the
+        first rotation of every leg costed as an average turn. STRAFE legs are
+        planned around the current telemetry heading when it is known.
+        
+        Args:
+            stop_ids: Waypoints to visit
+            first_waypoint_id: Stop that must be visited first, if any
+            last_waypoint_id: Stop the tour must finish at, if any
+        
+        Returns:
+            Tour whose order holds waypoint ids, starting at the current waypoint
+        """
+        ids = list(dict.fromkeys([self.current_waypoint_id, *stop_ids,
+                                  *(wp for wp in (first_waypoint_id, last_waypoint_id) if wp)]))
+        heading = self.telemetry.get_yaw() if self.telemetry is not None else None
+        costs = np.zeros((len(ids), len(ids)))
+        for a, from_id in enumerate(ids):
+            for b, to_id in enumerate(ids):
+                if a != b:
+                    plan, _ = self.plan_route(from_id, to_id, route_mode=route_mode, vertical_factor=vertical_factor,
+                                              strategy=strategy, start_heading=heading, smooth=smooth)
+                    costs[a, b] = self.estimate_plan(plan).total_seconds
+        
+        index = {wp_id: i for i, wp_id in enumerate(ids)}
+        last = index[last_waypoint_id] if last_waypoint_id else None
+        if first_waypoint_id and first_waypoint_id != self.current_waypoint_id:
+            # Fly to the fixed first stop, then optimize the rest from there
+            first = index[first_waypoint_id]
+            tour = solve_tour(costs, range(1, len(ids)), start=first, end=last)
+            tour.order.insert(0, 0)
+            tour.cost += costs[0, first]
+            tour.baseline_cost += costs[0, first]
+        else:
+            tour = solve_tour(costs, range(len(ids)), start=0, end=last)
+        tour.order = [ids[i] for i in tour.order]
+        return tour
     
-    def navigate_to_waypoint(self, target_waypoint_id: str, drone_instance=None, vertical_factor=1.0) -> bool:
+    def navigate_to_waypoint(self, target_waypoint_id: str, drone_instance=None, vertical_factor=1.0, route_mode: RouteMode = RouteMode.CHAIN,
+                             strategy: HeadingStrategy = HeadingStrategy.TURN, smooth: bool = False) -> bool:
         """
         Navigate to target waypoint and update current position.
         
@@ -204,8 +449,14 @@ class WaypointNavigationManager:
             return True
         
         try:
-            # Calculate navigation path
-            movements, direction = self.calculate_navigation_path(target_waypoint_id)
+            # Calculate navigation plan; STRAFE flies relative to the heading the drone holds now
+            if strategy == HeadingStrategy.STRAFE:
+                heading = self.get_yaw(drone_instance=drone_instance)
+            else:
+                heading = self.telemetry.get_yaw() if self.telemetry is not None else None
+            plan, direction = self.plan_route(self.current_waypoint_id, target_waypoint_id,
+                                              route_mode=route_mode, vertical_factor=vertical_factor,
+                                              strategy=strategy, start_heading=heading, smooth=smooth)
             target_name = self.waypoints[target_waypoint_id].name
             current_name = self.waypoints[self.current_waypoint_id].name
             
@@ -213,15 +464,20 @@ class WaypointNavigationManager:
             print(f"From: {self.current_waypoint_id} ('{current_name}')")
             print(f"To: {target_waypoint_id} ('{target_name}')")
             print(f"Direction: {direction.value}")
-            print(f"Total movements: {len(movements)}")
+            print(f"Route: {route_mode.value}")
+            print(f"Heading: {strategy.value} ({plan.rotation_count} rotations){', smoothed' if smooth else ''}")
+            print(f"Total movements: {plan.source_movements}")
+            print(f"Estimated time: {self.estimate_plan(plan, start_heading=heading).describe()}")
             
             # Execute navigation
-            success = self._execute_navigation(movements, direction, drone_instance=drone_instance, vertical_factor=vertical_factor)
+            success = self._execute_navigation(plan, direction, drone_instance=drone_instance)
             
             if success:
                 # Update current position
                 self.current_waypoint_id = target_waypoint_id
                 print(f"✅ Successfully navigated to {target_waypoint_id} ('{target_name}')")
+                self._capture_arrival(target_waypoint_id)
+                self.last_verification = self.verify_arrival(target_waypoint_id)
                 return True
             else:
                 print(f"❌ Navigation to {target_waypoint_id} failed")
@@ -231,93 +487,147 @@ class WaypointNavigationManager:
             print(f"❌ Navigation error: {e}")
             return False
 
-    def _execute_navigation(self, movements: List[NavigationMovement], direction: NavigationDirection, drone_instance=None, vertical_factor=1.0) -> bool:
-        """Execute the navigation movements."""
+    def compile_navigation(self, movements: List[NavigationMovement], direction: NavigationDirection,
+                           vertical_factor=1.0, start_heading: Optional[float] = None,
+                           strategy: HeadingStrategy = HeadingStrategy.TURN,
+                           end_heading: Optional[float] = None, smooth: bool = False) -> CompiledPlan:
+        """Compile a movement list into the drone commands that will be executed."""
+        # Vertical airflow affects the lifts that replay a recorded climb
+        scaled_lift = "up" if direction == NavigationDirection.FORWARD else "down"
+        return self.plan_compiler.compile(movements, vertical_factor=vertical_factor,
+                                          scaled_lift=scaled_lift, start_heading=start_heading,
+                                          strategy=strategy, end_heading=end_heading, smooth=smooth)
+
+    def _execute_navigation(self, plan: CompiledPlan, direction: NavigationDirection, drone_instance=None) -> bool:
+        """Execute a compiled navigation plan command by command."""
         
-        print(f"\n🚁 Executing {len(movements)} movements ({direction.value})...")
-        drone_instance.set_speed(55)  # Set a reasonable speed for movements
+        print(f"\n🚁 Executing {plan.command_count} commands compiled from {plan.source_movements} movements ({direction.value})...")
+        for note in plan.notes:
+            print(f"  ℹ️  {note}")
+        speed = self.plan_compiler.speed
+        drone_instance.set_speed(speed)  # Set a reasonable speed for movements
+        start_pose = self.get_pose()
+        start_time = time.monotonic()
         try: 
-            for i, movement in enumerate(movements, 1):
-                print(f"  Step {i}/{len(movements)}: {movement.type} ")
-                distance = movement.distance if movement.distance is not None and movement.distance >= 20 else 20  # Ensure minimum valid distance for movement
-                if movement.type == "move":
-                    yaw = movement.yaw if movement.yaw is not None else 0
-                    current_yaw = self.get_yaw(drone_instance=drone_instance)
-                    
-                    turn_degree = abs(yaw - current_yaw)
-                    if current_yaw > yaw:
-                        print(f"  Adjusting yaw from {current_yaw} to {yaw} degrees")
-                        if turn_degree > 180 and turn_degree < 360: 
-                            drone_instance.rotate_clockwise(360 - turn_degree)
-                        elif turn_degree <= 180 and turn_degree > 0: 
-                            drone_instance.rotate_counter_clockwise(turn_degree)
-                        else: 
-                            print("  No yaw adjustment needed")
-                        drone_instance.send_rc_control(0, 0, 0, 0)  # Stop any ongoing movement
-                    else: 
-                        print(f"  Adjusting yaw from {current_yaw} to {yaw} degrees")
-                        if turn_degree > 180 and turn_degree < 360: 
-                            drone_instance.rotate_counter_clockwise(360 - turn_degree)
-                        elif turn_degree <= 180 and turn_degree > 0: 
-                            drone_instance.rotate_clockwise(turn_degree)
-                        else: 
-                            print("  No yaw adjustment needed")
-                        drone_instance.send_rc_control(0, 0, 0, 0)  # Stop any ongoing movement
+            for i, command in enumerate(plan.commands, 1):
+                print(f"  Step {i}/{plan.command_count}: {command.describe()}")
+                if command.name == "rotate_to":
+                    turn, seconds = self._rotate_to(command.args[0], drone_instance=drone_instance)
+                    if turn:
+                        self.cost_model.record_rotation(turn, seconds)
+                    continue
 
-                    drone_instance.move_forward(int(distance))
-                    time.sleep(0.5)  # Allow some time for the drone to stabilize
-                    drone_instance.send_rc_control(0, 0, 0, 0)  # Stop any ongoing movement
-                    print(f"  Moved forward {distance} cm at yaw {yaw} degrees")
+                command_start = time.monotonic()
 
-                else:
-                    match (movement.direction, direction): 
-                        case ("up", NavigationDirection.FORWARD):
-                            actual_distance = max((distance / vertical_factor), 20)
-                            drone_instance.move_up(int(actual_distance))
-                            print(f"  Lifted up {actual_distance} cm")
-                        case ("down", NavigationDirection.FORWARD):
-                            drone_instance.move_down(int(distance))
-                            print(f"  Lowered down {distance} cm")
-                        ############# REVERSE MOVEMENT HANDLING #############
-                        case ("up", NavigationDirection.REVERSE):
-                            drone_instance.move_up(int(distance))
-                            print(f"  Lifted up {distance} cm")
-                        case ("down", NavigationDirection.REVERSE):
-                            actual_distance = max((distance / vertical_factor), 20)
-                            drone_instance.move_down(int(actual_distance))
-                            print(f"  Lowered down {actual_distance} cm")
-                    
-                    drone_instance.send_rc_control(0, 0, 0, 0)  # Stop any ongoing movement
+                getattr(drone_instance, command.name)(*command.args)
+                settle_start = time.monotonic()
+                self.cost_model.record_translation(command.distance, command.commanded_speed or speed,
+                                                   settle_start - command_start)
+                if plan.smooth and i < plan.command_count and plan.commands[i].name != "rotate_to":
+                    continue  # Chain straight into the next translation
+                stopped = self._wait_settled()
+                if stopped is not None:
+                    self.cost_model.record_settle(stopped)  # Only measured settling calibrates the model
+                if self.command_metrics is not None:
+                    self.command_metrics.record_wait("settle", time.monotonic() - settle_start)
             
+            drone_instance.send_rc_control(0, 0, 0, 0)  # Stop any ongoing movement
             print("✅ Navigation movements completed")
+            self._report_odometry(plan, start_pose)
+            self._update_cost_model(time.monotonic() - start_time)
             return True
         except Exception as e:
             print(f"❌ Error during navigation execution: {e}")
             drone_instance.send_rc_control(0, 0, 0, 0)  # Stop any ongoing movement
             return False
+
+    def _capture_arrival(self, waypoint_id: str):
+        """Queue a snapshot of the view on arrival, next to the map file."""
+        if self.frame_capture is None:
+            return
+        path = snapshot_path(self.json_file_path, waypoint_id, suffix=f"_arrival_{time.strftime('%Y%m%d_%H%M%S')}",
+                             image_format=self.frame_capture.image_format)
+        if self.frame_capture.capture(path):
+            print(f"📷 Arrival snapshot: {path}")
+
+    def verify_arrival(self, waypoint_id: str) -> Optional[VisualMatch]:
+        """Match the current camera view against the map's waypoint signatures."""
+        if self.frame_capture is None or self.visual_index is None:
+            return None
+        pinned = self.frame_capture.ring.pin_latest()
+        if pinned is None:
+            return None
+        slot, _ = pinned
+        try:
+            match = self.visual_index.match(self.frame_capture.ring.view(slot), expected_id=waypoint_id)
+        finally:
+            self.frame_capture.ring.unpin(slot)
+        print(f"{'👁️ ' if match.verified else '⚠️ '} Visual check: {match.describe()}")
+        return match
+
+    def get_pose(self) -> Optional[Pose]:
+        """Current measured pose from odometry, or None without a state stream."""
+        if self.odometry is None:
+            return None
+        return self.odometry.pose()
+
+    def _report_odometry(self, plan: CompiledPlan, start_pose: Optional[Pose]):
+        """Compare the distance actually flown with the compiled plan."""
+        end_pose = self.get_pose()
+        if start_pose is None or end_pose is None or end_pose.timestamp <= start_pose.timestamp:
+            return
+        flown = self.odometry.path_length(start_pose.timestamp, end_pose.timestamp)
+        print(f"📏 Odometry: flew {flown:.0f} cm (plan {plan.total_distance:.0f} cm), net "
+              f"({end_pose.x - start_pose.x:.0f}, {end_pose.y - start_pose.y:.0f}, {end_pose.z - start_pose.z:.0f}) cm")
+
+    def _update_cost_model(self, elapsed: float):
+        """Refit the cost model with this navigation's latencies and keep them for the next run."""
+        print(f"⏱️  Navigation took {elapsed:.1f} s")
+        if self.cost_model.calibrate() and self.cost_model_file:
+            try:
+                self.cost_model.save(self.cost_model_file)
+            except OSError as e:
+                print(f"⚠️  Could not save flight cost calibration: {e}")
+
+    def _rotate_to(self, yaw: int, drone_instance=None) -> Tuple[int, float]:
+        """Rotate the shortest way to an absolute yaw; returns the turn in degrees and the seconds it took."""
+        current_yaw = self.get_yaw(drone_instance=drone_instance)
+        turn = int(round(normalize_angle(yaw - current_yaw)))
+        if abs(turn) < 1:
+            print("  No yaw adjustment needed")
+            return 0, 0.0
+        print(f"  Adjusting yaw from {current_yaw} to {yaw} degrees")
+        start = time.monotonic()  # After the yaw query, so only the turn itself is timed
+        if turn > 0:
+            drone_instance.rotate_clockwise(turn)
+        else:
+            drone_instance.rotate_counter_clockwise(-turn)
+        return turn, time.monotonic() - start
+
+    def _wait_settled(self) -> Optional[float]:
+        """
+        Hover until the drone has stopped after a translation.
+
+        With a fresh state stream, waits until the reported velocities are
+        zero and returns how long that took. Otherwise hovers settle_time and
+        returns None, as does a drone still moving after settle_timeout:
+        neither is a measurement of settling.
+        """
+        start = time.monotonic()
+        if self.telemetry is None or not self.telemetry.is_fresh():
+            time.sleep(self.settle_time)
+            return None
+        while time.monotonic() - start < self.settle_timeout:
+            if self.telemetry.is_fresh() and not any(self.telemetry.get_velocity().values()):
+                return time.monotonic() - start
+            time.sleep(self.telemetry.poll_interval)
+        return None
     
     def get_yaw(self, drone_instance=None) -> int:
-        try:
-            attitude_str = drone_instance.send_command_with_return("attitude?", timeout=3)
-            print(f"Raw attitude response: '{attitude_str}'")  # Debug line
-            
-            # Parse attitude string like "pitch:0;roll:0;yaw:45;"
-            yaw = 0  # Default value
-            if attitude_str and ':' in attitude_str:
-                attitude_parts = attitude_str.split(';')
-                for part in attitude_parts:
-                    if part.strip() and 'yaw:' in part:
-                        try:
-                            yaw_value = part.split(':')[1].strip()
-                            if yaw_value:
-                                yaw = int(yaw_value)
-                        except (ValueError, IndexError) as e:
-                            print(f"⚠️  Failed to parse yaw from '{part}': {e}")
-                            continue
-            return yaw
-        except Exception as e:
-            print(f"⚠️  Attitude query failed: {e}")
-            return 0
+        """Get the current yaw, from the telemetry cache when available."""
+        if self.telemetry is not None:
+            return self.telemetry.get_yaw()
+        return query_yaw(drone_instance)
     
     def get_current_waypoint_info(self) -> Tuple[str, str]:
         """Get current waypoint ID and name."""